@@ -0,0 +1,147 @@
+"""
+Пакетный анализ записанного сеанса (см. main.py --record).
+Сканирования из отображенных в память сегментов проходят через то же усреднение RssiStore.fuse(),
+что и асинхронный режим DataSync, но по времени записи, без ожидания. На каждом такте
+считаются вердикты тренда, скачки сигнала с заданными порогами и оценки расстояния
+по моделям затухания (подобранным fit_path_loss.py или модели по умолчанию), как в GUI.
+
+    python analyze_session.py records/ --window-size 3 --threshold 5 --output day.npz
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from utils import analysis
+from utils.filters import create_filter
+from utils.fusion import INTERSECT, UNION, create_fusion
+from utils.path_loss import MODELS_PATH, DistanceTables
+from utils.rssi_store import RssiStore
+from utils.scan_recorder import RecordedSession
+from utils.verdicts import verdicts
+
+
+class SessionAnalysis:
+    """
+    Результат анализа сеанса.
+    times - время тактов, verdicts - коды analysis.TREND_CODES [такт × сеть] (-1, если сеть не видна),
+    jumps - скачки сигнала [такт × сеть], distances - оценки расстояния в метрах [такт × сеть]
+    (NaN, если сеть не видна). Столбец матриц - id сети в session.networks.
+    """
+
+    def __init__(self, session, times, verdict_codes, jumps, distances):
+        self.session = session
+        self.times = times
+        self.verdicts = verdict_codes
+        self.jumps = jumps
+        self.distances = distances
+
+    def summary(self):
+        """
+        Сводка по сетям, которые хотя бы раз были видны.
+        :return: Список (bssid, ssid, тактов видимости, {вердикт: тактов}, скачков, медиана расстояния в м).
+        """
+        networks = self.session.networks
+        rows = []
+        for network_id in np.flatnonzero((self.verdicts >= 0).any(axis=0)):
+            column = self.verdicts[:, network_id]
+            counts = np.bincount(column[column >= 0], minlength=len(analysis.TREND_CODES))
+            rows.append((networks.bssid(network_id), networks.ssid(network_id), int((column >= 0).sum()),
+                         dict(zip(analysis.TREND_CODES, counts.tolist())), int(self.jumps[:, network_id].sum()),
+                         float(np.median(self.distances[column >= 0, network_id]))))
+        return rows
+
+    def save(self, path):
+        networks = self.session.networks
+        np.savez_compressed(path, times=self.times, verdicts=self.verdicts, jumps=self.jumps, distances=self.distances,
+                            bssids=np.array(networks.bssids), ssids=np.array(networks.ssids))
+
+
+def analyze_session(session, interval=1.0, fusion_window=3.0, history=8, window_size=4, threshold=7,
+                    jump_threshold=10, signal_filter=None, stats_window=None, fusion=None, tables=None, N=None):
+    """
+    Воспроизводит сеанс такт за тактом и анализирует все видимые сети.
+    :param interval: Интервал такта (в секундах времени записи).
+    :param fusion_window: Окно усреднения замеров адаптеров (в секундах).
+    :param signal_filter: Фильтр средних такта (см. utils/filters.py).
+    :param stats_window: Окно тренда в тактах по скользящей статистике вместо window_size по истории.
+    :param fusion: FusionEngine (utils/fusion.py); без него сеть учитывается, только если ее видят все адаптеры.
+    :param tables: DistanceTables для session.networks; без них расстояния считаются по модели get_distance.
+    :param N: Показатель затухания модели по умолчанию (по умолчанию - выбранный пресет среды).
+    :return: SessionAnalysis.
+    """
+    store = RssiStore(adapters=len(session.adapters), history=history, networks=session.networks,
+                      signal_filter=signal_filter, stats_window=stats_window, fusion=fusion)
+    ticks = 0 if not len(session) else math.floor((session.end_time - session.start_time) / interval) + 1
+    verdict_codes = np.full((ticks, len(session.networks)), -1, dtype=np.int8)
+    jumps = np.zeros((ticks, len(session.networks)), dtype=bool)
+    distances = np.full((ticks, len(session.networks)), np.nan, dtype=np.float32)
+    times = session.start_time + interval * np.arange(1, ticks + 1) if ticks else np.zeros(0)
+    # Как в GUI: точность задается числом адаптеров сеанса (в GUI - подключенных), а не тем,
+    # сколько из них успело прислать замеры в окно такта; с одним адаптером тренд не определяется
+    low_precision = len(session.adapters) == 1
+
+    def publish(tick):
+        snapshot = store.fuse(fusion_window, now=times[tick])
+        if snapshot is None:
+            return
+        frame = store.frame(tick, snapshot, low_precision)
+        frame_analysis = analysis.FrameAnalysis(frame, window_size, threshold, jump_threshold, N=N, tables=tables)
+        verdict_codes[tick, frame.ids] = frame_analysis.trends
+        jumps[tick, frame.ids] = frame_analysis.jumps
+        distances[tick, frame.ids] = frame_analysis.distances
+
+    tick = 0
+    for timestamp, adapter, network_ids, values in session.scans():
+        while tick < ticks and times[tick] < timestamp:
+            publish(tick)
+            tick += 1
+        store.put_arrays(adapter, network_ids, values, timestamp)
+    while tick < ticks:
+        publish(tick)
+        tick += 1
+    return SessionAnalysis(session, times, verdict_codes, jumps, distances)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Пакетный анализ записанного сеанса сканирований")
+    parser.add_argument("path", help="Каталог сеанса или файл сегмента .rssi")
+    parser.add_argument("--interval", type=float, default=1.0, help="Интервал такта (в секундах)")
+    parser.add_argument("--fusion-window", type=float, default=3.0, help="Окно усреднения замеров (в секундах)")
+    parser.add_argument("--history", type=int, default=8, help="Длина истории средних")
+    parser.add_argument("--window-size", type=int, default=4, help="Размер окна анализа тренда")
+    parser.add_argument("--threshold", type=float, default=7, help="Порог изменения тренда")
+    parser.add_argument("--jump-threshold", type=float, default=10, help="Порог скачка сигнала")
+    parser.add_argument("--stats-window", type=int,
+                        help="Окно тренда в тактах по скользящей статистике (может быть длиннее --history)")
+    parser.add_argument("--filter", metavar="CHAIN", default="none",
+                        help="Фильтры средних RSSI через запятую: ewma, kalman, median, hampel")
+    parser.add_argument("--fusion", choices=(UNION, INTERSECT),
+                        help="Объединение замеров адаптеров (по умолчанию - параметр mode секции [fusion], "
+                             "иначе intersect)")
+    parser.add_argument("--grace", type=int, help="Сколько тактов пропавшая сеть остается в истории (union)")
+    parser.add_argument("--models", default=MODELS_PATH, help="Файл подобранных моделей затухания")
+    parser.add_argument("--output", help="Сохранить вердикты, скачки и расстояния по тактам в .npz")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started_at = time.monotonic()
+    session = RecordedSession(args.path)
+    result = analyze_session(session, args.interval, args.fusion_window, args.history, args.window_size,
+                             args.threshold, args.jump_threshold, create_filter(args.filter), args.stats_window,
+                             create_fusion(args.fusion, args.grace), DistanceTables(session.networks, args.models))
+    print(f'Замеров: {len(session)}, тактов: {len(result.times)}, сетей: {len(session.networks)}, '
+          f'время анализа: {time.monotonic() - started_at:.2f} с')
+    for bssid, ssid, visible, counts, jump_count, distance in result.summary():
+        verdict_text = ', '.join(f'{verdicts[code]}: {count}' for code, count in counts.items() if count)
+        print(f'{ssid} ({bssid}): тактов {visible}; {verdict_text}; скачков: {jump_count}; '
+              f'расстояние: {distance:.1f} м')
+    if args.output:
+        result.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
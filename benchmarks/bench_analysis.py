@@ -0,0 +1,68 @@
+"""
+Время анализа одного такта для всех сетей: по одной сети (как DetailsPage)
+против FrameAnalysis над массивами кадра.
+
+    python -m benchmarks.bench_analysis --networks 1000 --adapters 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from utils import analysis
+from utils.data_bus import Frame
+from utils.get_distance import get_distance
+from utils.network_index import NetworkIndex
+
+
+def make_frame(networks, adapters, history_size=8, seed=0):
+    rnd = np.random.default_rng(seed)
+    index = NetworkIndex(networks)
+    for i in range(networks):
+        index.intern(f'02:00:00:{i >> 8 & 0xFF:02x}:{i & 0xFF:02x}:01:', f'Network-{i // 4}', 2412)
+    history = (np.cumsum(rnd.normal(0, 3, (networks, history_size)), axis=1) - 60).astype(np.float32)
+    counts = rnd.integers(1, history_size + 1, networks).astype(np.int32)
+    for row, count in enumerate(counts):
+        history[row, :history_size - count] = np.nan
+    adapter_values = (history[:, -1] + rnd.normal(0, 10, (adapters, networks))).astype(np.float32)
+    return Frame(1, time.monotonic(), index, np.arange(networks), history, counts, adapter_values)
+
+
+def per_network(frame):
+    """Прежний путь: каждая сеть анализируется отдельно."""
+    for bssid in frame.networks.bssids:
+        last_values = frame.get(bssid)
+        analysis.analyze_trend(last_values)
+        analysis.check_jump(last_values)
+        analysis.spread_exceeded(frame.adapters_of(bssid))
+        get_distance(last_values[-1])
+
+
+def vectorized(frame):
+    analysis.FrameAnalysis(frame)
+
+
+def measure(name, analyze, frame, repeat):
+    analyze(frame)
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        analyze(frame)
+    per_tick = (time.perf_counter() - started_at) / repeat * 1000
+    print(f'{name:>12}: {per_tick:.3f} мс/такт ({len(frame)} сетей)')
+    return per_tick
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--networks', type=int, default=1000)
+    parser.add_argument('--adapters', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    frame = make_frame(args.networks, args.adapters)
+    scalar = measure('per network', per_network, frame, max(args.repeat // 20, 1))
+    batch = measure('vectorized', vectorized, frame, args.repeat)
+    print(f'Ускорение: {scalar / batch:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
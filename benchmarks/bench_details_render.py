@@ -0,0 +1,78 @@
+"""
+Время перерисовки графика DetailsPage на кадр: полная перерисовка (как было до TrendPlot)
+против инкрементальной с кэшированным фоном. Рисует в Agg, дисплей не нужен.
+
+    python -m benchmarks.bench_details_render --frames 200
+"""
+import argparse
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from utils.trend_plot import ANNOTATION_MAP, TrendPlot
+
+
+def make_frames(count, history_size=8, seed=0):
+    rnd = np.random.default_rng(seed)
+    values = np.cumsum(rnd.normal(0, 3, count + history_size)) - 60
+    verdicts = list(ANNOTATION_MAP)
+    return [(values[i:i + history_size], verdicts[i % len(verdicts)], i % 3 == 0, i % 5 == 0)
+            for i in range(count)]
+
+
+def full_redraw(plot, canvas, frames):
+    """Прежний путь: линия и надписи пересоздаются, холст перерисовывается целиком."""
+    ax = plot.ax
+    line = annotation = None
+    for values, verdict, exceeded, jump in frames:
+        if line is not None:
+            line.remove()
+        if annotation is not None:
+            annotation.remove()
+        line, = ax.plot(np.arange(8 - len(values), 8), list(values), marker='o', color='white')
+        extra = []
+        if exceeded:
+            extra.append(ax.annotate("Превышение разностного порога адаптеров", xy=(0, -3), color="yellow",
+                                     fontsize=10, ha="left", va="center", fontfamily="monospace"))
+        if jump:
+            extra.append(ax.annotate("Резкий скачок сигнала", xy=(0, -9), color="red",
+                                     fontsize=10, ha="left", va="center", fontfamily="monospace"))
+        props = ANNOTATION_MAP[verdict]
+        annotation = ax.annotate(props["text"], xy=(7.5, -50), color=props["color"], fontsize=props["size"],
+                                 ha="center", va="center", fontfamily="monospace")
+        canvas.draw()
+        for artist in extra:
+            artist.remove()
+
+
+def blitted(plot, canvas, frames):
+    for values, verdict, exceeded, jump in frames:
+        plot.update(values, verdict, exceeded, jump)
+
+
+def measure(name, render, frames):
+    plot = TrendPlot()
+    canvas = FigureCanvasAgg(plot.fig)
+    plot.attach(canvas)
+    canvas.draw()
+    started_at = time.perf_counter()
+    render(plot, canvas, frames)
+    elapsed = time.perf_counter() - started_at
+    per_frame = elapsed / len(frames) * 1000
+    print(f'{name:>12}: {per_frame:.3f} мс/кадр ({len(frames)} кадров)')
+    return per_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+    frames = make_frames(args.frames)
+    full = measure('full redraw', full_redraw, frames)
+    blit = measure('blit', blitted, frames)
+    print(f'Ускорение: {full / blit:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
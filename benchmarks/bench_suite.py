@@ -0,0 +1,219 @@
+"""
+Набор бенчмарков конвейера на синтетических сканированиях: 10/100/1000 сетей × 1-8 адаптеров.
+Для каждой конфигурации меряются задержки этапов такта (разбор сканирования с ssid_update
+и интернированием, запись замеров, усреднение, сборка кадра, анализ, данные списка, график в Agg,
+список MainPage в Tk, если есть дисплей), пропускная способность потоков DataSync и пик памяти.
+Результат - JSON; с --compare сравнивается с прошлым прогоном и возвращает код 1 при регрессии.
+
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --networks 100 --adapters 2 --compare bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from data_sync import BARRIER_MODE, DataSync
+from utils import analysis
+from utils.path_loss import DistanceTables
+from utils.scan_backends import SimulatedBackend
+from utils.trend_plot import TrendPlot
+
+STAGES = ('parse', 'put', 'aggregate', 'frame', 'analysis', 'groups', 'graph', 'list')
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1000
+    return {
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+    }
+
+
+def make_list_page():
+    """MainPage без контроллера и сбора для замера update_list; None, если дисплея нет."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None, None
+    from main import MainPage
+
+    root.geometry("400x600")
+    page = MainPage(root, SimpleNamespace(distance_tables=None), None)
+    page.pack(fill="both", expand=True)
+    root.update()
+    return root, page
+
+
+class PipelineBench:
+    """Один такт конвейера, выполненный в одном потоке с замером каждого этапа."""
+
+    def __init__(self, networks, adapters, history_size=8, list_page=None):
+        self.backend = SimulatedBackend(adapters=adapters, access_points=networks, scan_time=0, jitter=0)
+        self.data_sync = DataSync(backend=self.backend, mode=BARRIER_MODE)
+        self.store = self.data_sync.avg_rssi_data
+        self.rows = [self.store.add_adapter() for _ in range(adapters)]
+        self.interfaces = self.backend.interfaces()
+        self.plot = TrendPlot(history_size=history_size)
+        self.canvas = FigureCanvasAgg(self.plot.fig)
+        self.plot.attach(self.canvas)
+        self.canvas.draw()
+        self.bssid = self.backend.access_points[0][1]
+        self.tables = DistanceTables(self.data_sync.networks, path=None)
+        self.list_page = list_page
+        if list_page is not None:
+            list_page.controller.distance_tables = self.tables
+        self.timings = {stage: [] for stage in STAGES}
+
+    def _measure(self, stage, function, *args, **kwargs):
+        started_at = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.timings[stage].append(time.perf_counter() - started_at)
+        return result
+
+    def tick(self):
+        readings = []
+        for iface in self.interfaces:
+            iface.scan()
+            scan_results = iface.scan_results()
+            readings.append(self._measure('parse', self.data_sync.parse_scan_results, scan_results))
+        started_at = time.perf_counter()
+        for row, rssi_dict in zip(self.rows, readings):
+            self.store.put(row, rssi_dict)
+        self.timings['put'].append(time.perf_counter() - started_at)
+        snapshot = self._measure('aggregate', self.store.aggregate)
+        self.store.clear_raw()
+        frame = self._measure('frame', self.data_sync.publish_frame, snapshot)
+        result = self._measure('analysis', analysis.FrameAnalysis, frame, tables=self.tables)
+        self._measure('groups', frame.groups)
+        verdict, jump, exceeded, _ = result.get(self.bssid) or ('uncertain', False, False, 0)
+        self._measure('graph', self.plot.update, frame.get(self.bssid), verdict, exceeded, jump)
+        if self.list_page is not None:
+            self._measure('list', self._render_list, frame)
+
+    def _render_list(self, frame):
+        self.list_page.update_list(frame)
+        self.list_page.update_idletasks()
+
+
+def threaded_ticks_per_second(networks, adapters, duration):
+    """Такты в секунду настоящих потоков DataSync (барьер, без пауз между тактами)."""
+    backend = SimulatedBackend(adapters=adapters, access_points=networks, scan_time=0, jitter=0)
+    data_sync = DataSync(backend=backend, mode=BARRIER_MODE)
+    subscription = data_sync.subscribe('bench', maxsize=1)
+    thread = threading.Thread(target=data_sync.start_collection, args=(0,), daemon=True)
+    thread.start()
+    data_sync.supervisor.wait_for_adapters()
+    # Первые такты уходят на подключение адаптеров
+    time.sleep(0.2)
+    first = data_sync.bus.last_frame.seq if data_sync.bus.last_frame else 0
+    time.sleep(duration)
+    last = data_sync.bus.last_frame.seq if data_sync.bus.last_frame else 0
+    data_sync.stop_collection()
+    data_sync.unsubscribe(subscription)
+    return (last - first) / duration
+
+
+def peak_memory(networks, adapters, ticks):
+    """Пик выделенной Python-памяти за ticks тактов конвейера (МБ)."""
+    tracemalloc.start()
+    bench = PipelineBench(networks, adapters)
+    for _ in range(ticks):
+        bench.tick()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def run_config(networks, adapters, ticks, duration, list_page):
+    bench = PipelineBench(networks, adapters, list_page=list_page)
+    bench.tick()  # прогрев
+    bench.timings = {stage: [] for stage in STAGES}
+    started_at = time.perf_counter()
+    for _ in range(ticks):
+        bench.tick()
+    elapsed = time.perf_counter() - started_at
+    result = {
+        'networks': networks,
+        'adapters': adapters,
+        'pipeline_ticks_per_sec': ticks / elapsed,
+        'threaded_ticks_per_sec': threaded_ticks_per_second(networks, adapters, duration),
+        'peak_memory_mb': peak_memory(networks, adapters, min(ticks, 10)),
+        'stages': {stage: percentiles(samples) for stage, samples in bench.timings.items() if samples},
+    }
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Этапы, p50 которых вырос больше чем на tolerance относительно baseline."""
+    previous = {(item['networks'], item['adapters']): item for item in baseline['results']}
+    regressions = []
+    for item in results:
+        old = previous.get((item['networks'], item['adapters']))
+        if old is None:
+            continue
+        for stage, stats in item['stages'].items():
+            old_stats = old['stages'].get(stage)
+            if old_stats and stats['p50_ms'] > old_stats['p50_ms'] * (1 + tolerance) and stats['p50_ms'] > 0.01:
+                regressions.append(f"{item['networks']} сетей × {item['adapters']} адаптеров, {stage}: "
+                                   f"{old_stats['p50_ms']:.3f} → {stats['p50_ms']:.3f} мс")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--networks', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--adapters', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--ticks', type=int, default=50, help='Тактов на конфигурацию')
+    parser.add_argument('--duration', type=float, default=1.0, help='Длительность замера потоков (в секундах)')
+    parser.add_argument('--no-tk', action='store_true', help='Не замерять отрисовку списка в Tk')
+    parser.add_argument('--output', help='Сохранить результаты в JSON')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON прошлого прогона для поиска регрессий')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Допустимый рост p50 этапа (доля)')
+    args = parser.parse_args()
+
+    root, list_page = (None, None) if args.no_tk else make_list_page()
+    results = []
+    for networks in args.networks:
+        for adapters in args.adapters:
+            result = run_config(networks, adapters, args.ticks, args.duration, list_page)
+            results.append(result)
+            stages = ', '.join(f"{stage} {stats['p50_ms']:.3f}" for stage, stats in result['stages'].items())
+            print(f"{networks:>5} сетей × {adapters} адаптеров: {result['pipeline_ticks_per_sec']:.0f} тактов/с "
+                  f"(потоки: {result['threaded_ticks_per_sec']:.0f}), память {result['peak_memory_mb']:.1f} МБ; "
+                  f"p50, мс: {stages}")
+    if root is not None:
+        root.destroy()
+
+    report = {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'tk': list_page is not None,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f'Регрессия: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Координатор нескольких сборщиков: принимает потоки /stream демонов (daemon.py),
+объединяет их в общие оценки по BSSID и отдает результат тем же HTTP API,
+поэтому GUI подключается к нему через main.py --connect. Состояние узлов (число кадров
+и возраст последнего) отдается по GET /nodes.
+Часы узлов должны быть синхронизированы (NTP): кадры сопоставляются по time.time().
+
+    python coordinator.py http://floor1:8765 http://floor2:8765 --port 8770
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from utils.coordinator import Coordinator
+from utils.launcher import add_metrics_arguments, configure_logging, create_reporter
+from utils.state_server import StateServer
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Wi-Fi RSSI Monitor: координатор сборщиков")
+    parser.add_argument("urls", nargs="+", help="Адреса демонов сборщиков")
+    parser.add_argument("--interval", type=float, default=1.0, help="Интервал такта (в секундах)")
+    parser.add_argument("--fusion-window", type=float, default=2.5,
+                        help="Окно, в котором учитываются кадры узлов (в секундах)")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес HTTP-сервера состояния")
+    parser.add_argument("--port", type=int, default=8770, help="Порт HTTP-сервера состояния")
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    configure_logging(args.log_level)
+    coordinator = Coordinator(args.urls, interval=args.interval, fusion_window=args.fusion_window)
+    reporter = create_reporter(args, coordinator.bus)
+    server = StateServer(coordinator, args.host, args.port)
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+
+    coordinator.start()
+    server.start()
+    if reporter is not None:
+        reporter.start()
+    host, port = server.address[:2]
+    logger.info('Сервер состояния: http://%s:%s, узлов: %d', host, port, len(coordinator.nodes))
+    while not stopping.wait(1.0):
+        pass
+
+    logger.info('Остановка координатора')
+    server.stop()
+    coordinator.stop()
+    if reporter is not None:
+        reporter.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Сбор RSSI без GUI. Состояние отдается по HTTP на localhost (см. utils/state_server.py),
+GUI подключается к демону через main.py --connect http://127.0.0.1:8765.
+
+    python daemon.py --simulate --port 8765
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from utils.launcher import CollectionRunner, add_collection_arguments, configure_logging
+from utils.state_server import DEFAULT_PORT, StateServer
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Wi-Fi RSSI Monitor: сбор без GUI")
+    add_collection_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес HTTP-сервера состояния")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Порт HTTP-сервера состояния")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    configure_logging(args.log_level)
+    runner = CollectionRunner(args)
+    server = StateServer(runner.data_sync, args.host, args.port)
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+
+    runner.start()
+    server.start()
+    host, port = server.address[:2]
+    logger.info('Сервер состояния: http://%s:%s', host, port)
+    while not stopping.wait(1.0):
+        pass
+
+    logger.info('Остановка сбора')
+    server.stop()
+    runner.stop()
+
+
+if __name__ == "__main__":
+    main()
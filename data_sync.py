@@ -1,185 +1,246 @@
-import re
+import logging
 import threading
-from collections import deque, defaultdict
-import copy
 
+from utils.adapter_supervisor import AdapterSupervisor
+from utils.data_bus import DataBus, Frame
 from utils.get_ifaces import IfacesProvider
+from utils.metrics import REGISTRY, timed_lock
+from utils.network_index import NetworkIndex
+from utils.rssi_store import RssiStore
 
 
 import time
 from pywifi import const
 
-from utils.ssid_update import ssid_update
+
+BARRIER_MODE = 'barrier'
+ASYNC_MODE = 'async'
+# Подряд неудачных сканирований, после которых поток адаптера завершается, и первая пауза между попытками
+MAX_SCAN_FAILURES = 3
+SCAN_RETRY_DELAY = 0.5
+
+logger = logging.getLogger(__name__)
+
+SCAN_SECONDS = REGISTRY.histogram('rssi_scan_duration_seconds', 'Длительность сканирования адаптера',
+                                  ('adapter',))
+SCAN_FAILURES = REGISTRY.counter('rssi_scan_failures_total', 'Сканирований, прерванных отключением адаптера',
+                                 ('adapter',))
+BARRIER_WAIT_SECONDS = REGISTRY.histogram('rssi_barrier_wait_seconds', 'Ожидание на барьере такта',
+                                          ('thread',))
+AGGREGATION_SECONDS = REGISTRY.histogram('rssi_aggregation_seconds', 'Усреднение замеров такта', ('mode',))
+CONDITION_WAIT_SECONDS = REGISTRY.histogram('rssi_condition_wait_seconds',
+                                            'Ожидание захвата блокировки DataSync.condition')
+CONDITION_HOLD_SECONDS = REGISTRY.histogram('rssi_condition_hold_seconds',
+                                            'Удержание блокировки DataSync.condition')
+TICKS = REGISTRY.counter('rssi_ticks_total', 'Опубликованных кадров тактов')
 
 
 class DataSync:
+    """
+    Сбор RSSI с нескольких адаптеров.
+    В режиме 'barrier' адаптеры сканируют синхронно и каждый такт ждут друг друга на барьере.
+    В режиме 'async' каждый адаптер сканирует в своем темпе, а такт усредняет
+    замеры, пришедшие за последние fusion_window секунд.
+    Каждый такт публикуется в шину bus неизменяемым кадром; потребители получают кадры
+    через subscribe() и не держат блокировку сборщика.
+    """
+
     condition = threading.Condition()
 
-    def __init__(self, interfaces=None, avg_buffer_size=8):
-        if not interfaces:
-            interfaces = []
-        self.interfaces = interfaces
-        # self.rssi_data = {i: deque(maxlen=rssi_buffer_size) for i in range(len(interfaces))}
-        self.rssi_data = {i: defaultdict(int) for i in range(len(interfaces))}
-        self.avg_rssi_data = defaultdict(lambda: deque(maxlen=avg_buffer_size))
+    def __init__(self, avg_buffer_size=8, backend=None, mode=BARRIER_MODE, fusion_window=3.0, signal_filter=None,
+                 stats_window=None, fusion=None):
+        if mode not in (BARRIER_MODE, ASYNC_MODE):
+            raise ValueError(f'Неизвестный режим сбора: {mode}')
+        self.backend = backend
+        self.mode = mode
+        self.fusion_window = fusion_window
+        self.interval = 1
+        # Точки доступа интернируются по BSSID, дальше конвейер работает с целочисленными id
+        self.networks = NetworkIndex()
+        # Замеры адаптеров за такт и история средних хранятся в одном кольцевом буфере,
+        # средние такта перед записью в историю проходят через signal_filter (если задан).
+        # Без fusion в такт попадают только сети, видимые всеми адаптерами
+        self.avg_rssi_data = RssiStore(history=avg_buffer_size, networks=self.networks, signal_filter=signal_filter,
+                                       stats_window=stats_window, fusion=fusion)
         self.last_rssi_snapshot = None
-        self.barrier = threading.Barrier(len(interfaces) + 1)
+        self.bus = DataBus()
+        self._frame_seq = 0
+        self.barrier = threading.Barrier(1)
         # self.condition = threading.Condition()
-        self.actual_adapters = len(interfaces)
-        self.is_only_init = True
+        # Потоки адаптеров запускаются и останавливаются по одному при подключении/извлечении
+        self.supervisor = AdapterSupervisor(self)
         self.run_adapters = True
         self.low_precision = False
+        # Необязательная запись сырых сканирований на диск (ScanRecorder)
+        self.recorder = None
+
+    @property
+    def interfaces(self):
+        return self.supervisor.interfaces
 
     def start_collection(self, interval=1):
         """
         Запускает сбор данных с интерфейсов.
         :param interval: Интервал между итерациями сбора (в секундах).
         """
+        self.interval = interval
+        self.supervisor.start()
 
+        while self.run_adapters:
+            if not self.supervisor.workers:
+                logger.warning('Все адаптеры были изъяты, ожидание подключения')
+                self.clear_history()
+                self.supervisor.wait_for_adapters()
+                continue
 
-        while True:
-            if self.is_only_init:
-                print('Запускаются потоки для адаптеров')
-                self.is_only_init = False
-                threads = []
-                for i, iface in enumerate(self.interfaces):
-                    t = threading.Thread(target=self.collect_rssi_thread, args=(iface, i))
-                    threads.append(t)
-                    t.start()
-
-
-            # print(self.avg_rssi_data)
             time.sleep(interval)
-            print('В это же время я прямо сейчас тут')
-            print('Количество потоков вообще:', len(threading.enumerate()))
-            temp_actual_adapters_threads = []
-            for t in threading.enumerate():
-                match = re.search(r'\((.*?)\)', t.name)
-                if match:
-                    thread_name = match.group(1)
-                    if thread_name == 'collect_rssi_thread':
-                        temp_actual_adapters_threads.append(t)
-
-            interfaces = IfacesProvider.get_ifaces()
-
-            if len(temp_actual_adapters_threads) == 0:
-                print('Все адаптеры были изъяты, проивзодится ожидание методом пуллинга')
-                for ssid in self.avg_rssi_data:
-                    del self.avg_rssi_data[ssid]
-                print('Удалены данные о rssi')
-                while not len(IfacesProvider.get_ifaces()):
-                    with self.condition:
-                        print('Еще ждем...')
-                        self.condition.notify()
-                    time.sleep(1)
-                self.run_adapters = False
-                try:
-                    self.barrier.abort()
-                except threading.BrokenBarrierError:
-                    print('Барьер уже был сломан.')
-                for t in temp_actual_adapters_threads:
-                    t.join()  # Дожидаемся завершения всех потоков
-                print('Старые потоки для адаптеров завершены')
-                temp_actual_adapters_threads.clear()
-                self.__init__(interfaces)
-                if len(interfaces) == 1:
-                    self.low_precision = True
-                print('Атрибуты класса переинициализированы')
+
+            with self.locked():
+                # Усредняем замеры по адаптерам и обновляем историю,
+                # снимок замеров - это сам заполненный буфер, без копирования
+                with AGGREGATION_SECONDS.time(mode=self.mode):
+                    if self.mode == ASYNC_MODE:
+                        snapshot = self.avg_rssi_data.fuse(self.fusion_window)
+                    else:
+                        snapshot = self.avg_rssi_data.aggregate()
+                if snapshot is not None:
+                    self.last_rssi_snapshot = snapshot
+                    self.condition.notify()  # Уведомляем о новых данных
+            if snapshot is not None:
+                self.publish_frame(snapshot)
+            if self.mode == ASYNC_MODE:
                 continue
-            elif len(temp_actual_adapters_threads) != len(interfaces):
-                print(temp_actual_adapters_threads, interfaces, sep='\n')
-                print('Какие-то адаптеры еще остались, поэтому попробуем еще поработать')
-                self.run_adapters = False
-                try:
-                    self.barrier.abort()
-                except threading.BrokenBarrierError:
-                    print('Барьер уже был сломан.')
-                for t in temp_actual_adapters_threads:
-                    t.join()  # Дожидаемся завершения всех потоков
-                print('Старые потоки для адаптеров завершены')
-                temp_actual_adapters_threads.clear()
-                self.__init__(interfaces)
-                if len(interfaces) == 1:
-                    self.low_precision = True
-                print('Атрибуты класса переинициализированы')
+            self.avg_rssi_data.clear_raw()
+            logger.debug('Замеры собраны и обработаны, адаптеры могут начать новую итерацию')
+            try:
+                self.wait_barrier('collector')
+            except threading.BrokenBarrierError:
+                # Барьер пересоздан под новый набор адаптеров
                 continue
 
-            iface_count = len(self.interfaces)
-            all_ssids = [set(self.rssi_data[i].keys()) for i in range(iface_count)]
-            common_ssids = set.intersection(*all_ssids)
-            rssi_values = defaultdict(list)
-            for i in range(iface_count):
-                for ssid in common_ssids:
-                    rssi = self.rssi_data[i][ssid]
-                    rssi_values[ssid].append(rssi)
-            avg_rssi = {ssid: sum(values) / len(values) for ssid, values in rssi_values.items()}
-            # print('Нижний уровень готов записать данные для верхнего')
-            with self.condition:
-                # print('Нижний уровень начал запись данных')
-
-                self.last_rssi_snapshot = copy.deepcopy(self.rssi_data)
-
-                # Обновляем avg_rssi_data
-                for ssid, new_avg in avg_rssi.items():
-                    # Добавляем новое среднее значение.
-                    self.avg_rssi_data[ssid].append(new_avg)
-
-                # Удаляем устройства, которые больше не существуют в avg_rssi
-                devices_to_remove = [ssid for ssid in self.avg_rssi_data if ssid not in avg_rssi]
-
-                for ssid in devices_to_remove:
-                    del self.avg_rssi_data[ssid]
-                self.condition.notify()  # Уведомляем о новых данных
-            for values in self.rssi_data.values():
-                values.clear()
-            # print('Замеры собраны и обработаны, адаптеры могут начать новую итерацию получения замеров!')
-            self.barrier.wait()
+    def locked(self):
+        """Захват condition с замером ожидания и удержания блокировки."""
+        return timed_lock(self.condition, CONDITION_WAIT_SECONDS, CONDITION_HOLD_SECONDS)
 
-    def collect_rssi_thread(self, iface, index):
-        while self.run_adapters:
-            try:
-                rssi_dict = self.get_rssi_readings(iface)
-                if not rssi_dict:
-                    print(f'Адаптер {iface} завершает работу.')
+    def wait_barrier(self, thread):
+        """Ожидание остальных потоков на барьере такта с замером времени ожидания."""
+        started_at = time.perf_counter()
+        try:
+            self.barrier.wait()
+        finally:
+            BARRIER_WAIT_SECONDS.observe(time.perf_counter() - started_at, thread=thread)
+
+    def subscribe(self, name, maxsize=4):
+        """Подписка на кадры тактов: ограниченная очередь, старые кадры вытесняются."""
+        return self.bus.subscribe(name, maxsize)
+
+    def unsubscribe(self, subscription):
+        self.bus.unsubscribe(subscription)
+
+    def publish_frame(self, snapshot):
+        """Собирает кадр такта из хранилища и рассылает подписчикам."""
+        self._frame_seq += 1
+        frame = self.avg_rssi_data.frame(self._frame_seq, snapshot, self.low_precision)
+        self.bus.publish(frame)
+        TICKS.inc()
+        return frame
+
+    def clear_history(self):
+        """Удаляет историю и замеры, когда не осталось ни одного адаптера, и рассылает пустой кадр."""
+        with self.locked():
+            self.avg_rssi_data.clear()
+            self.last_rssi_snapshot = None
+            self.condition.notify()
+        self._frame_seq += 1
+        frame = Frame.empty(self._frame_seq, self.networks, self.avg_rssi_data.history_size)
+        self.bus.publish(frame)
+        logger.info('Удалены данные о rssi')
+        return frame
+
+    def stop_collection(self):
+        self.run_adapters = False
+        self.supervisor.stop()
+
+    def reset_barrier(self, adapters):
+        """Заменяет барьер на новый под adapters потоков; ждущие на старом получают BrokenBarrierError."""
+        old_barrier = self.barrier
+        self.barrier = threading.Barrier(adapters + 1)
+        old_barrier.abort()
+
+    def scan_backend(self):
+        return self.backend or IfacesProvider.BACKEND
+
+    def get_ifaces(self):
+        """Возвращает адаптеры выбранного источника сканирования (по умолчанию pywifi)."""
+        if self.backend is None:
+            return IfacesProvider.get_ifaces()
+        return self.backend.interfaces()
+
+    def collect_rssi_thread(self, iface, index, stop_event):
+        failures = 0
+        while self.run_adapters and not stop_event.is_set():
+            started_at = time.monotonic()
+            rssi_dict = self.get_rssi_readings(iface)
+            if rssi_dict is None:
+                # Сканирование не удалось; пустой словарь (сетей не видно) - обычный такт
+                failures += 1
+                if failures >= MAX_SCAN_FAILURES:
+                    logger.info('Адаптер %s завершает работу после %d неудачных сканирований', iface, failures)
                     break
+                stop_event.wait(SCAN_RETRY_DELAY * 2 ** (failures - 1))
+                continue
+            failures = 0
 
-                for ssid, rssi in rssi_dict.items():
-                    self.rssi_data[index][ssid] = rssi
+            if stop_event.is_set():
+                # Адаптер уже отключен супервизором, его строка может принадлежать другому адаптеру
+                break
+            self.avg_rssi_data.put(index, rssi_dict)
+            if self.recorder is not None:
+                self.recorder.record(iface.name(), rssi_dict)
 
-                # Барьер
-                self.barrier.wait()
+            if self.mode == ASYNC_MODE:
+                # Адаптер не ждет остальных, но сканирует не чаще раза в interval секунд
+                stop_event.wait(started_at + self.interval - time.monotonic())
+                continue
 
+            # Барьер
+            try:
+                self.wait_barrier(iface.name())
             except threading.BrokenBarrierError:
-                print(f'Барьер сломан. Поток {iface} завершает работу.')
-                break
-        print(f'Поток {iface} завершён.')
+                # Набор адаптеров изменился, продолжаем с новым барьером
+                continue
+        logger.info('Поток %s завершён', iface)
 
     def safe_scan(self, iface):
         """Проверяет статус адаптера и выполняет безопасное сканирование."""
-        # print(f'Статус ({iface.name()}):', iface.status())
         try:
             while self.run_adapters and iface.status() == const.IFACE_SCANNING:
-                print(f'Пропуск хода для {iface.name()}')
+                logger.debug('Пропуск хода для %s', iface.name())
                 time.sleep(0.1)
             else:
-                # print('Проверка цикла')
                 if not self.run_adapters:
-                    print('Мне запретили работать с адаптером, я ухожу')
+                    logger.debug('Сбор остановлен, сканирование %s отменено', iface.name())
                     return
             iface.scan()
         except ConnectionRefusedError:
-            print('Я словил ошибку, все хорошо!!!')
             raise ConnectionRefusedError(f'Адаптер {iface} был неожиданно отключен')
 
     def get_rssi_readings(self, iface):
-        rssi_value = None
+        name = iface.name()
+        started_at = time.perf_counter()
         try:
             self.safe_scan(iface)
             scan_results = iface.scan_results()
         except ConnectionRefusedError as er:
-            print(f'Внешний слой поймал искусственную ошибку: {er}')
+            SCAN_FAILURES.inc(adapter=name)
+            logger.warning('%s', er)
             return None
-        wifi_dict = {ssid_update(result.ssid): result.signal for result in scan_results if result.ssid}
-        # print(len(wifi_dict))
-        # result_dict = {ssid: wifi_dict[ssid]} if ssid and ssid in wifi_dict else (wifi_dict if ssid is None else {})
-        return wifi_dict
+        SCAN_SECONDS.observe(time.perf_counter() - started_at, adapter=name)
+        return self.parse_scan_results(scan_results)
+
+    def parse_scan_results(self, scan_results):
+        """Переводит результаты сканирования в словарь {id сети: rssi}."""
+        # Ключ - BSSID: точки доступа одной сети не перезаписывают друг друга
+        intern = self.networks.intern
+        return {intern(result.bssid, result.ssid, result.freq): result.signal
+                for result in scan_results if result.ssid and result.bssid}
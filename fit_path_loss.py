@@ -0,0 +1,79 @@
+"""
+Подбор моделей затухания точек доступа по записанному сеансу (см. main.py --record).
+Файл разметки - CSV со строками bssid,distance,start,end: на интервале [start, end] секунд
+от начала сеанса устройство находилось в distance метрах от точки доступа.
+P и N каждой точки доступа подбираются методом наименьших квадратов по всем ее замерам
+и сохраняются в файл моделей, по которому GUI считает расстояния.
+
+    python fit_path_loss.py records/ labels.csv --output ~/.config/rssi_analyzer/path_loss.json
+"""
+import argparse
+import csv
+from collections import defaultdict
+
+import numpy as np
+
+from utils.network_index import normalize_bssid
+from utils.path_loss import MODELS_PATH, DistanceTables, fit_path_loss
+from utils.scan_recorder import RecordedSession
+
+
+def read_labels(path):
+    """Разметка {bssid: [(расстояние, начало, конец)]}; строки с '#' в начале пропускаются."""
+    labels = defaultdict(list)
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.reader(file):
+            if not row or row[0].startswith('#') or row[0] == 'bssid':
+                continue
+            bssid, distance, start, end = row[:4]
+            labels[normalize_bssid(bssid)].append((float(distance), float(start), float(end)))
+    return labels
+
+
+def collect_samples(session, intervals, bssid):
+    """Расстояния и RSSI всех замеров точки доступа на размеченных интервалах."""
+    network_id = session.networks.get(bssid)
+    if network_id is None:
+        return np.zeros(0), np.zeros(0)
+    distances, values = [], []
+    for distance, start, end in intervals:
+        _, _, rssi = session.readings(network_id, session.start_time + start, session.start_time + end)
+        distances.append(np.full(len(rssi), distance))
+        values.append(rssi)
+    return np.concatenate(distances), np.concatenate(values)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Подбор моделей затухания по размеченному сеансу")
+    parser.add_argument("path", help="Каталог сеанса или файл сегмента .rssi")
+    parser.add_argument("labels", help="CSV разметки: bssid,distance,start,end")
+    parser.add_argument("--output", default=MODELS_PATH, help="Файл моделей (дополняется)")
+    parser.add_argument("--min-samples", type=int, default=20, help="Минимум замеров для подбора")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    session = RecordedSession(args.path)
+    tables = DistanceTables(session.networks, args.output)
+    for bssid, intervals in read_labels(args.labels).items():
+        if session.networks.get(bssid) is None:
+            print(f'{bssid}: точка доступа не встречается в записи сеанса, проверьте разметку')
+            continue
+        distances, rssi = collect_samples(session, intervals, bssid)
+        if len(rssi) < args.min_samples:
+            print(f'{bssid}: замеров {len(rssi)}, нужно не меньше {args.min_samples}')
+            continue
+        try:
+            model = fit_path_loss(distances, rssi)
+        except ValueError as e:
+            print(f'{bssid}: {e}')
+            continue
+        tables.set_model(bssid, model)
+        print(f'{bssid}: P = {model.P:.1f} дБм, N = {model.N:.2f}, СКО остатков {model.residual:.1f} дБ, '
+              f'замеров {model.samples}')
+    tables.save()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,41 @@
+import argparse
+import logging
 import threading
 import tkinter as tk
-from tkinter import Canvas, Frame, Scrollbar, messagebox
+from tkinter import Frame, messagebox
 
-from data_sync import DataSync
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
-import numpy as np
 
-from utils.get_distance import get_distance
-from utils.get_ifaces import IfacesProvider
+from utils.icon_cache import IconCache
+from utils.launcher import CollectionRunner, add_collection_arguments, configure_logging, create_reporter
 
+from utils import analysis
 from utils.options import options, options_dict
+from utils.path_loss import DistanceTables
+from utils.remote_client import RemoteDataSync
+from utils.render_scheduler import RenderScheduler
+from utils.trend_plot import TrendPlot
 from utils.verdicts import verdicts
+from utils.virtual_list import VirtualList
+
+logger = logging.getLogger(__name__)
 
 # Путь к иконке Wi-Fi
 ICON_PATH = "wifi_icon.png"  # Замените на ваш путь к иконке Wi-Fi
+# Максимальная частота перерисовки страниц
+RENDER_FPS = 10
 
 
 class WiFiApp(tk.Tk):
     def __init__(self, data_sync):
         super().__init__()
         self.data_sync = data_sync
+        # Модели затухания точек доступа (fit_path_loss.py) и таблицы расстояний по ним
+        self.distance_tables = DistanceTables(data_sync.networks)
         self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.current_page = None
-        self.selected_ssid = None
+        self.selected_bssid = None
 
         # Настройка окна
         self.title("Wi-Fi RSSI Monitor")
@@ -57,7 +69,7 @@ class WiFiApp(tk.Tk):
             )
         self.pages[page_name].place(relwidth=1, relheight=1)
 
-    def show_page(self, page_name, ssid=None):
+    def show_page(self, page_name, bssid=None):
         """
         Переключает видимость между страницами.
         """
@@ -73,11 +85,11 @@ class WiFiApp(tk.Tk):
         page = self.pages[page_name]
         page.tkraise()
 
-        self.selected_ssid = ssid
-        if hasattr(page, "ssid"):
-            if not self.selected_ssid:
-                raise Exception("ssid не был передан, хотя вроде как вызывается detailpage")
-            page.ssid = self.selected_ssid
+        self.selected_bssid = bssid
+        if hasattr(page, "bssid"):
+            if not self.selected_bssid:
+                raise Exception("bssid не был передан, хотя вроде как вызывается detailpage")
+            page.bssid = self.selected_bssid
 
         if hasattr(page, "start_update"):
             page.start_update()
@@ -91,24 +103,87 @@ class WiFiApp(tk.Tk):
         self.resizable(False, False)
 
 
+class NetworkRow(Frame):
+    """
+    Строка списка сетей. Хранит прямые ссылки на изменяемые виджеты,
+    чтобы при перепривязке к другой сети менять только их текст.
+    """
+
+    def __init__(self, parent, icon, open_details):
+        super().__init__(parent, bg="#0D0D0D")
+        self.ssid = None
+
+        # Контейнер для элемента
+        frame = Frame(self, bg="#000000", pady=5)
+        frame.pack(fill="both", expand=True, padx=10, pady=5)
+
+        # Иконка Wi-Fi
+        if icon is not None:
+            self.icon_label = tk.Label(frame, image=icon, bg="#000000")
+            self.icon_label.image = icon
+            self.icon_label.pack(side="left", padx=10)
+
+        # Текстовая информация
+        self.ssid_label = tk.Label(
+            frame, font=("Arial", 12), fg="#FFFFFF", bg="#000000"
+        )
+        self.ssid_label.pack(anchor="e", padx=10)
+
+        self.rssi_label = tk.Label(
+            frame,
+            font=("Arial", 12),
+            fg="#007FD0",
+            bg="#000000",
+        )
+        self.rssi_label.pack(anchor="w")
+
+        self.verdict_label = tk.Label(
+            frame,
+            font=("Arial", 10),
+            fg="#FFFFFF",
+            bg="#000000",
+        )
+        self.verdict_label.pack(anchor="w")
+
+        # Кнопка для подробностей
+        self.details_button = tk.Button(
+            frame,
+            text="Подробнее",
+            font=("Arial", 10),
+            bg="#007FD0",
+            fg="#0D0D0D",
+            borderwidth=0,
+            highlightthickness=0,
+            command=lambda: open_details(self.ssid),
+        )
+        self.details_button.pack(anchor="e", padx=10)
+
+
 class MainPage(Frame):
+    # Высота строки списка сетей, пикселей
+    ROW_HEIGHT = 110
+
     def __init__(self, parent, controller, data_sync):
         super().__init__(parent, bg="#0D0D0D")
         self.controller = controller
         self.data_sync = data_sync
 
+        # Иконки всех уровней сигнала строятся один раз и разделяются всеми строками
+        self.icons = IconCache.preload_tiers(ICON_PATH) if ICON_PATH else None
+
+        self.sort_by_rssi = tk.BooleanVar(value=False)
         self.create_widgets()
 
         # Настраиваем прокрутку колесиком
-        self.scroll_canvas.bind_all("<MouseWheel>", self.on_mouse_wheel)  # Windows
-        self.scroll_canvas.bind_all("<Button-4>", self.on_mouse_wheel)  # Linux вверх
-        self.scroll_canvas.bind_all("<Button-5>", self.on_mouse_wheel)  # Linux вниз
+        self.network_list.bind_all("<MouseWheel>", self.on_mouse_wheel)  # Windows
+        self.network_list.bind_all("<Button-4>", self.on_mouse_wheel)  # Linux вверх
+        self.network_list.bind_all("<Button-5>", self.on_mouse_wheel)  # Linux вниз
 
-        # Храним виджеты для обновления
-        self.items = {}
+        # Сильнейшая точка доступа каждой сети, ее открывает кнопка "Подробнее"
+        self.best_bssids = {}
 
-        self.update_thread = None
-        self.running = False
+        self.subscription = None
+        self.scheduler = None
 
     def create_widgets(self):
         # Заголовок приложения
@@ -121,147 +196,120 @@ class MainPage(Frame):
         )
         title.pack(pady=10, fill="x")
 
-        # Создаем прокручиваемую область
-        self.scroll_canvas = Canvas(self, bg="#0D0D0D", highlightthickness=0)
-        self.scroll_frame = Frame(self.scroll_canvas, bg="#0D0D0D")
-        self.scrollbar = Scrollbar(
-            self, orient="vertical", command=self.scroll_canvas.yview, background="#007FD0", highlightthickness=0,
-            borderwidth=0
+        sort_toggle = tk.Checkbutton(
+            self,
+            text="Сортировать по RSSI",
+            variable=self.sort_by_rssi,
+            command=self.on_sort_toggle,
+            font=("Arial", 10),
+            fg="#007FD0",
+            bg="#0D0D0D",
+            selectcolor="#0D0D0D",
+            activebackground="#0D0D0D",
+            activeforeground="#007FD0",
+            highlightthickness=0,
         )
-        self.scroll_canvas.configure(yscrollcommand=self.scrollbar.set)
+        sort_toggle.pack(anchor="w", padx=10)
 
-        # Размещение виджетов
-        self.scrollbar.pack(side="right", fill="y")
-        self.scroll_canvas.pack(side="left", fill="both", expand=True)
-        self.scroll_window = self.scroll_canvas.create_window(
-            (0, 0), window=self.scroll_frame, anchor="nw"
+        # Виджеты создаются только для видимых строк и переиспользуются при прокрутке
+        self.network_list = VirtualList(
+            self, self.create_list_item, self.bind_list_item, row_height=self.ROW_HEIGHT
         )
+        self.network_list.pack(fill="both", expand=True)
 
-        # Привязка события изменения размеров
-        self.scroll_frame.bind("<Configure>", self.on_frame_configure)
+    def on_sort_toggle(self):
+        """Включает или выключает сортировку списка по убыванию RSSI."""
+        self.network_list.set_sort_key(self.rssi_sort_key if self.sort_by_rssi.get() else None)
 
-    def on_frame_configure(self, event=None):
-        """
-        Обновляем область прокрутки, когда содержимое Frame изменяется.
-        """
-        # print('Запустился frame_config для main')
-        self.scroll_canvas.configure(scrollregion=self.scroll_canvas.bbox("all"))
-        self.scroll_canvas.itemconfig(self.scroll_window, width=self.scroll_canvas.winfo_width())
+    @staticmethod
+    def rssi_sort_key(item):
+        bssid, avg_rssi, count, verdict, distance = item
+        return -avg_rssi
 
     def on_mouse_wheel(self, event):
         """
         Обрабатывает прокрутку колесиком мыши.
         """
-        print('Крутится колесо мыши в main page')
         if event.num == 4 or event.delta > 0:  # Вверх (Linux или Windows)
-            self.scroll_canvas.yview_scroll(-1, "units")
+            self.network_list.scroll(-1)
         elif event.num == 5 or event.delta < 0:  # Вниз (Linux или Windows)
-            self.scroll_canvas.yview_scroll(1, "units")
+            self.network_list.scroll(1)
 
     def start_update(self):
         """Запускает обновление интерфейса."""
-        self.running = True
-        self.update_thread = threading.Thread(target=self.update_interface)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        self.subscription = self.data_sync.subscribe("MainPage")
+        # Кадры применяются в потоке Tk, не чаще RENDER_FPS раз в секунду
+        self.scheduler = RenderScheduler(self, self.subscription, self.update_list, max_fps=RENDER_FPS)
+        self.scheduler.start()
 
     def stop_update(self):
         """Останавливает обновление интерфейса."""
-        self.running = False
-
-    def update_interface(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+        if self.subscription is not None:
+            self.data_sync.unsubscribe(self.subscription)
+            self.subscription = None
+
+    def update_list(self, frame):
         """
-        Обновление интерфейса при появлении новых данных.
+        Обновляет список сетей по кадру такта.
+        Точки доступа одного SSID показываются одной строкой с сильнейшим сигналом.
+        Перепривязываются только видимые строки, данные которых изменились.
         """
-        while self.running:
-            with self.data_sync.condition:
-                self.data_sync.condition.wait()  # Ждем новые данные
-
-                if not self.running:
-                    break
-                # print("MainPage пошел обновляться")
-                # Обновляем список устройств
-                self.update_list()
-
-    def update_list(self):
-        """
-        Обновляет список устройств на основе avg_rssi_data.
-        """
-        # Пройдем по текущим данным
-        for ssid, rssis in self.data_sync.avg_rssi_data.items():
-            avg_rssi = rssis[-1]  # Берем последнее среднее значение RSSI
-
-            # Если элемент уже существует, обновим его
-            if ssid in self.items:
-                self.update_list_item(self.items[ssid], ssid, avg_rssi)
-            else:
-                # Если элемента нет, создаем его
-                self.items[ssid] = self.create_list_item(ssid, avg_rssi)
-
-        # Удаляем лишние элементы, которых больше нет в данных
-        current_ssids = set(self.data_sync.avg_rssi_data.keys())
-        for ssid in list(self.items.keys()):
-            if ssid not in current_ssids:
-                self.items[ssid].destroy()
-                del self.items[ssid]
-
-    def create_list_item(self, ssid, avg_rssi):
+        # Группы SSID берутся из индекса сетей, вердикты считаются для всех сетей кадра разом
+        positions, counts = frame.group_leaders()
+        frame_analysis = analysis.FrameAnalysis(frame, tables=self.controller.distance_tables)
+        networks = frame.networks
+        ids = frame.ids[positions].tolist()
+        ssids = [networks.ssid(network_id) for network_id in ids]
+        bssids = [networks.bssid(network_id) for network_id in ids]
+        self.best_bssids = dict(zip(ssids, bssids))
+        trends = [analysis.TREND_CODES[code] for code in frame_analysis.trends[positions].tolist()]
+        distances = frame_analysis.distances[positions].tolist()
+        self.network_list.set_items({
+            ssid: (bssid, avg_rssi, count, trend, None if frame.low_precision else distance)
+            for ssid, bssid, avg_rssi, count, trend, distance in zip(ssids, bssids, frame.latest[positions].tolist(),
+                                                                    counts.tolist(), trends, distances)
+        })
+
+    def open_details(self, ssid):
+        """Открывает подробности сильнейшей точки доступа сети."""
+        bssid = self.best_bssids.get(ssid)
+        if bssid:
+            self.controller.show_page("DetailsPage", bssid)
+
+    def create_list_item(self, parent):
         """
-        Создает один элемент списка.
+        Создает пустую строку списка; данные в нее подставляет bind_list_item.
         """
-        # Контейнер для элемента
-        frame = Frame(self.scroll_frame, bg="#000000", pady=5)
-        frame.pack(fill="x", padx=10, pady=5)
-
-        # Иконка Wi-Fi
-        if ICON_PATH:
-            try:
-                icon = tk.PhotoImage(file=ICON_PATH)
-                icon_label = tk.Label(frame, image=icon, bg="#000000")
-                icon_label.image = icon  # Хранение ссылки, чтобы не удалялось
-                icon_label.pack(side="left", padx=10)
-            except Exception as e:
-                print(f"Ошибка загрузки иконки: {e}")
-
-        # Текстовая информация
-        ssid_label = tk.Label(
-            frame, text=ssid, font=("Arial", 12), fg="#FFFFFF", bg="#000000"
-        )
-        ssid_label.pack(anchor="e", padx=10)
-
-        rssi_label = tk.Label(
-            frame,
-            text=f"RSSI: {avg_rssi:.2f}",
-            font=("Arial", 12),
-            fg="#007FD0",
-            bg="#000000",
-        )
-        rssi_label.pack(anchor="w")
+        icon = self.icons[-1] if self.icons else None
+        return NetworkRow(parent, icon, self.open_details)
 
-        # Кнопка для подробностей
-        details_button = tk.Button(
-            frame,
-            text="Подробнее",
-            font=("Arial", 10),
-            bg="#007FD0",
-            fg="#0D0D0D",
-            borderwidth=0,
-            highlightthickness=0,
-            command=lambda: self.controller.show_page("DetailsPage", ssid),
-        )
-        details_button.pack(anchor="e", padx=10)
-
-        # Вернем контейнер элемента
-        return frame
-
-    def update_list_item(self, frame, ssid, avg_rssi):
+    def bind_list_item(self, row, ssid, item):
         """
-        Обновляет существующий элемент списка.
+        Привязывает строку к сети.
         """
-        for widget in frame.winfo_children():
-            if isinstance(widget, tk.Label):
-                if widget.cget("text").startswith("RSSI:"):
-                    widget.config(text=f"RSSI: {avg_rssi:.2f}")
+        bssid, avg_rssi, count, verdict, distance = item
+        if row.ssid != ssid:
+            row.ssid = ssid
+            row.ssid_label.config(text=ssid)
+        row.rssi_label.config(text=self.format_rssi(avg_rssi, count, distance))
+        row.verdict_label.config(text=f"Вердикт: {verdicts[verdict]}")
+        if self.icons:
+            icon = self.icons[IconCache.tier(avg_rssi)]
+            if row.icon_label.image is not icon:
+                row.icon_label.config(image=icon)
+                row.icon_label.image = icon
+
+    @staticmethod
+    def format_rssi(avg_rssi, count, distance=None):
+        text = f"RSSI: {avg_rssi:.2f}"
+        if distance is not None:
+            text += f", ~{distance:.1f} м"
+        if count > 1:
+            text += f" (точек доступа: {count})"
+        return text
 
 
 class DetailsPage(Frame):
@@ -269,10 +317,9 @@ class DetailsPage(Frame):
         super().__init__(parent, bg="#0D0D0D")
         self.controller = controller
         self.data_sync = data_sync
-        self.ssid = None
+        self.bssid = None
         self.annotation_type = "uncertain"
-        self.line = None
-        self.annotation = None
+        self.frame = None
 
         self.N = None
         self.window_size = 4
@@ -282,8 +329,8 @@ class DetailsPage(Frame):
 
         self.create_widgets()
 
-        self.update_thread = None
-        self.running = False
+        self.subscription = None
+        self.scheduler = None
 
     def on_window_size_entry_focus_out(self, event):
         value = event.widget.get()
@@ -340,75 +387,45 @@ class DetailsPage(Frame):
     def on_dropdown_select(self, selected_option):
         self.N = options_dict[selected_option]
 
-    def analyze_trend(self, last_values):
+    def analyze_trend(self, last_values, low_precision=False):
         """
         Анализирует тренд на основе последних значений.
+        :param low_precision: Режим пониженной точности кадра, из которого взяты значения.
         Возвращает одну из аннотаций: 'up', 'down', 'stationary' или 'uncertain'.
         """
-        if self.data_sync.low_precision:
-            self.annotation_type = "uncertain"
-            return self.annotation_type
-
-        if len(last_values) < 2 * self.window_size:
-            self.annotation_type = "uncertain"
-            return self.annotation_type
-
-        values_list = list(last_values)
-
-        # Разделяем окно на два перекрывающихся
-        window1 = values_list[-2 * self.window_size:-self.window_size]
-        window2 = values_list[-self.window_size:]
-
-        # Средние значения окон
-        avg1 = sum(window1) / len(window1)
-        avg2 = sum(window2) / len(window2)
-
-        # Анализируем изменения
-        if abs(avg1 - avg2) <= self.threshold:
-            self.annotation_type = "stationary"  # Малое изменение
-        elif avg1 < avg2:
-            self.annotation_type = "up"
-        else:
-            self.annotation_type = "down"
-
+        self.annotation_type = analysis.analyze_trend(
+            last_values, self.window_size, self.threshold, low_precision
+        )
         return self.annotation_type
 
-    def update_interface(self):
+    def update_interface(self, frame):
         """
-        Обновление интерфейса при появлении новых данных.
+        Обновление интерфейса по кадру такта. Вызывается в потоке Tk.
         """
-        while self.running:
-            with self.data_sync.condition:
-                self.data_sync.condition.wait()  # Ждем новые данные
-
-                if not self.running:
-                    break
-                print(f'Размер окна: {self.window_size}',
-                      f'Порог: {self.threshold}',
-                      f'Межинтерфейсный порог: {self.interface_threshold}',
-                      f'Скачковый порог: {self.jump_threshold}',
-                      f'Коэффициент N: {self.N}', sep='\n', end='\n\n')
-                # print("DetailPage пошел обновляться")
-                last_values = self.data_sync.avg_rssi_data.get(self.ssid, None)
-
-                if not last_values:
-                    self.running = False
-                    self.after(0, self.show_signal_loss_message)
-
-                annotation_type = "uncertain"
-                if last_values:
-                    annotation_type = self.analyze_trend(last_values)
-
-                self.update_graph(last_values, annotation_type)
-                if last_values:
-                    value_str = f"{last_values[-1]:.2f}"
-                    self.device_distance_label.config(
-                        text=f'Оценка расстояния (м): {get_distance(last_values[-1], N=self.N):.2f}' if not self.data_sync.low_precision else 'Режим пониженной точности')
-                else:
-                    value_str = "-"
-
-                self.device_rssi_label.config(text=f"RSSI: {value_str}")
-                self.verdict_label.config(text=f"Вердикт: {verdicts[self.annotation_type]}")
+        logger.debug('Размер окна: %s, порог: %s, межинтерфейсный порог: %s, скачковый порог: %s, '
+                     'коэффициент N: %s', self.window_size, self.threshold, self.interface_threshold,
+                     self.jump_threshold, self.N)
+        self.frame = frame
+        last_values = frame.get(self.bssid)
+
+        if last_values is None:
+            self.scheduler.stop()
+            self.after(0, self.show_signal_loss_message)
+
+        annotation_type = "uncertain"
+        if last_values is not None:
+            annotation_type = self.analyze_trend(last_values, frame.low_precision)
+
+        self.update_graph(last_values, annotation_type)
+        if last_values is not None:
+            value_str = f"{last_values[-1]:.2f}"
+            self.device_distance_label.config(
+                text=f'Оценка расстояния (м): {self.controller.distance_tables.distance(self.bssid, last_values[-1], self.N):.2f}' if not frame.low_precision else 'Режим пониженной точности')
+        else:
+            value_str = "-"
+
+        self.device_rssi_label.config(text=f"RSSI: {value_str}")
+        self.verdict_label.config(text=f"Вердикт: {verdicts[self.annotation_type]}")
 
     def show_signal_loss_message(self):
         messagebox.showinfo(
@@ -418,107 +435,23 @@ class DetailsPage(Frame):
         self.controller.show_page("MainPage")
 
     def compare_interfaces(self):
-        snapshot = self.data_sync.last_rssi_snapshot
-        if not snapshot or len(snapshot) <= 1:
-            return False
-        rssi_values = [snapshot[i].get(self.ssid) for i in snapshot]
-        if None in rssi_values:
-            return False
-        # print(rssi_values)
-        max_rssi = max(rssi_values)
-        min_rssi = min(rssi_values)
-        if abs(max_rssi - min_rssi) > self.interface_threshold:
-            return True
-        else:
+        if self.frame is None:
             return False
+        return analysis.spread_exceeded(self.frame.adapters_of(self.bssid), self.interface_threshold)
 
     def check_jump(self, last_values):
-        if not last_values:
-            return False
-        if len(last_values) < 2:
-            return False
-        if abs(last_values[-1] - last_values[-2]) > self.jump_threshold:
-            return True
-        else:
-            return False
+        return analysis.check_jump(last_values, self.jump_threshold)
 
     def update_graph(self, last_values, annotation_type="uncertain"):
         """
-        Обновляет данные графика.
+        Обновляет данные графика: меняются только линия и надписи, фон осей берется из кэша.
         """
-        if hasattr(self, "line") and self.line is not None:
-            self.line.remove()
-            self.line = None
-
-        if hasattr(self, "annotation") and self.annotation is not None:
-            self.annotation.remove()
-            self.annotation = None
-
-        if last_values:
-            x_data = np.arange(8 - len(last_values), 8)
-            y_data = list(last_values)
-            self.line, = self.ax.plot(x_data, y_data, marker='o', color='white')
-
-        if self.compare_interfaces():
-            if not hasattr(self, "threshold_annotation"):
-                # Добавляем надпись "Превышение разностного порога адаптеров"
-                self.threshold_annotation = self.ax.annotate(
-                    "Превышение разностного порога адаптеров",
-                    xy=(0, -3),
-                    color="yellow",
-                    fontsize=10,
-                    ha="left",
-                    va="center",
-                    fontfamily="monospace"
-                )
-        else:
-            # Удаляем надпись, если она есть
-            if hasattr(self, "threshold_annotation"):
-                self.threshold_annotation.remove()
-                del self.threshold_annotation
-
-        if self.check_jump(last_values):
-            if not hasattr(self, "jump_annotation"):
-                self.jump_annotation = self.ax.annotate(
-                    "Резкий скачок сигнала",
-                    xy=(0, -9),
-                    color="red",
-                    fontsize=10,
-                    ha="left",
-                    va="center",
-                    fontfamily="monospace"
-                )
-        else:
-            if hasattr(self, "jump_annotation"):
-                self.jump_annotation.remove()
-                del self.jump_annotation
-
-
-        if annotation_type:
-            x_position = 7.5
-            y_position = -50
-
-            annotation_map = {
-                "uncertain": {"text": "?", "color": "white", "size": 60},
-                "stationary": {"text": "≈", "color": "white", "size": 60},
-                "down": {"text": "↓", "color": "#FF073A", "size": 60},
-                "up": {"text": "↑", "color": "#39FF14", "size": 60},
-            }
-
-            if annotation_type in annotation_map:
-                props = annotation_map[annotation_type]
-                # Основная аннотация
-                self.annotation = self.ax.annotate(
-                    props["text"],
-                    xy=(x_position, y_position),
-                    color=props["color"],
-                    fontsize=props["size"],
-                    ha="center",
-                    va="center",
-                    fontfamily="monospace"
-                )
-
-        self.canvas.draw()
+        self.plot.update(
+            last_values,
+            annotation_type,
+            threshold_exceeded=self.compare_interfaces(),
+            jump=self.check_jump(last_values),
+        )
 
     def create_widgets(self):
         back_button = tk.Button(
@@ -536,32 +469,13 @@ class DetailsPage(Frame):
         graph_frame = tk.Frame(self, bg="#0D0D0D")
         graph_frame.pack(fill="both", expand=False, padx=10, pady=5)
 
-        self.fig = plt.figure(figsize=(6, 4))
-        self.ax = self.fig.add_subplot(111)
-
-        num_ticks = 9
-        x_ticks = np.linspace(0, 8, num_ticks)
-        self.ax.set_xticks(x_ticks)
-        self.ax.set_xticklabels(['8 секунд', '', '', '', '', '', '', '1', 'Вердикт'])
-        self.ax.set_xlim(0, 8)
-
-        y_ticks = np.arange(-100, 1, 10)
-        self.ax.set_yticks(y_ticks)
-        self.ax.set_ylim(-100, 0)
-
-        self.ax.grid(True, which='major', color='#007FD0', linestyle='--', linewidth=0.5, alpha=0.2)
-
-        self.fig.patch.set_facecolor("#0D0D0D")
-        self.ax.set_facecolor("#0D0D0D")
-        self.ax.spines['bottom'].set_color("#007FD0")
-        self.ax.tick_params(axis='x', colors='#007FD0')
-        self.ax.spines['left'].set_color("#007FD0")
-        self.ax.tick_params(axis='y', colors='#007FD0')
-        self.ax.spines['top'].set_color("none")
-        self.ax.spines['right'].set_color("none")
+        self.plot = TrendPlot(plt.figure(figsize=(6, 4)))
+        self.fig = self.plot.fig
+        self.ax = self.plot.ax
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=graph_frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.plot.attach(self.canvas)
 
         # RSSI Информация
         bottom_section = tk.Frame(self, bg="#0D0D0D")
@@ -709,28 +623,27 @@ class DetailsPage(Frame):
 
 
     def start_update(self):
-        self.title.config(text=f"SSID: {self.ssid}")
-        self.running = True
-        self.update_thread = threading.Thread(target=self.update_interface)
-        self.update_thread.daemon = True
-        self.update_thread.start()
+        network_id = self.data_sync.networks.get(self.bssid)
+        ssid = self.data_sync.networks.ssid(network_id) if network_id is not None else "-"
+        self.title.config(text=f"SSID: {ssid} ({self.bssid})")
+        self.subscription = self.data_sync.subscribe("DetailsPage")
+        self.scheduler = RenderScheduler(self, self.subscription, self.update_interface, max_fps=RENDER_FPS)
+        self.scheduler.start()
 
     def stop_update(self):
-        self.running = False
-        self.update_thread.join()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+        if self.subscription is not None:
+            self.data_sync.unsubscribe(self.subscription)
+            self.subscription = None
+        self.frame = None
         self.title.config(text=f"SSID: -")
         self.device_rssi_label.config(text=f"RSSI: -")
         self.device_distance_label.config(text=f"Оценка расстояния: -")
         self.annotation_type = 'uncertain'
-        self.ssid = None
-        self.update_thread = None
-        if hasattr(self, "line") and self.line is not None:
-            self.line.remove()
-            self.line = None
-        if hasattr(self, "annotation") and self.annotation is not None:
-            self.annotation.remove()
-            self.annotation = None
-        print('Осталось закрыть график')
+        self.bssid = None
+        self.plot.clear()
         self.close_graph()
 
     def close_graph(self):
@@ -738,18 +651,44 @@ class DetailsPage(Frame):
             plt.close(self.fig)
 
 
-def main():
-    data_sync = DataSync()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Wi-Fi RSSI Monitor")
+    add_collection_arguments(parser)
+    parser.add_argument("--connect", metavar="URL",
+                        help="Подключиться к демону (daemon.py), например http://127.0.0.1:8765, "
+                             "вместо собственного сбора")
+    return parser.parse_args()
 
-    # Поток для сбора данных
-    collection_thread = threading.Thread(target=data_sync.start_collection)
-    collection_thread.daemon = True
-    collection_thread.start()
+
+def main():
+    args = parse_args()
+    configure_logging(args.log_level)
+    reporter = None
+    if args.connect:
+        # Сбор ведет демон, GUI только принимает его кадры
+        data_sync = RemoteDataSync(args.connect)
+        collection_thread = threading.Thread(target=data_sync.start_collection, daemon=True)
+        collection_thread.start()
+        runner = None
+        reporter = create_reporter(args, data_sync.bus)
+        if reporter is not None:
+            reporter.start()
+    else:
+        runner = CollectionRunner(args)
+        data_sync = runner.data_sync
+        runner.start()
 
     # Запускаем приложение
     app = WiFiApp(data_sync)
     app.mainloop()
 
+    if runner is not None:
+        runner.stop()
+    else:
+        data_sync.stop_collection()
+    if reporter is not None:
+        reporter.stop()
+
 
 if __name__ == "__main__":
     main()
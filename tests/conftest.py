@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Модули проекта импортируются от корня репозитория, как при запуске его скриптов
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# config.ini пользователя не должен влиять на параметры по умолчанию в тестах
+os.environ['RSSI_ANALYZER_CONFIG'] = os.devnull
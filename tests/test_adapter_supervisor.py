@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+import data_sync as data_sync_module
+from data_sync import ASYNC_MODE, MAX_SCAN_FAILURES, DataSync
+from utils.scan_backends import SimulatedBackend
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class FlakyInterface:
+    """Адаптер, у которого первые сканирования заданы списком: [] - пусто, None - отказ."""
+
+    def __init__(self, iface, script):
+        self.iface = iface
+        self.script = list(script)
+        self.scans = 0
+
+    def name(self):
+        return self.iface.name()
+
+    def status(self):
+        return self.iface.status()
+
+    def scan(self):
+        self.iface.scan()
+
+    def scan_results(self):
+        self.scans += 1
+        if self.script:
+            result = self.script.pop(0)
+            if result is None:
+                raise ConnectionRefusedError(f'Адаптер {self.name()} не ответил')
+            return result
+        return self.iface.scan_results()
+
+
+class FlakyBackend:
+    def __init__(self, backend, scripts):
+        self.backend = backend
+        self.watch_path = backend.watch_path
+        self.wrapped = {}
+        self.scripts = scripts
+
+    def interfaces(self):
+        result = []
+        for iface in self.backend.interfaces():
+            if iface.name() not in self.wrapped:
+                self.wrapped[iface.name()] = FlakyInterface(iface, self.scripts.get(iface.name(), ()))
+            result.append(self.wrapped[iface.name()])
+        return result
+
+
+@pytest.fixture
+def collection(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_sync_module, 'SCAN_RETRY_DELAY', 0.01)
+    started = []
+
+    def start(backend):
+        data_sync = DataSync(backend=backend, mode=ASYNC_MODE)
+        data_sync.supervisor.poll_interval = 0.05
+        thread = threading.Thread(target=data_sync.start_collection, args=(0.02,), daemon=True)
+        thread.start()
+        started.append((data_sync, thread))
+        return data_sync
+
+    yield start
+    for data_sync, thread in started:
+        data_sync.stop_collection()
+        thread.join(2)
+        assert not thread.is_alive()
+
+
+def simulated(tmp_path, adapters=2):
+    return SimulatedBackend(adapters=adapters, access_points=20, scan_time=0, jitter=0, drop_rate=0,
+                            control_dir=str(tmp_path / 'wpa_supplicant'))
+
+
+def test_watcher_attaches_and_detaches(tmp_path, collection):
+    backend = simulated(tmp_path)
+    data_sync = collection(backend)
+    supervisor = data_sync.supervisor
+    assert wait_until(lambda: set(supervisor.workers) == {'sim0', 'sim1'})
+
+    backend.remove_adapter(0)
+    assert wait_until(lambda: set(supervisor.workers) == {'sim1'})
+    assert data_sync.low_precision
+
+    backend.add_adapter()
+    assert wait_until(lambda: set(supervisor.workers) == {'sim1', 'sim2'})
+    assert not data_sync.low_precision
+    assert wait_until(lambda: data_sync.bus.last_frame is not None and len(data_sync.bus.last_frame.ids))
+
+
+def test_empty_and_failed_scans_keep_worker(tmp_path, collection):
+    backend = FlakyBackend(simulated(tmp_path), {'sim0': [[], None, [], None]})
+    data_sync = collection(backend)
+    supervisor = data_sync.supervisor
+    assert wait_until(lambda: 'sim0' in supervisor.workers)
+    worker = supervisor.workers['sim0']
+    iface = backend.wrapped['sim0']
+    assert wait_until(lambda: iface.scans > 6)
+    assert supervisor.workers.get('sim0') is worker
+
+
+def test_worker_reattached_after_repeated_failures(tmp_path, collection):
+    backend = FlakyBackend(simulated(tmp_path), {'sim0': [None] * MAX_SCAN_FAILURES})
+    data_sync = collection(backend)
+    supervisor = data_sync.supervisor
+    assert wait_until(lambda: 'sim0' in supervisor.workers)
+    first = supervisor.workers['sim0']
+    # Каталог сокетов не меняется: адаптер возвращает только повторная сверка после выхода потока
+    assert wait_until(lambda: not first.thread.is_alive())
+    assert wait_until(lambda: 'sim0' in supervisor.workers and supervisor.workers['sim0'] is not first)
+
+
+def test_stop_wakes_wait_for_adapters(tmp_path):
+    data_sync = DataSync(backend=simulated(tmp_path, adapters=0), mode=ASYNC_MODE)
+    supervisor = data_sync.supervisor
+    supervisor.start()
+    waiter = threading.Thread(target=supervisor.wait_for_adapters, daemon=True)
+    waiter.start()
+    time.sleep(0.05)
+    assert waiter.is_alive()
+    data_sync.stop_collection()
+    waiter.join(2)
+    assert not waiter.is_alive()
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from utils import analysis
+from utils.data_bus import Frame
+from utils.get_distance import get_distance
+from utils.network_index import NetworkIndex
+
+
+def random_frame(size=200, history=8, adapters=3, low_precision=False):
+    rng = np.random.default_rng(1)
+    networks = NetworkIndex()
+    ids = np.array([networks.intern(f'02:00:00:00:{i // 256:02x}:{i % 256:02x}', f'Network-{i}', 2412)
+                    for i in range(size)])
+    # Целые дБм с крупными шагами: в выборку попадают все вердикты, скачки и превышения разброса
+    values = np.cumsum(rng.integers(-12, 13, (size, history)), axis=1) - 60
+    counts = rng.integers(1, history + 1, size).astype(np.int32)
+    values = values.astype(np.float32)
+    values[np.arange(history) < (history - counts)[:, None]] = np.nan
+    adapter_values = (values[:, -1] + rng.integers(-15, 16, (adapters, size))).astype(np.float32)
+    adapter_values[rng.random((adapters, size)) < 0.1] = np.nan
+    return Frame(1, 0.0, networks, ids, values, counts, adapter_values, low_precision)
+
+
+@pytest.mark.parametrize('low_precision', [False, True])
+def test_frame_analysis_matches_scalar_checks(low_precision):
+    frame = random_frame(low_precision=low_precision)
+    result = analysis.FrameAnalysis(frame, window_size=3, threshold=7, jump_threshold=10, interface_threshold=20)
+    for pos, network_id in enumerate(frame.ids):
+        bssid = frame.networks.bssid(network_id)
+        history = frame.get(bssid)
+        adapter_values = frame.adapters_of(bssid)
+        assert analysis.TREND_CODES[result.trends[pos]] == analysis.analyze_trend(history, 3, 7, low_precision)
+        assert result.jumps[pos] == analysis.check_jump(history, 10)
+        assert result.spread_exceeded[pos] == analysis.spread_exceeded(adapter_values, 20)
+        assert result.distances[pos] == pytest.approx(get_distance(float(history[-1])))
+        assert result.verdict(bssid) == analysis.TREND_CODES[result.trends[pos]]
+    if not low_precision:
+        # Выборка покрывает все ветви
+        assert set(result.trends.tolist()) == set(range(len(analysis.TREND_CODES)))
+        assert result.jumps.any() and not result.jumps.all()
+        assert result.spread_exceeded.any() and not result.spread_exceeded.all()
@@ -0,0 +1,24 @@
+import numpy as np
+
+from analyze_session import analyze_session
+from test_scan_recorder import record
+from utils.path_loss import DistanceTables, PathLossModel
+from utils.scan_recorder import RecordedSession
+
+
+def test_distances_follow_network_models(tmp_path):
+    record(tmp_path)
+    session = RecordedSession(str(tmp_path))
+    tables = DistanceTables(session.networks, path=None)
+    model = PathLossModel(-40, 2.0)
+    tables.set_model('02:00:00:00:00:01', model)
+    result = analyze_session(session, interval=0.5, fusion_window=0.5, tables=tables)
+
+    visible = result.verdicts >= 0
+    np.testing.assert_array_equal(~np.isnan(result.distances), visible)
+    fitted = session.networks.get('02:00:00:00:00:01')
+    # Единственный такт с обоими адаптерами: среднее -62 дБм
+    tick = np.flatnonzero(visible[:, fitted])[0]
+    assert result.distances[tick, fitted] == np.float32(model.distance(-62))
+    rows = {bssid: distance for bssid, *_, distance in result.summary()}
+    assert rows['02:00:00:00:00:01'] == float(np.median(result.distances[visible[:, fitted], fitted]))
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+from data_sync import ASYNC_MODE, DataSync
+from utils.async_engine import AsyncCollectionEngine
+from utils.scan_backends import SimulatedBackend
+
+
+def make_engine(adapters=1):
+    backend = SimulatedBackend(adapters=adapters, access_points=10, scan_time=0, jitter=0, drop_rate=0)
+    data_sync = DataSync(backend=backend, mode=ASYNC_MODE)
+    return backend, data_sync, AsyncCollectionEngine(data_sync, interval=0.02, refresh_interval=0.02)
+
+
+def test_stop_before_run():
+    _, _, engine = make_engine()
+    engine.stop()
+    asyncio.run(asyncio.wait_for(engine.run(), 2))
+
+
+def test_removing_all_adapters_publishes_empty_frame():
+    backend, data_sync, engine = make_engine()
+
+    async def scenario():
+        frames = engine.subscribe()
+        runner = asyncio.create_task(engine.run())
+        while True:
+            frame = await asyncio.wait_for(frames.get(), 2)
+            if len(frame.ids):
+                break
+        backend.remove_adapter(0)
+        while len(frame.ids):
+            frame = await asyncio.wait_for(frames.get(), 2)
+        engine.stop()
+        await asyncio.wait_for(runner, 2)
+        return frame
+
+    frame = asyncio.run(scenario())
+    assert not len(frame.ids)
+    assert data_sync.last_rssi_snapshot is None
+
+
+def test_stop_after_loop_closed():
+    _, _, engine = make_engine()
+
+    async def scenario():
+        runner = asyncio.create_task(engine.run())
+        await asyncio.sleep(0.05)
+        engine.stop()
+        await asyncio.wait_for(runner, 2)
+
+    asyncio.run(scenario())
+    engine.stop()
+
+
+def test_blocked_adapter_listing_does_not_delay_shutdown():
+    release = threading.Event()
+
+    class BlockingBackend(SimulatedBackend):
+        def interfaces(self):
+            release.wait(30)
+            return super().interfaces()
+
+    backend = BlockingBackend(adapters=1, access_points=10, scan_time=0, jitter=0, drop_rate=0)
+    engine = AsyncCollectionEngine(DataSync(backend=backend, mode=ASYNC_MODE), interval=0.02)
+
+    async def scenario():
+        asyncio.get_running_loop().call_later(0.05, engine.stop)
+        await engine.run()
+
+    started_at = time.monotonic()
+    try:
+        asyncio.run(scenario())
+        assert time.monotonic() - started_at < 2
+    finally:
+        release.set()
+
+
+def test_empty_scan_is_stored():
+    _, data_sync, engine = make_engine()
+    data_sync.parse_scan_results = lambda scan_results: {}
+    puts = []
+    put = data_sync.avg_rssi_data.put
+    data_sync.avg_rssi_data.put = lambda row, readings: (puts.append(readings), put(row, readings))
+
+    async def scenario():
+        runner = asyncio.create_task(engine.run())
+        while not puts:
+            await asyncio.sleep(0.01)
+        engine.stop()
+        await asyncio.wait_for(runner, 2)
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert puts and all(readings == {} for readings in puts)
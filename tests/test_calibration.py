@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils.calibration import Calibrator, band_index, create_calibrator
+from utils.fusion import FusionEngine
+from utils.network_index import NetworkIndex
+
+OFFSETS = np.array([4.0, -2.0, -2.0])
+
+
+@pytest.fixture
+def networks():
+    index = NetworkIndex()
+    for i, freq in enumerate((2412, 2437, 5180, 5745)):
+        index.intern(f'02:00:00:00:00:{i:02x}', f'Network-{i}', freq)
+    return index
+
+
+def learn(calibrator, ticks=100, noise=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = np.arange(len(OFFSETS))
+    true = np.array([-50, -60, -70, -80], dtype=np.float32)
+    for _ in range(ticks):
+        block = true + OFFSETS[:, None] + rng.normal(0, noise, size=(len(rows), len(true)))
+        corrected = calibrator.process(block.astype(np.float32), rows)
+    return corrected
+
+
+def test_band_index():
+    np.testing.assert_array_equal(band_index(np.array([0, 2412, 5180, 5955])), [0, 0, 1, 2])
+
+
+def test_learns_relative_offsets(networks, tmp_path):
+    calibrator = Calibrator(networks, str(tmp_path / 'calibration.json'), min_samples=10)
+    for row in range(len(OFFSETS)):
+        calibrator.attach(row, f'sim{row}')
+    corrected = learn(calibrator)
+    np.testing.assert_allclose(calibrator.offsets[:, :2], np.repeat(OFFSETS[:, None], 2, axis=1), atol=1e-4)
+    # Исправленные замеры адаптеров совпадают
+    np.testing.assert_allclose(corrected, np.broadcast_to(corrected[0], corrected.shape), atol=1e-3)
+
+
+def test_offsets_wait_for_min_samples(networks):
+    calibrator = Calibrator(networks, None, min_samples=1000)
+    learn(calibrator, ticks=5)
+    assert not calibrator.offsets.any()
+
+
+def test_apply_mode_does_not_learn(networks):
+    calibrator = Calibrator(networks, None, learn=False, min_samples=1)
+    learn(calibrator, ticks=5)
+    assert not calibrator.counts.any()
+
+
+def test_profile_survives_detach_and_reload(networks, tmp_path):
+    path = str(tmp_path / 'calibration.json')
+    calibrator = Calibrator(networks, path, min_samples=10)
+    for row in range(len(OFFSETS)):
+        calibrator.attach(row, f'sim{row}')
+    learn(calibrator)
+    calibrator.detach(0)
+    assert not calibrator.offsets[0].any()
+    saved = json.load(open(path, encoding='utf-8'))
+    assert saved['name:sim0']['2.4']['offset'] == pytest.approx(4.0)
+
+    reloaded = Calibrator(networks, path, min_samples=10)
+    # Профиль ищется по адаптеру, а не по строке
+    reloaded.attach(2, 'sim0')
+    assert reloaded.offsets[2, 0] == pytest.approx(4.0)
+    assert reloaded.offsets[2, 1] == pytest.approx(4.0)
+
+
+def test_weights_follow_residual_variance(networks):
+    fusion = FusionEngine()
+    calibrator = Calibrator(networks, None, min_samples=10, fusion=fusion)
+    learn(calibrator, ticks=200, noise=2.0)
+    assert 0 < fusion.weights[0] < 1
+    assert np.all(fusion.weights[:3] <= 1)
+
+
+def test_create_calibrator(networks, tmp_path):
+    assert create_calibrator(networks, 'off') is None
+    calibrator = create_calibrator(networks, 'apply', str(tmp_path / 'c.json'))
+    assert not calibrator.learn
+    with pytest.raises(ValueError):
+        create_calibrator(networks, 'train')
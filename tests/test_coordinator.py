@@ -0,0 +1,50 @@
+import time
+
+import numpy as np
+
+from data_sync import DataSync
+from test_state_server import BSSIDS, get_json, publish, serve
+from utils.coordinator import Coordinator
+from utils.state_server import StateServer
+
+
+def wait_for_frames(coordinator, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while any(node.frames == 0 for node in coordinator.nodes):
+        assert time.monotonic() < deadline, 'Узлы не прислали кадры'
+        time.sleep(0.02)
+
+
+def test_tick_fuses_nodes_and_reports_them():
+    collectors = [DataSync(avg_buffer_size=4), DataSync(avg_buffer_size=4)]
+    publish(collectors[0], [{BSSIDS[0]: -60, BSSIDS[1]: -70}])
+    publish(collectors[1], [{BSSIDS[0]: -64, BSSIDS[2]: -80}])
+    servers = [serve(data_sync) for data_sync in collectors]
+    coordinator = Coordinator([url for _, url in servers], interval=60, history=4)
+    coordinator_server = StateServer(coordinator, port=0)
+    coordinator.start()
+    coordinator_server.start()
+    try:
+        wait_for_frames(coordinator)
+        frame = coordinator.tick()
+        host, port = coordinator_server.address[:2]
+        nodes = get_json(f'http://{host}:{port}/nodes')
+    finally:
+        coordinator.stop()
+        coordinator_server.stop()
+        for server, _ in servers:
+            server.stop()
+
+    # Сеть, видимая обоими узлами, усредняется; остальные берутся от единственного узла
+    np.testing.assert_array_equal(frame.get(BSSIDS[0]), [-62])
+    np.testing.assert_array_equal(frame.get(BSSIDS[1]), [-70])
+    np.testing.assert_array_equal(frame.get(BSSIDS[2]), [-80])
+    assert coordinator.bus.last_frame is frame
+    assert [node['url'] for node in nodes] == [url for _, url in servers]
+    assert all(node['frames'] == 1 and 0 <= node['lag'] < 5 for node in nodes)
+
+
+def test_tick_without_fresh_frames():
+    coordinator = Coordinator(['http://127.0.0.1:1'], fusion_window=1.0)
+    assert coordinator.tick() is None
+    assert coordinator.node_status() == [{'url': 'http://127.0.0.1:1', 'frames': 0, 'lag': None}]
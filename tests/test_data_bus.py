@@ -0,0 +1,69 @@
+import threading
+
+import numpy as np
+import pytest
+
+from utils.data_bus import DataBus, Frame
+from utils.network_index import NetworkIndex
+
+
+def make_frame(seq, networks):
+    ids = np.array([0, 1])
+    history = np.full((2, 4), np.nan, dtype=np.float32)
+    history[:, -1] = [-60 - seq, -70 - seq]
+    adapter_values = history[:, -1][None, :].copy()
+    return Frame(seq, float(seq), networks, ids, history, np.ones(2, dtype=np.int32), adapter_values)
+
+
+@pytest.fixture
+def networks():
+    index = NetworkIndex()
+    index.intern('02:00:00:00:00:00', 'a', 2412)
+    index.intern('02:00:00:00:00:01', 'b', 2412)
+    return index
+
+
+def test_overflow_drops_oldest_frames(networks):
+    bus = DataBus()
+    subscription = bus.subscribe('slow', maxsize=3)
+    for seq in range(1, 6):
+        bus.publish(make_frame(seq, networks))
+    assert subscription.lag == 5
+    assert subscription.metrics() == {'queued': 3, 'delivered': 0, 'dropped': 2, 'lag': 5,
+                                      'last_latency': 0.0}
+    assert subscription.get(timeout=0).seq == 3
+    assert subscription.lag == 2
+    metrics = bus.metrics()['slow']
+    assert (metrics['queued'], metrics['delivered'], metrics['dropped']) == (2, 1, 2)
+
+
+def test_get_latest_skips_queued_frames(networks):
+    bus = DataBus()
+    subscription = bus.subscribe('gui', maxsize=4)
+    for seq in range(1, 4):
+        bus.publish(make_frame(seq, networks))
+    assert subscription.get_latest().seq == 3
+    assert (subscription.dropped, subscription.delivered, subscription.lag) == (2, 1, 0)
+    assert subscription.get_latest() is None
+    assert subscription.get(timeout=0) is None
+
+
+def test_unsubscribe_wakes_waiting_reader(networks):
+    bus = DataBus()
+    subscription = bus.subscribe('reader')
+    results = []
+    reader = threading.Thread(target=lambda: results.append(subscription.get(timeout=5)))
+    reader.start()
+    bus.unsubscribe(subscription)
+    reader.join(5)
+    assert results == [None]
+    bus.publish(make_frame(1, networks))
+    assert subscription.metrics()['queued'] == 0
+
+
+def test_frames_are_read_only(networks):
+    frame = make_frame(1, networks)
+    for array in (frame.ids, frame.history, frame.counts, frame.adapter_values):
+        with pytest.raises(ValueError):
+            array[0] = 0
+    np.testing.assert_array_equal(frame.get('02:00:00:00:00:01'), [-71])
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from utils.filters import EwmaFilter, FilterChain, HampelFilter, KalmanFilter, MedianFilter, create_filter
+
+
+def run(signal_filter, series):
+    """Прогоняет значения одной сети такт за тактом (None - сети нет в такте)."""
+    result = []
+    for value in series:
+        present = np.array([value is not None])
+        values = np.array([np.nan if value is None else value], dtype=np.float32)
+        result.append(float(signal_filter.update(values, present)[0]))
+    return result
+
+
+def test_ewma():
+    result = run(EwmaFilter(alpha=0.5), [-60, -70, -70])
+    assert result == [-60, -65, -67.5]
+
+
+def test_kalman_converges_and_shrinks_variance():
+    signal_filter = KalmanFilter(process_noise=0.1, measurement_noise=4.0)
+    result = run(signal_filter, [-60] + [-70] * 30)
+    assert result[0] == -60
+    assert -60 > result[1] > -70
+    assert result[-1] == pytest.approx(-70, abs=0.5)
+    assert signal_filter.variance[0] < 4.0
+
+
+def test_median():
+    assert run(MedianFilter(k=3), [-60, -90, -62, -61]) == [-60, -75, -62, -62]
+
+
+def test_hampel_replaces_outliers_only():
+    result = run(HampelFilter(k=5, n_sigmas=3.0), [-60, -61, -60, -61, -30, -60])
+    assert result[:4] == [-60, -61, -60, -61]
+    assert result[4] == pytest.approx(-60)
+    assert result[5] == -60
+
+
+def test_missing_network_resets_state():
+    signal_filter = EwmaFilter(alpha=0.5)
+    result = run(signal_filter, [-60, None, -80])
+    assert np.isnan(result[1])
+    assert result[2] == -80
+
+
+def test_state_grows_with_networks():
+    signal_filter = MedianFilter(k=3)
+    signal_filter.update(np.array([-60], dtype=np.float32), np.array([True]))
+    values = np.full(40, -70, dtype=np.float32)
+    result = signal_filter.update(values, np.ones(40, dtype=bool))
+    assert signal_filter.capacity >= 40
+    np.testing.assert_array_equal(result[1:], values[1:])
+    assert result[0] == -65
+
+
+def test_create_filter():
+    assert create_filter('none') is None
+    assert isinstance(create_filter('kalman'), KalmanFilter)
+    chain = create_filter('hampel, kalman')
+    assert isinstance(chain, FilterChain)
+    assert chain.name == 'hampel,kalman'
+    with pytest.raises(ValueError):
+        create_filter('unknown')
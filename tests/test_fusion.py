@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from utils.filters import EwmaFilter
+from utils.fusion import FusionEngine, create_fusion
+from utils.network_index import NetworkIndex
+from utils.rssi_store import RssiStore
+
+NAN = np.nan
+
+
+def test_union_of_adapters():
+    fusion = FusionEngine(grace=0)
+    block = np.array([[-60, NAN], [-70, -80]], dtype=np.float32)
+    means, measured, held = fusion.fuse(block, np.array([0, 1]))
+    np.testing.assert_array_equal(measured, [True, True])
+    assert not held.any()
+    np.testing.assert_array_equal(means, [-65, -80])
+
+
+def test_adapter_weights():
+    fusion = FusionEngine(grace=0)
+    fusion.set_weight(1, 3.0)
+    means, _, _ = fusion.fuse(np.array([[-60], [-80]], dtype=np.float32), np.array([0, 1]))
+    assert means[0] == pytest.approx(-75)
+
+
+def test_zero_weight_adapter_does_not_confirm_network():
+    fusion = FusionEngine(grace=0)
+    fusion.set_weight(1, 0.0)
+    means, measured, _ = fusion.fuse(np.array([[NAN], [-80]], dtype=np.float32), np.array([0, 1]))
+    assert not measured[0]
+    assert np.isnan(means[0])
+
+
+def test_recency_weights():
+    fusion = FusionEngine(grace=0, recency_tau=1.0)
+    block = np.array([[-60], [-80]], dtype=np.float32)
+    ages = np.array([[0.0], [np.log(3)]])
+    means, _, _ = fusion.fuse(block, np.array([0, 1]), ages)
+    assert means[0] == pytest.approx(-65)
+
+
+def test_grace_holds_last_value():
+    fusion = FusionEngine(grace=2)
+    rows = np.array([0])
+    last = np.array([-60], dtype=np.float32)
+    missing = np.array([[NAN]], dtype=np.float32)
+    for _ in range(2):
+        means, measured, held = fusion.fuse(missing, rows, last=last)
+        assert held[0] and not measured[0] and means[0] == -60
+    means, measured, held = fusion.fuse(missing, rows, last=last)
+    assert not held[0] and np.isnan(means[0])
+    # Новый замер сбрасывает счетчик пропусков
+    fusion.fuse(np.array([[-61]], dtype=np.float32), rows, last=last)
+    _, _, held = fusion.fuse(missing, rows, last=last)
+    assert held[0]
+
+
+def test_held_networks_do_not_feed_filter_and_stats():
+    networks = NetworkIndex()
+    network_id = networks.intern('02:00:00:00:00:01', 'Office', 2412)
+    signal_filter = EwmaFilter(alpha=0.5)
+    store = RssiStore(adapters=1, history=4, networks=networks, signal_filter=signal_filter, stats_window=2,
+                      fusion=FusionEngine(grace=2))
+    for value in (-60, -70):
+        store.put(0, {network_id: value})
+        store.aggregate()
+        store.clear_raw()
+    assert signal_filter.value[network_id] == -65
+    # Адаптер отчитался, но сеть не увидел: она удерживается с последним отфильтрованным значением
+    store.put(0, {})
+    store.aggregate()
+    store.clear_raw()
+    np.testing.assert_array_equal(store['02:00:00:00:00:01'], [-60, -65, -65])
+    assert signal_filter.value[network_id] == -65
+    assert store.stats.counts[network_id] == 2
+    store.put(0, {network_id: -75})
+    store.aggregate()
+    assert signal_filter.value[network_id] == -70
+    stats = store.stats.snapshot(np.array([network_id]))
+    assert stats.counts[0] == 3
+    assert stats.mean[0] == -67.5
+    assert stats.jump[0] == -5
+
+
+def test_reset_adapter_restores_weight():
+    fusion = FusionEngine()
+    fusion.set_weight(2, 0.5)
+    fusion.reset_adapter(2)
+    assert fusion.weights[2] == 1.0
+
+
+def test_create_fusion():
+    assert create_fusion() is None
+    assert create_fusion('intersect') is None
+    fusion = create_fusion('union', grace=5, recency_tau=0)
+    assert fusion.grace == 5 and fusion.recency_tau is None
+    with pytest.raises(ValueError):
+        create_fusion('average')
@@ -0,0 +1,35 @@
+import pytest
+
+from utils import give_rights
+from utils.give_rights import PermissionManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(give_rights, 'give_rights', lambda path: None)
+    monkeypatch.setattr(PermissionManager, '_granted', False)
+    monkeypatch.setattr(PermissionManager, '_delay', PermissionManager.MIN_DELAY)
+    monkeypatch.setattr(PermissionManager, '_next_attempt', 0.0)
+    return PermissionManager
+
+
+def test_failed_attempt_backs_off_once(manager, tmp_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(give_rights.time, 'monotonic', lambda: clock[0])
+    missing = str(tmp_path / 'missing')
+    delays = []
+    for _ in range(4):
+        assert not manager.ensure(missing)
+        # Как get_ifaces после ошибки: сброс кэша и ожидание следующей попытки
+        manager.invalidate()
+        delays.append(manager.retry_delay())
+        clock[0] += delays[-1]
+    assert delays == [0.5, 1.0, 2.0, 4.0]
+
+
+def test_access_error_after_grant_schedules_retry(manager, tmp_path):
+    assert manager.ensure(str(tmp_path))
+    assert manager.retry_delay() == 0
+    manager.invalidate()
+    assert 0 < manager.retry_delay() <= manager.MIN_DELAY
+    assert not manager.ensure(str(tmp_path))
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pytest
+
+from utils.network_index import NetworkIndex
+from utils.path_loss import DistanceTables, PathLossModel, fit_path_loss
+
+
+@pytest.fixture
+def networks():
+    index = NetworkIndex()
+    index.intern('02:00:00:00:00:01:', 'Fitted', 2412)
+    index.intern('02:00:00:00:00:02:', 'Default', 2412)
+    return index
+
+
+def test_model_distance():
+    model = PathLossModel(-40, 2.0)
+    np.testing.assert_allclose(model.distance([-40, -60, -80]), [1, 10, 100])
+    assert PathLossModel.from_dict(model.to_dict()).to_dict() == model.to_dict()
+
+
+def test_fit_recovers_parameters():
+    rng = np.random.default_rng(0)
+    distances = np.repeat([1.0, 2.0, 5.0, 10.0, 20.0], 50)
+    rssi = -40 - 10 * 2.7 * np.log10(distances) + rng.normal(0, 1.0, len(distances))
+    model = fit_path_loss(distances, rssi)
+    assert model.P == pytest.approx(-40, abs=0.5)
+    assert model.N == pytest.approx(2.7, abs=0.1)
+    assert model.residual == pytest.approx(1.0, abs=0.2)
+    assert model.samples == len(distances)
+
+
+def test_fit_rejects_bad_input():
+    with pytest.raises(ValueError):
+        fit_path_loss([3.0, 3.0], [-60, -61])
+    with pytest.raises(ValueError):
+        fit_path_loss([1.0, 10.0], [-70, -50])
+
+
+def test_tables_match_models(networks):
+    tables = DistanceTables(networks, path=None)
+    tables.set_model('02:00:00:00:00:01', PathLossModel(-40, 2.0))
+    rssi = np.array([-60.2, -59.6, np.nan], dtype=np.float32)
+    distances = tables.distances(np.array([0, 1, 1]), rssi, N=3.0)
+    assert distances[0] == pytest.approx(10.0, rel=1e-5)
+    assert distances[1] == pytest.approx(PathLossModel(tables.default_P, 3.0).distance(-60), rel=1e-5)
+    assert np.isnan(distances[2])
+
+
+def test_tables_clip_to_range(networks):
+    tables = DistanceTables(networks, path=None)
+    model = PathLossModel(tables.default_P, 3.0)
+    assert tables.distance('02:00:00:00:00:02', -200, N=3.0) == pytest.approx(model.distance(-120), rel=1e-5)
+    assert tables.distance('unknown', 10, N=3.0) == pytest.approx(model.distance(0), rel=1e-5)
+
+
+def test_models_saved_and_loaded_by_normalised_bssid(networks, tmp_path):
+    path = tmp_path / 'path_loss.json'
+    path.write_text(json.dumps({'02:00:00:00:00:01:': {'P': -40, 'N': 2.0}}), encoding='utf-8')
+    tables = DistanceTables(networks, str(path))
+    assert tables.distance('02:00:00:00:00:01', -60) == pytest.approx(10.0, rel=1e-5)
+
+    tables.set_model('02:00:00:00:00:02'.upper(), PathLossModel(-30, 2.0))
+    tables.save()
+    assert set(json.loads(path.read_text(encoding='utf-8'))) == {'02:00:00:00:00:01', '02:00:00:00:00:02'}
+    assert DistanceTables(networks, str(path)).distance('02:00:00:00:00:02:', -50) == pytest.approx(10.0, rel=1e-5)
+
+
+def test_labels_use_normalised_bssid(tmp_path):
+    from fit_path_loss import read_labels
+
+    path = tmp_path / 'labels.csv'
+    path.write_text('bssid,distance,start,end\n# комментарий\nAA:BB:CC:00:00:01:,2,0,10\naa:bb:cc:00:00:01,5,10,20\n',
+                    encoding='utf-8')
+    assert read_labels(str(path)) == {'aa:bb:cc:00:00:01': [(2.0, 0.0, 10.0), (5.0, 10.0, 20.0)]}
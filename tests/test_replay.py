@@ -0,0 +1,38 @@
+from data_sync import ASYNC_MODE, DataSync
+from test_scan_recorder import expected_scans, record
+from utils.scan_backends import ReplayBackend
+from utils.scan_recorder import RecordedSession
+
+
+def test_replay_backend_returns_recorded_scans(tmp_path):
+    record(tmp_path)
+    backend = ReplayBackend(RecordedSession(str(tmp_path)), speed=1000)
+    replayed = {}
+    for iface in backend.interfaces():
+        scans = replayed[iface.name()] = []
+        while True:
+            try:
+                iface.scan()
+                results = iface.scan_results()
+            except ConnectionRefusedError:
+                break
+            scans.append({result.bssid: result.signal for result in results})
+    assert backend.finished
+    assert backend.interfaces() == []
+    expected = {}
+    for _, adapter, readings in expected_scans():
+        expected.setdefault(adapter, []).append(readings)
+    assert replayed == expected
+
+
+def test_replay_through_data_sync(tmp_path):
+    record(tmp_path)
+    session = RecordedSession(str(tmp_path))
+    data_sync = DataSync(backend=ReplayBackend(session, speed=1000), mode=ASYNC_MODE)
+    data_sync.networks = session.networks
+    readings = {}
+    for iface in data_sync.get_ifaces():
+        readings[iface.name()] = data_sync.get_rssi_readings(iface)
+    assert readings['wlan1'] == {session.networks.get('02:00:00:00:00:01'): -60,
+                                 session.networks.get('02:00:00:00:00:02'): -70}
+    assert readings['wlan2'] == {session.networks.get('02:00:00:00:00:01'): -64}
@@ -0,0 +1,63 @@
+import numpy as np
+
+from utils.rolling_stats import RollingStats
+
+
+def test_matches_direct_computation():
+    window = 4
+    rng = np.random.default_rng(0)
+    series = rng.normal(-60, 5, size=(30, 3)).astype(np.float32)
+    stats = RollingStats(window, capacity=2)
+    present = np.ones(3, dtype=bool)
+    for tick, values in enumerate(series, start=1):
+        stats.update(values, present)
+        snapshot = stats.snapshot(np.arange(3))
+        last = series[max(tick - window, 0):tick].astype(np.float64)
+        np.testing.assert_allclose(snapshot.mean, last.mean(axis=0), rtol=1e-6)
+        np.testing.assert_allclose(snapshot.std, last.std(axis=0), rtol=1e-4, atol=1e-6)
+        np.testing.assert_array_equal(snapshot.minimum, last.min(axis=0).astype(np.float32))
+        np.testing.assert_array_equal(snapshot.maximum, last.max(axis=0).astype(np.float32))
+        np.testing.assert_array_equal(snapshot.counts, [tick] * 3)
+        if tick >= 2 * window:
+            previous = series[tick - 2 * window:tick - window].astype(np.float64)
+            np.testing.assert_allclose(snapshot.delta, last.mean(axis=0) - previous.mean(axis=0), rtol=1e-6)
+        else:
+            assert np.isnan(snapshot.delta).all()
+        if tick >= 2:
+            np.testing.assert_allclose(snapshot.jump, series[tick - 1] - series[tick - 2], rtol=1e-6)
+
+
+def test_missing_network_starts_over():
+    stats = RollingStats(window=3)
+    both = np.array([True, True])
+    stats.update(np.array([-60, -70], dtype=np.float32), both)
+    stats.update(np.array([-62, np.nan], dtype=np.float32), np.array([True, False]))
+    stats.update(np.array([-64, -50], dtype=np.float32), both)
+    snapshot = stats.snapshot(np.array([0, 1]))
+    np.testing.assert_array_equal(snapshot.counts, [3, 1])
+    assert snapshot.mean[1] == -50
+    assert snapshot.minimum[1] == snapshot.maximum[1] == -50
+    assert np.isnan(snapshot.jump[1])
+
+
+def test_held_ticks_are_skipped():
+    window = 3
+    rng = np.random.default_rng(1)
+    stats = RollingStats(window, capacity=4)
+    samples = [[], []]
+    for _ in range(40):
+        values = rng.normal(-60, 5, size=2).astype(np.float32)
+        present = rng.random(2) < 0.6
+        held = ~present
+        stats.update(values, present, held)
+        for i in np.flatnonzero(present):
+            samples[i].append(float(values[i]))
+        snapshot = stats.snapshot(np.arange(2))
+        for i, series in enumerate(samples):
+            if not series:
+                continue
+            last = np.array(series[-window:], dtype=np.float32).astype(np.float64)
+            assert snapshot.counts[i] == len(series)
+            np.testing.assert_allclose(snapshot.mean[i], last.mean(), rtol=1e-6)
+            assert snapshot.minimum[i] == np.float32(last.min())
+            assert snapshot.maximum[i] == np.float32(last.max())
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from utils.network_index import NetworkIndex
+from utils.rssi_store import RssiStore
+
+
+@pytest.fixture
+def networks():
+    index = NetworkIndex()
+    for i in range(3):
+        index.intern(f'02:00:00:00:00:0{i}:', f'Network-{i}', 2412)
+    return index
+
+
+def tick(store, *readings):
+    for row, values in enumerate(readings):
+        if values is not None:
+            store.put(row, values)
+    snapshot = store.aggregate()
+    store.clear_raw()
+    return snapshot
+
+
+def test_ring_keeps_last_values_contiguous(networks):
+    store = RssiStore(adapters=1, history=3, networks=networks)
+    for value in range(-70, -64):
+        tick(store, {0: value})
+    history = store['02:00:00:00:00:00']
+    np.testing.assert_array_equal(history, [-67, -66, -65])
+    assert np.shares_memory(history, store.history)
+    assert store.counts[0] == 3
+
+
+def test_aggregate_averages_networks_seen_by_all(networks):
+    store = RssiStore(adapters=2, history=4, networks=networks)
+    snapshot = tick(store, {0: -60, 1: -70}, {0: -64})
+    assert snapshot.adapters == 2
+    np.testing.assert_array_equal(store['02:00:00:00:00:00'], [-62])
+    # Сеть 1 видна не всем адаптерам и в такт не попадает
+    assert '02:00:00:00:00:01' not in store
+    np.testing.assert_array_equal(snapshot.get('02:00:00:00:00:00'), [-60, -64])
+
+
+def test_network_missing_from_tick_loses_history(networks):
+    store = RssiStore(adapters=1, history=4, networks=networks)
+    tick(store, {0: -60, 1: -70})
+    tick(store, {0: -61})
+    assert list(store) == ['02:00:00:00:00:00']
+    assert np.isnan(store.history[1]).all()
+
+
+def test_union_without_intersect(networks):
+    store = RssiStore(adapters=2, history=4, networks=networks, intersect=False)
+    tick(store, {0: -60, 1: -70}, {0: -64})
+    np.testing.assert_array_equal(store['02:00:00:00:00:00'], [-62])
+    np.testing.assert_array_equal(store['02:00:00:00:00:01'], [-70])
+
+
+def test_aggregate_without_readings(networks):
+    store = RssiStore(adapters=2, networks=networks)
+    assert store.aggregate() is None
+
+
+def test_only_reporting_adapters_are_averaged(networks):
+    store = RssiStore(adapters=2, history=4, networks=networks)
+    snapshot = tick(store, {0: -60}, None)
+    assert snapshot.adapters == 1
+    np.testing.assert_array_equal(store['02:00:00:00:00:00'], [-60])
+
+
+def test_snapshot_goes_stale_after_next_tick(networks):
+    store = RssiStore(adapters=1, networks=networks)
+    snapshot = tick(store, {0: -60})
+    assert not snapshot.is_stale
+    tick(store, {0: -61})
+    assert snapshot.is_stale
+    assert snapshot.get('02:00:00:00:00:00') is None
+
+
+def test_adapter_rows_are_reused_and_keep_history(networks):
+    store = RssiStore(history=4, networks=networks)
+    first, second = store.add_adapter(), store.add_adapter()
+    tick(store, {0: -60}, {0: -62})
+    store.remove_adapter(first)
+    assert store.adapters == 1
+    np.testing.assert_array_equal(store['02:00:00:00:00:00'], [-61])
+    assert store.add_adapter() == first
+    assert second == 1
+
+
+def test_capacity_grows_with_network_index():
+    networks = NetworkIndex()
+    store = RssiStore(adapters=1, history=2, capacity=2, networks=networks)
+    tick(store, {networks.intern('02:00:00:00:00:00:', 'a'): -60})
+    readings = {networks.intern(f'02:00:00:00:01:{i:02x}:', 'b'): -50 - i for i in range(5)}
+    tick(store, readings)
+    assert store.capacity >= 6
+    assert len(store) == 5
+    np.testing.assert_array_equal(store['02:00:00:00:01:04'], [-54])
+
+
+def test_fuse_uses_only_fresh_readings(networks):
+    store = RssiStore(adapters=2, history=4, networks=networks)
+    store.put(0, {0: -60}, timestamp=100.0)
+    store.put(1, {0: -70}, timestamp=90.0)
+    snapshot = store.fuse(5.0, now=101.0)
+    assert snapshot.adapters == 1
+    np.testing.assert_array_equal(store['02:00:00:00:00:00'], [-60])
+    assert store.fuse(5.0, now=200.0) is None
+
+
+def test_frame_copies_visible_history(networks):
+    store = RssiStore(adapters=1, history=3, networks=networks)
+    tick(store, {0: -60, 2: -80})
+    snapshot = tick(store, {0: -61, 2: -81})
+    frame = store.frame(1, snapshot)
+    np.testing.assert_array_equal(frame.ids, [0, 2])
+    np.testing.assert_array_equal(frame.get('02:00:00:00:00:02'), [-80, -81])
+    np.testing.assert_array_equal(frame.adapters_of('02:00:00:00:00:00'), [-61])
+    tick(store, {0: -62})
+    np.testing.assert_array_equal(frame.get('02:00:00:00:00:00'), [-60, -61])
+
+
+def test_frame_groups_follow_ssid_index():
+    networks = NetworkIndex()
+    ids = [networks.intern(f'02:00:00:00:00:0{i}', ssid, 2412)
+           for i, ssid in enumerate(('Office', 'Guest', 'Office', 'Office'))]
+    assert networks.group('Office') == [ids[0], ids[2], ids[3]]
+    assert networks.groups() == {'Office': [ids[0], ids[2], ids[3]], 'Guest': [ids[1]]}
+    store = RssiStore(adapters=1, history=2, networks=networks)
+    snapshot = tick(store, {ids[0]: -70, ids[1]: -80, ids[2]: -60})
+    frame = store.frame(1, snapshot)
+    assert frame.groups() == {'Office': ('02:00:00:00:00:02', -60, 2), 'Guest': ('02:00:00:00:00:01', -80, 1)}
+    positions, counts = frame.group_leaders()
+    np.testing.assert_array_equal(frame.ids[positions], [ids[2], ids[1]])
+    np.testing.assert_array_equal(counts, [2, 1])
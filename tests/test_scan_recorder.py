@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+
+from utils.network_index import NetworkIndex
+from utils.scan_recorder import RecordedSession, ScanRecorder
+
+SCANS = [
+    (1000.0, 'wlan1', {'02:00:00:00:00:01:': -60, '02:00:00:00:00:02:': -70}),
+    (1000.0, 'wlan2', {'02:00:00:00:00:01:': -64}),
+    (1000.5, 'wlan1', {'02:00:00:00:00:01:': -61}),
+    (1001.0, 'wlan2', {'02:00:00:00:00:02:': -72, '02:00:00:00:00:03:': -80}),
+]
+
+
+def record(directory, segment_size=64 * 1024 * 1024, flush_each=False):
+    networks = NetworkIndex()
+    recorder = ScanRecorder(str(directory), networks, flush_interval=0.01, segment_size=segment_size)
+    recorder.start()
+    written = 0
+    for timestamp, adapter, readings in SCANS:
+        recorder.record(adapter, {networks.intern(bssid, 'Office', 5180): rssi for bssid, rssi in readings.items()},
+                        timestamp)
+        written += len(readings)
+        # Каждое сканирование - отдельный блок записи
+        while flush_each and recorder.records < written:
+            time.sleep(0.005)
+    recorder.stop()
+    return recorder
+
+
+def recorded_scans(session):
+    return [(timestamp, session.adapters[adapter],
+             {session.networks.bssid(network_id): float(rssi) for network_id, rssi in zip(network_ids, values)})
+            for timestamp, adapter, network_ids, values in session.scans()]
+
+
+def expected_scans():
+    return [(timestamp, adapter, {bssid.rstrip(':'): rssi for bssid, rssi in readings.items()})
+            for timestamp, adapter, readings in SCANS]
+
+
+def test_round_trip(tmp_path):
+    recorder = record(tmp_path)
+    assert recorder.records == 6
+    session = RecordedSession(str(tmp_path))
+    assert session.adapters == ['wlan1', 'wlan2']
+    assert len(session) == 6
+    assert (session.start_time, session.end_time) == (1000.0, 1001.0)
+    assert recorded_scans(session) == expected_scans()
+    assert int(session.networks.freqs[session.networks.get('02:00:00:00:00:03')]) == 5180
+
+
+def test_segments_are_self_contained(tmp_path):
+    # Каждый блок записи не помещается в сегмент вместе с предыдущими
+    record(tmp_path, segment_size=1, flush_each=True)
+    assert len(list(tmp_path.glob('*.rssi'))) == len(SCANS)
+    assert recorded_scans(RecordedSession(str(tmp_path))) == expected_scans()
+
+
+def test_readings_of_one_network(tmp_path):
+    record(tmp_path)
+    session = RecordedSession(str(tmp_path))
+    network_id = session.networks.get('02:00:00:00:00:01')
+    timestamps, adapters, rssi = session.readings(network_id, 1000.0, 1000.5)
+    np.testing.assert_array_equal(timestamps, [1000.0, 1000.0, 1000.5])
+    np.testing.assert_array_equal(adapters, [0, 1, 0])
+    np.testing.assert_array_equal(rssi, [-60, -64, -61])
+    assert len(session.readings(network_id, 1000.6)[0]) == 0
+
+
+def test_scans_of_one_adapter(tmp_path):
+    record(tmp_path)
+    session = RecordedSession(str(tmp_path))
+    assert [timestamp for timestamp, *_ in session.scans(adapter=1)] == [1000.0, 1001.0]
@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from urllib.request import urlopen
+
+import numpy as np
+import pytest
+
+from data_sync import DataSync
+from utils.network_index import NetworkIndex
+from utils.remote_client import RemoteDataSync
+from utils.state_server import StateServer, decode_frame, encode_frame
+
+BSSIDS = ['02:00:00:00:00:0a', '02:00:00:00:00:0b', '02:00:00:00:00:0c']
+
+
+def publish(data_sync, *ticks, low_precision=False):
+    """Публикует такты ticks ({bssid: rssi} по адаптерам) и возвращает последний кадр."""
+    store = data_sync.avg_rssi_data
+    while store.adapters < len(ticks[0]):
+        store.add_adapter()
+    for readings in ticks:
+        for row, values in enumerate(readings):
+            store.put(row, {data_sync.networks.intern(bssid, f'Network-{bssid[-1]}', 2412): value
+                            for bssid, value in values.items()})
+        snapshot = store.aggregate()
+        store.clear_raw()
+    data_sync.low_precision = low_precision
+    return data_sync.publish_frame(snapshot)
+
+
+def serve(data_sync):
+    server = StateServer(data_sync, port=0)
+    server.start()
+    host, port = server.address[:2]
+    return server, f'http://{host}:{port}'
+
+
+def get_json(url):
+    with urlopen(url, timeout=5) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+@pytest.fixture
+def data_sync():
+    return DataSync(avg_buffer_size=4)
+
+
+def test_frame_round_trip(data_sync):
+    frame = publish(data_sync, [{BSSIDS[0]: -60, BSSIDS[1]: -70}, {BSSIDS[0]: -62, BSSIDS[1]: -72}],
+                    [{BSSIDS[0]: -64, BSSIDS[1]: -74}, {BSSIDS[0]: -66, BSSIDS[1]: -76}], low_precision=True)
+    seq, timestamp, ids, history, counts, adapter_values, low_precision = decode_frame(encode_frame(frame))
+    assert seq == frame.seq
+    assert abs(timestamp - time.time()) < 1
+    np.testing.assert_array_equal(ids, frame.ids)
+    np.testing.assert_array_equal(history, frame.history)
+    np.testing.assert_array_equal(counts, frame.counts)
+    np.testing.assert_array_equal(adapter_values, frame.adapter_values)
+    assert low_precision
+
+
+def test_decode_rejects_unknown_format(data_sync):
+    data = bytearray(encode_frame(publish(data_sync, [{BSSIDS[0]: -60}])))
+    data[:4] = b'XXXX'
+    with pytest.raises(ValueError):
+        decode_frame(bytes(data))
+
+
+def test_state_and_networks(data_sync):
+    publish(data_sync, [{BSSIDS[0]: -60, BSSIDS[1]: -70}], [{BSSIDS[0]: -62, BSSIDS[1]: -72}])
+    server, url = serve(data_sync)
+    try:
+        state = get_json(f'{url}/state')
+        assert [entry['bssid'] for entry in state['networks']] == BSSIDS[:2]
+        assert state['networks'][0]['history'] == [-60, -62]
+        assert [entry['bssid'] for entry in get_json(f'{url}/networks?since=1')] == BSSIDS[1:2]
+        assert get_json(f'{url}/history?bssid={BSSIDS[1]}')['history'] == [-70, -72]
+    finally:
+        server.stop()
+
+
+def test_remote_client_maps_ids_to_local_index(data_sync):
+    frame = publish(data_sync, [{BSSIDS[0]: -60, BSSIDS[1]: -70, BSSIDS[2]: -80}],
+                    [{BSSIDS[0]: -61, BSSIDS[1]: -71, BSSIDS[2]: -81}])
+    # У клиента свои id: последняя сеть демона получает меньший id, чем первые две
+    networks = NetworkIndex()
+    networks.intern(BSSIDS[2], 'Network-c', 2412)
+    networks.intern('02:00:00:00:00:ff', 'Other', 2412)
+    server, url = serve(data_sync)
+    remote = RemoteDataSync(url, retry_delay=0.1, timeout=5, networks=networks)
+    subscription = remote.subscribe('test')
+    thread = threading.Thread(target=remote.start_collection, daemon=True)
+    thread.start()
+    try:
+        received = subscription.get(timeout=5)
+    finally:
+        remote.stop_collection()
+        server.stop()
+        thread.join(5)
+    assert received is not None and received.seq == frame.seq
+    np.testing.assert_array_equal(received.ids, [0, 2, 3])
+    for bssid in BSSIDS:
+        np.testing.assert_array_equal(received.get(bssid), frame.get(bssid))
+        np.testing.assert_array_equal(received.adapters_of(bssid), frame.adapters_of(bssid))
+    assert networks.ssid(networks.get(BSSIDS[0])) == 'Network-a'
@@ -0,0 +1,231 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+EVENT_HEADER = struct.Struct('iIII')
+
+logger = logging.getLogger(__name__)
+
+
+class DirectoryWatcher:
+    """
+    Следит за появлением и удалением файлов в каталоге (управляющие сокеты wpa_supplicant)
+    и вызывает callback() при каждом изменении.
+    На Linux используется inotify, иначе - сравнение содержимого каталога раз в poll_interval секунд.
+    """
+
+    def __init__(self, path, callback, poll_interval=2.0):
+        self.path = path
+        self.callback = callback
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='adapter-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        libc = self._load_libc()
+        while not self._stop.is_set():
+            if not os.path.isdir(self.path):
+                # Каталог появится вместе с первым адаптером
+                self._stop.wait(self.poll_interval)
+                if os.path.isdir(self.path):
+                    self.callback()
+                continue
+            if libc is not None and self._watch_inotify(libc):
+                continue
+            self._watch_polling()
+
+    @staticmethod
+    def _load_libc():
+        name = ctypes.util.find_library('c')
+        if not name:
+            return None
+        try:
+            libc = ctypes.CDLL(name, use_errno=True)
+            libc.inotify_init1
+        except (OSError, AttributeError):
+            return None
+        return libc
+
+    def _watch_inotify(self, libc):
+        """Ждет событий inotify, пока каталог существует. Возвращает False, если inotify недоступен."""
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            if libc.inotify_add_watch(fd, os.fsencode(self.path), WATCH_MASK) < 0:
+                return False
+            while not self._stop.is_set() and os.path.isdir(self.path):
+                readable, _, _ = select.select([fd], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+                if len(data) >= EVENT_HEADER.size:
+                    self.callback()
+            return True
+        finally:
+            os.close(fd)
+
+    def _watch_polling(self):
+        seen = set(os.listdir(self.path))
+        while not self._stop.wait(self.poll_interval):
+            if not os.path.isdir(self.path):
+                return
+            current = set(os.listdir(self.path))
+            if current != seen:
+                seen = current
+                self.callback()
+
+
+class AdapterWorker:
+    def __init__(self, iface, row):
+        self.iface = iface
+        self.name = iface.name()
+        self.row = row
+        self.stop_event = threading.Event()
+        self.thread = None
+
+
+class AdapterSupervisor:
+    """
+    Держит по одному потоку сбора на каждый подключенный адаптер.
+    При подключении или извлечении адаптера запускается или останавливается
+    только его поток, буферы остальных адаптеров и история не сбрасываются.
+    Источник сканирования может указать watch_path - каталог, за которым нужно следить;
+    без него список адаптеров опрашивается раз в poll_interval секунд.
+    """
+
+    def __init__(self, data_sync, poll_interval=2.0):
+        self.data_sync = data_sync
+        self.poll_interval = poll_interval
+        self.workers = {}
+        self._lock = threading.RLock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._watcher = None
+        self._poller = None
+
+    def start(self):
+        backend = self.data_sync.scan_backend()
+        watch_path = getattr(backend, 'watch_path', None)
+        if watch_path:
+            self._watcher = DirectoryWatcher(watch_path, self.refresh, self.poll_interval)
+            self._watcher.start()
+        else:
+            self._poller = threading.Thread(target=self._poll, name='adapter-poller', daemon=True)
+            self._poller.start()
+        self.refresh()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher:
+            self._watcher.stop()
+        with self._lock:
+            for worker in list(self.workers.values()):
+                worker.stop_event.set()
+        self.data_sync.reset_barrier(0)
+        # Будит wait_for_adapters, иначе без тайм-аута он ждал бы подключения вечно
+        self._changed.set()
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def refresh(self):
+        """Сверяет запущенные потоки со списком адаптеров и исправляет расхождение."""
+        if self._stop.is_set():
+            return
+        interfaces = {iface.name(): iface for iface in self.data_sync.get_ifaces()}
+        with self._lock:
+            removed = [name for name in self.workers if name not in interfaces]
+            added = [iface for name, iface in interfaces.items() if name not in self.workers]
+            if not removed and not added:
+                return
+            for name in removed:
+                logger.info('Адаптер %s извлечен', name)
+                self._detach(name)
+            for iface in added:
+                logger.info('Адаптер %s подключен', iface.name())
+                self._attach(iface)
+            self._reconfigure()
+
+    def _attach(self, iface):
+        worker = AdapterWorker(iface, self.data_sync.avg_rssi_data.add_adapter(iface.name()))
+        worker.thread = threading.Thread(
+            target=self._run_worker, args=(worker,), name=f'adapter-{worker.name}', daemon=True
+        )
+        self.workers[worker.name] = worker
+        worker.thread.start()
+
+    def _detach(self, name):
+        worker = self.workers.pop(name, None)
+        if worker is None:
+            return
+        worker.stop_event.set()
+        self.data_sync.avg_rssi_data.remove_adapter(worker.row)
+
+    def _reconfigure(self):
+        """Пересоздает барьер под новое число адаптеров и будит ожидающих."""
+        self.data_sync.low_precision = len(self.workers) == 1
+        self.data_sync.reset_barrier(len(self.workers))
+        self._changed.set()
+
+    def _run_worker(self, worker):
+        try:
+            self.data_sync.collect_rssi_thread(worker.iface, worker.row, worker.stop_event)
+        finally:
+            with self._lock:
+                # Поток завершился сам (адаптер пропал) - убираем только его
+                if self.workers.get(worker.name) is worker:
+                    self._detach(worker.name)
+                    self._reconfigure()
+                    self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        """
+        Повторная сверка через poll_interval секунд после самостоятельного завершения потока:
+        каталог watch_path при сбое адаптера может не измениться, и без нее адаптер,
+        оставшийся в списке, не был бы подключен снова.
+        """
+        if self._stop.is_set():
+            return
+        timer = threading.Timer(self.poll_interval, self.refresh)
+        timer.daemon = True
+        timer.start()
+
+    def wait_for_adapters(self, timeout=None):
+        """Блокирует, пока не подключится хотя бы один адаптер."""
+        while not self.workers and not self._stop.is_set():
+            self._changed.clear()
+            if self.workers:
+                break
+            if not self._changed.wait(timeout):
+                return bool(self.workers)
+        return bool(self.workers)
+
+    @property
+    def interfaces(self):
+        with self._lock:
+            return [worker.iface for worker in self.workers.values()]
@@ -0,0 +1,153 @@
+import numpy as np
+
+from utils.get_distance import get_distance
+
+# Коды вердиктов тренда в массивах пакетного анализа
+TREND_CODES = ("uncertain", "stationary", "up", "down")
+UNCERTAIN, STATIONARY, UP, DOWN = range(len(TREND_CODES))
+
+
+def analyze_trend(last_values, window_size=4, threshold=7, low_precision=False):
+    """
+    Анализирует тренд на основе последних значений.
+    Сравниваются средние двух соседних окон по window_size значений.
+    :return: 'up', 'down', 'stationary' или 'uncertain'.
+    """
+    if low_precision or last_values is None or len(last_values) < 2 * window_size:
+        return "uncertain"
+
+    values_list = list(last_values)
+    window1 = values_list[-2 * window_size:-window_size]
+    window2 = values_list[-window_size:]
+    avg1 = sum(window1) / len(window1)
+    avg2 = sum(window2) / len(window2)
+
+    if abs(avg1 - avg2) <= threshold:
+        return "stationary"  # Малое изменение
+    if avg1 < avg2:
+        return "up"
+    return "down"
+
+
+def check_jump(last_values, jump_threshold=10):
+    """Изменился ли сигнал за последний такт больше чем на jump_threshold."""
+    if last_values is None or len(last_values) < 2:
+        return False
+    return bool(abs(last_values[-1] - last_values[-2]) > jump_threshold)
+
+
+def spread_exceeded(rssi_values, interface_threshold=20):
+    """Расходятся ли замеры адаптеров больше чем на interface_threshold."""
+    if rssi_values is None or len(rssi_values) <= 1 or np.isnan(rssi_values).any():
+        return False
+    return bool(max(rssi_values) - min(rssi_values) > interface_threshold)
+
+
+def trend_codes(history, counts, window_size=4, threshold=7, low_precision=False):
+    """
+    analyze_trend для всех сетей сразу.
+    :param history: Матрица [сеть × history] последних средних, старые значения слева.
+    :param counts: Длина истории каждой сети.
+    :return: Массив кодов TREND_CODES (int8).
+    """
+    codes = np.full(len(counts), UNCERTAIN, dtype=np.int8)
+    size = history.shape[1]
+    if low_precision or 2 * window_size > size:
+        return codes
+    avg1 = history[:, size - 2 * window_size:size - window_size].mean(axis=1)
+    avg2 = history[:, size - window_size:].mean(axis=1)
+    diff = avg2 - avg1
+    codes[diff > threshold] = UP
+    codes[diff < -threshold] = DOWN
+    codes[np.abs(diff) <= threshold] = STATIONARY
+    codes[counts < 2 * window_size] = UNCERTAIN
+    return codes
+
+
+def trend_codes_from_delta(delta, threshold=7, low_precision=False):
+    """
+    Вердикты тренда по готовой разности средних соседних окон (RollingSnapshot.delta).
+    NaN в delta (истории меньше двух окон) дает 'uncertain'.
+    """
+    codes = np.full(len(delta), UNCERTAIN, dtype=np.int8)
+    if low_precision:
+        return codes
+    codes[delta > threshold] = UP
+    codes[delta < -threshold] = DOWN
+    codes[np.abs(delta) <= threshold] = STATIONARY
+    return codes
+
+
+def jump_flags(history, counts, jump_threshold=10):
+    """check_jump для всех сетей сразу."""
+    if history.shape[1] < 2:
+        return np.zeros(len(counts), dtype=bool)
+    jumps = np.abs(history[:, -1] - history[:, -2]) > jump_threshold
+    return jumps & (counts >= 2)
+
+
+def adapter_spread(adapter_values):
+    """
+    Разброс замеров адаптеров (максимум - минимум) для всех сетей сразу.
+    :param adapter_values: Матрица [адаптер × сеть].
+    :return: Массив разбросов; NaN, если адаптер один или какой-то адаптер сеть не видит.
+    """
+    if adapter_values is None or adapter_values.shape[0] <= 1:
+        return None
+    return adapter_values.max(axis=0) - adapter_values.min(axis=0)
+
+
+def spread_flags(adapter_values, interface_threshold=20):
+    """spread_exceeded для всех сетей сразу; None, если замеров адаптеров нет."""
+    spread = adapter_spread(adapter_values)
+    if spread is None:
+        return None
+    return spread > interface_threshold
+
+
+class FrameAnalysis:
+    """
+    Вердикты тренда, скачки, превышение разброса адаптеров и оценки расстояния
+    для всех сетей кадра Frame. Массивы идут в порядке frame.ids.
+    Если в кадре есть скользящая статистика (frame.stats), тренд и скачки берутся из нее
+    за O(1) на сеть, а окно тренда - ее окно, а не window_size.
+    Расстояния считаются по таблицам tables (utils/path_loss.py) с моделями точек доступа,
+    без них - по модели get_distance.
+    """
+
+    def __init__(self, frame, window_size=4, threshold=7, jump_threshold=10, interface_threshold=20, N=None,
+                 tables=None):
+        self.frame = frame
+        history = frame.history
+        if frame.stats is not None:
+            self.trends = trend_codes_from_delta(frame.stats.delta, threshold, frame.low_precision)
+            self.jumps = np.abs(frame.stats.jump) > jump_threshold
+        else:
+            self.trends = trend_codes(history, frame.counts, window_size, threshold, frame.low_precision)
+            self.jumps = jump_flags(history, frame.counts, jump_threshold)
+        spread = spread_flags(frame.adapter_values, interface_threshold)
+        self.spread_exceeded = spread if spread is not None else np.zeros(len(frame), dtype=bool)
+        if not len(frame):
+            self.distances = np.zeros(0)
+        elif tables is not None:
+            self.distances = tables.distances(frame.ids, frame.latest, N)
+        else:
+            self.distances = get_distance(frame.latest, N=N)
+
+    def verdict(self, bssid):
+        """Вердикт тренда точки доступа ('uncertain', если ее нет в кадре)."""
+        pos = self.frame.position(bssid)
+        if pos is None:
+            return TREND_CODES[UNCERTAIN]
+        return TREND_CODES[self.trends[pos]]
+
+    def get(self, bssid):
+        """
+        Результаты анализа одной точки доступа.
+        :return: (вердикт, скачок, превышение разброса, расстояние) или None.
+        """
+        pos = self.frame.position(bssid)
+        if pos is None:
+            return None
+        return (TREND_CODES[self.trends[pos]], bool(self.jumps[pos]), bool(self.spread_exceeded[pos]),
+                float(self.distances[pos]))
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pywifi import const
+
+from data_sync import AGGREGATION_SECONDS, ASYNC_MODE, SCAN_FAILURES, SCAN_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCollectionEngine:
+    """
+    Альтернатива DataSync.start_collection на asyncio.
+    Каждый адаптер обслуживается задачей: ожидание окончания предыдущего сканирования,
+    scan() и scan_results() выполняются в собственном пуле потоков движка, а не в отдельном
+    потоке на адаптер. Пул не ждет зависших вызовов при остановке, а список адаптеров, который
+    может ждать прав на сокеты сколь угодно долго, запрашивается в daemon-потоке.
+    Такт усредняет замеры за последние fusion_window секунд (как режим 'async' DataSync)
+    и рассылает кадры подписчикам через asyncio-очереди. Кадры публикуются и в шину data_sync,
+    поэтому страницы GUI работают с движком без изменений.
+    """
+
+    def __init__(self, data_sync, interval=1, status_timeout=5.0, poll_interval=0.1, refresh_interval=2.0):
+        self.data_sync = data_sync
+        self.interval = interval
+        self.status_timeout = status_timeout
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self._adapters = {}
+        self._subscribers = []
+        # Событие создается сразу: stop() до run() не теряется, и run() завершится без ожидания
+        self._stopping = asyncio.Event()
+        self._loop = None
+        self._executor = None
+
+    def subscribe(self, maxsize=8):
+        """Возвращает очередь кадров Frame. При переполнении старые кадры вытесняются."""
+        queue = asyncio.Queue(maxsize)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    async def run(self):
+        """Работает до вызова stop(); при выходе все задачи адаптеров отменяются."""
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(thread_name_prefix='async-scan')
+        watcher = asyncio.create_task(self._watch_adapters())
+        aggregator = asyncio.create_task(self._aggregate())
+        try:
+            await self._stopping.wait()
+        finally:
+            tasks = [watcher, aggregator, *(task for task, _ in self._adapters.values())]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for name in list(self._adapters):
+                self._release(name)
+            # asyncio.run ждет только пул по умолчанию; свой пул не задерживает остановку
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self):
+        """Останавливает движок; можно вызывать из любого потока."""
+        if self._loop is None or self._loop.is_closed():
+            self._stopping.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        except RuntimeError:
+            # Цикл закрылся между проверкой и вызовом
+            self._stopping.set()
+
+    def _call(self, function):
+        """Выполняет блокирующую function в пуле движка."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, function)
+
+    @staticmethod
+    async def _call_detached(function, name):
+        """
+        Выполняет блокирующую function в отдельном daemon-потоке: ни остановка движка,
+        ни завершение процесса не ждут ее возврата.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def deliver(setter, value):
+            if not future.done():
+                setter(value)
+
+        def target():
+            try:
+                setter, value = future.set_result, function()
+            except Exception as e:
+                setter, value = future.set_exception, e
+            try:
+                loop.call_soon_threadsafe(deliver, setter, value)
+            except RuntimeError:
+                pass  # Движок уже остановлен
+
+        threading.Thread(target=target, name=name, daemon=True).start()
+        return await future
+
+    async def _watch_adapters(self):
+        while not self._stopping.is_set():
+            interfaces = await self._call_detached(self.data_sync.get_ifaces, 'async-adapters')
+            names = {iface.name(): iface for iface in interfaces}
+            for name in [name for name in self._adapters if name not in names]:
+                logger.info('Адаптер %s извлечен', name)
+                task, _ = self._adapters[name]
+                task.cancel()
+                self._release(name)
+            for name, iface in names.items():
+                if name not in self._adapters:
+                    logger.info('Адаптер %s подключен', name)
+                    row = self.data_sync.avg_rssi_data.add_adapter(name)
+                    self._adapters[name] = (asyncio.create_task(self._scan_adapter(iface, row)), row)
+            self.data_sync.low_precision = len(self._adapters) == 1
+            await asyncio.sleep(self.refresh_interval)
+
+    def _release(self, name):
+        _, row = self._adapters.pop(name)
+        self.data_sync.avg_rssi_data.remove_adapter(row)
+
+    async def wait_idle(self, iface):
+        """Ждет, пока адаптер закончит предыдущее сканирование, не дольше status_timeout секунд."""
+        async def poll():
+            while await self._call(iface.status) == const.IFACE_SCANNING:
+                await asyncio.sleep(self.poll_interval)
+
+        await asyncio.wait_for(poll(), self.status_timeout)
+
+    async def _scan_adapter(self, iface, row):
+        name = iface.name()
+        # Флаг проверяется явно: wait_for в Python 3.11 может поглотить отмену задачи
+        while not self._stopping.is_set():
+            started_at = time.monotonic()
+            try:
+                await self.wait_idle(iface)
+                scan_started_at = time.perf_counter()
+                await self._call(iface.scan)
+                scan_results = await self._call(iface.scan_results)
+                SCAN_SECONDS.observe(time.perf_counter() - scan_started_at, adapter=name)
+            except asyncio.TimeoutError:
+                logger.warning('Адаптер %s не завершил сканирование за %s с', name, self.status_timeout)
+                continue
+            except ConnectionRefusedError:
+                SCAN_FAILURES.inc(adapter=name)
+                logger.warning('Адаптер %s был неожиданно отключен', name)
+                if self._adapters.get(name, (None, None))[1] == row:
+                    self._release(name)
+                return
+            # Пустое сканирование - обычный такт, как в collect_rssi_thread: адаптер сообщает, что сетей не видит
+            readings = self.data_sync.parse_scan_results(scan_results)
+            self.data_sync.avg_rssi_data.put(row, readings)
+            if self.data_sync.recorder is not None:
+                self.data_sync.recorder.record(name, readings)
+            await asyncio.sleep(max(0.0, started_at + self.interval - time.monotonic()))
+
+    async def _aggregate(self):
+        data_sync = self.data_sync
+        cleared = False
+        while not self._stopping.is_set():
+            await asyncio.sleep(self.interval)
+            if not self._adapters:
+                # Как DataSync.start_collection: без адаптеров история удаляется один раз
+                if not cleared:
+                    logger.warning('Все адаптеры были изъяты, ожидание подключения')
+                    self._broadcast(data_sync.clear_history())
+                    cleared = True
+                continue
+            cleared = False
+            with data_sync.locked():
+                with AGGREGATION_SECONDS.time(mode=ASYNC_MODE):
+                    snapshot = data_sync.avg_rssi_data.fuse(data_sync.fusion_window)
+                if snapshot is None:
+                    continue
+                data_sync.last_rssi_snapshot = snapshot
+                data_sync.condition.notify()  # Уведомляем о новых данных
+            self._broadcast(data_sync.publish_frame(snapshot))
+
+    def _broadcast(self, frame):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
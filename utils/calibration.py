@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from utils.config import get_option
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_PATH = os.path.expanduser('~/.config/rssi_analyzer/calibration.json')
+# Диапазоны Wi-Fi: индекс диапазона - номер столбца таблиц поправок
+BANDS = ('2.4', '5', '6')
+BAND_EDGES = (3000, 5925)
+
+
+def band_index(freqs):
+    """Номер диапазона BANDS по частоте в МГц (неизвестная частота считается 2.4 ГГц)."""
+    return np.searchsorted(BAND_EDGES, freqs, side='right')
+
+
+def adapter_mac(name):
+    """
+    MAC-адрес адаптера из /sys/class/net/<name>/address.
+    Для адаптеров без sysfs (синтетических, воспроизводимых) ключом профиля служит имя.
+    """
+    try:
+        with open(f'/sys/class/net/{name}/address', encoding='ascii') as file:
+            return file.read().strip().lower()
+    except OSError:
+        return f'name:{name}'
+
+
+class Calibrator:
+    """
+    Поправки RSSI адаптеров по диапазонам, обучаемые на сканированиях адаптеров, стоящих рядом.
+    Для каждой сети такта, которую видят хотя бы два адаптера, согласованное значение - среднее
+    исправленных замеров; невязка адаптера - его сырой замер минус это среднее. Поправка - среднее
+    невязок адаптера в диапазоне сети, ее разброс задает вес адаптера в FusionEngine.
+    Поправки относительные: исправленные замеры приводятся к среднему уровню адаптеров.
+    Накопленные суммы ограничены max_samples, поэтому поправки медленно следуют за дрейфом.
+    Профили хранятся в JSON по MAC-адресу адаптера и подгружаются при его подключении.
+    Поправка применяется, когда замеров диапазона не меньше min_samples.
+    """
+
+    def __init__(self, networks, path=CALIBRATION_PATH, learn=True, min_samples=50, max_samples=100000,
+                 fusion=None):
+        self.networks = networks
+        self.path = path
+        self.learn = learn
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.fusion = fusion
+        self._lock = threading.Lock()
+        self.macs = []
+        self._allocate(0)
+        self._bands = np.zeros(0, dtype=np.intp)
+        self._profiles = self._load()
+
+    def _allocate(self, rows):
+        shape = (rows, len(BANDS))
+        self.sums = np.zeros(shape)
+        self.squares = np.zeros(shape)
+        self.counts = np.zeros(shape)
+        self.offsets = np.zeros(shape, dtype=np.float32)
+
+    def _ensure_rows(self, rows):
+        old = self.sums.shape[0]
+        if rows <= old:
+            return
+        arrays = (self.sums, self.squares, self.counts, self.offsets)
+        self._allocate(rows)
+        for new, array in zip((self.sums, self.squares, self.counts, self.offsets), arrays):
+            new[:old] = array
+        self.macs.extend([None] * (rows - old))
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning('Не удалось прочитать профили калибровки %s: %s', self.path, e)
+            return {}
+
+    def attach(self, row, name):
+        """Подгружает профиль адаптера name (по его MAC) в строку row."""
+        mac = adapter_mac(name)
+        with self._lock:
+            self._ensure_rows(row + 1)
+            self.macs[row] = mac
+            self.sums[row] = self.squares[row] = self.counts[row] = 0
+            for band, entry in self._profiles.get(mac, {}).items():
+                if band not in BANDS:
+                    continue
+                column = BANDS.index(band)
+                samples = entry['samples']
+                self.sums[row, column] = entry['offset'] * samples
+                self.squares[row, column] = (entry['variance'] + entry['offset'] ** 2) * samples
+                self.counts[row, column] = samples
+            self._update_offsets(row)
+        if mac in self._profiles:
+            logger.info('Профиль калибровки %s (%s): %s', name, mac, self.profile(row))
+
+    def detach(self, row):
+        """Сохраняет профиль адаптера строки row и освобождает строку."""
+        with self._lock:
+            if row >= len(self.macs) or self.macs[row] is None:
+                return
+            self._profiles[self.macs[row]] = self.profile(row)
+            self.macs[row] = None
+            self.sums[row] = self.squares[row] = self.counts[row] = 0
+            self.offsets[row] = 0
+        self.save()
+
+    def profile(self, row):
+        """{диапазон: {offset, variance, samples}} по накопленным невязкам строки row."""
+        result = {}
+        for column, band in enumerate(BANDS):
+            samples = self.counts[row, column]
+            if not samples:
+                continue
+            offset = self.sums[row, column] / samples
+            result[band] = {'offset': round(float(offset), 3),
+                            'variance': round(float(max(self.squares[row, column] / samples - offset ** 2, 0)), 3),
+                            'samples': int(samples)}
+        return result
+
+    def save(self):
+        """Записывает профили всех адаптеров (подключенных и сохраненных ранее) в файл path."""
+        if not self.path:
+            return
+        with self._lock:
+            for row, mac in enumerate(self.macs):
+                if mac is not None:
+                    self._profiles[mac] = self.profile(row)
+            profiles = dict(self._profiles)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(profiles, file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def _network_bands(self, size):
+        if size > len(self._bands):
+            self._bands = band_index(self.networks.freqs[:size])
+        return self._bands[:size]
+
+    def _update_offsets(self, rows):
+        counts = self.counts[rows]
+        ready = counts >= self.min_samples
+        self.offsets[rows] = np.where(ready, self.sums[rows] / np.maximum(counts, 1), 0)
+        if self.fusion is None:
+            return
+        # Вес адаптера - обратная дисперсия невязок (не меньше 1 дБ²), пока она не оценена - 1
+        for row in np.atleast_1d(rows):
+            samples = self.counts[row].sum()
+            if samples < self.min_samples:
+                continue
+            # Дисперсия внутри диапазонов: разница поправок диапазонов в нее не входит
+            counts = np.maximum(self.counts[row], 1)
+            scatter = (self.squares[row] - self.sums[row] ** 2 / counts).sum()
+            variance = max(scatter / samples, 1.0)
+            self.fusion.set_weight(row, 1.0 / variance)
+
+    def process(self, block, rows):
+        """
+        Исправляет замеры такта и, если learn, учитывает их невязки.
+        :param block: Сырые замеры [строка × сеть] (NaN - нет замера).
+        :param rows: Номера строк адаптеров block.
+        :return: Исправленные замеры той же формы.
+        """
+        with self._lock:
+            self._ensure_rows(max(rows, default=-1) + 1)
+            bands = self._network_bands(block.shape[1])
+            offsets = self.offsets[rows][:, bands]
+            corrected = block - offsets
+            if self.learn and len(rows) > 1:
+                self._learn(block, corrected, rows, bands)
+        return corrected
+
+    def _learn(self, block, corrected, rows, bands):
+        seen = ~np.isnan(block)
+        shared = seen.sum(axis=0) >= 2
+        if not shared.any():
+            return
+        block = block[:, shared]
+        seen = seen[:, shared]
+        bands = bands[shared]
+        consensus = np.where(seen, corrected[:, shared], 0).sum(axis=0) / seen.sum(axis=0)
+        residuals = np.where(seen, block - consensus, 0)
+        for column in range(len(BANDS)):
+            in_band = bands == column
+            if not in_band.any():
+                continue
+            self.sums[rows, column] += residuals[:, in_band].sum(axis=1)
+            self.squares[rows, column] += (residuals[:, in_band] ** 2).sum(axis=1)
+            self.counts[rows, column] += seen[:, in_band].sum(axis=1)
+        # Старые невязки забываются пропорционально, когда их больше max_samples
+        excess = self.counts[rows] > self.max_samples
+        if excess.any():
+            scale = np.where(excess, self.max_samples / np.maximum(self.counts[rows], 1), 1)
+            self.sums[rows] *= scale
+            self.squares[rows] *= scale
+            self.counts[rows] *= scale
+        self._update_offsets(rows)
+
+
+def create_calibrator(networks, mode=None, path=None, fusion=None):
+    """
+    Создает калибровку по параметрам; недостающие берутся из секции [calibration] config.ini
+    (mode, path, min_samples).
+    :param mode: 'learn' - применять и обучать поправки, 'apply' - только применять, 'off' - без калибровки.
+    :return: Calibrator или None.
+    """
+    if mode is None:
+        mode = get_option('calibration', 'mode', 'off')
+    if mode not in ('learn', 'apply', 'off'):
+        raise ValueError(f'Неизвестный режим калибровки: {mode}')
+    if mode == 'off':
+        return None
+    if path is None:
+        path = get_option('calibration', 'path', CALIBRATION_PATH)
+    return Calibrator(networks, path, learn=mode == 'learn',
+                      min_samples=int(get_option('calibration', 'min_samples', 50)), fusion=fusion)
@@ -0,0 +1,32 @@
+import configparser
+import os
+
+CONFIG_PATH = os.environ.get(
+    'RSSI_ANALYZER_CONFIG', os.path.expanduser('~/.config/rssi_analyzer/config.ini')
+)
+
+_config = None
+
+
+def load_config(path=None):
+    """Читает config.ini один раз; отсутствующий файл равносилен пустой конфигурации."""
+    global _config
+    if path is not None:
+        config = configparser.ConfigParser()
+        config.read(path, encoding='utf-8')
+        return config
+    if _config is None:
+        _config = configparser.ConfigParser()
+        _config.read(CONFIG_PATH, encoding='utf-8')
+    return _config
+
+
+def get_option(section, key, fallback=None):
+    """
+    Значение параметра конфигурации.
+    Переменная окружения RSSI_ANALYZER_<SECTION>_<KEY> имеет приоритет над файлом.
+    """
+    env_value = os.environ.get(f'RSSI_ANALYZER_{section}_{key}'.upper())
+    if env_value is not None:
+        return env_value
+    return load_config().get(section, key, fallback=fallback)
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from utils.data_bus import DataBus
+from utils.network_index import NetworkIndex
+from utils.remote_client import RemoteDataSync
+from utils.rssi_store import RssiStore
+from utils.state_server import decode_frame
+
+
+class CollectorNode(RemoteDataSync):
+    """
+    Поток /stream одного сборщика. Вместо публикации кадров пишет последние средние
+    узла в строку row хранилища координатора с временем кадра по time.time().
+    """
+
+    def __init__(self, url, coordinator, row, **kwargs):
+        super().__init__(url, networks=coordinator.networks, **kwargs)
+        self.coordinator = coordinator
+        self.row = row
+        self.frames = 0
+        self.last_frame_time = None
+
+    def _publish(self, payload):
+        seq, timestamp, ids, history, counts, adapter_values, low_precision = decode_frame(payload)
+        if not len(ids):
+            return
+        self.coordinator.store.put_arrays(self.row, self._id_map[ids], history[:, -1], timestamp)
+        self.frames += 1
+        self.last_frame_time = timestamp
+
+
+class Coordinator:
+    """
+    Объединяет потоки нескольких сборщиков (daemon.py) в общие оценки по BSSID.
+    Каждый узел - строка хранилища RssiStore, как адаптер в DataSync. Раз в interval секунд
+    берутся замеры узлов с временем кадра не старше fusion_window секунд по общим
+    часам time.time(), и для каждой сети усредняются узлы, которые ее видят.
+    Кадры координатора публикуются в шину так же, как кадры DataSync (замеры «адаптеров»
+    кадра - значения узлов), поэтому его можно отдавать через StateServer и смотреть в GUI.
+    Узлы принимаются в своих потоках и только пишут в хранилище, такт не ждет ни одного узла.
+    """
+
+    def __init__(self, urls, interval=1.0, fusion_window=2.5, history=8):
+        self.interval = interval
+        self.fusion_window = fusion_window
+        self.networks = NetworkIndex()
+        self.store = RssiStore(history=history, networks=self.networks, intersect=False)
+        self.bus = DataBus()
+        self.low_precision = False
+        self.nodes = [CollectorNode(url, self, self.store.add_adapter()) for url in urls]
+        self._frame_seq = 0
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def subscribe(self, name, maxsize=4):
+        return self.bus.subscribe(name, maxsize)
+
+    def unsubscribe(self, subscription):
+        self.bus.unsubscribe(subscription)
+
+    def start(self):
+        for node in self.nodes:
+            thread = threading.Thread(target=node.start_collection, name=f'Node {node.url}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self.run, name='Coordinator', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+        for node in self.nodes:
+            node.stop_collection()
+
+    def run(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stopping.wait(max(next_tick - time.monotonic(), 0)):
+            next_tick += self.interval
+            self.tick()
+
+    def tick(self, now=None):
+        """Публикует такт: оценки по замерам узлов за последние fusion_window секунд."""
+        snapshot = self.store.fuse(self.fusion_window, now if now is not None else time.time())
+        if snapshot is None:
+            return None
+        self._frame_seq += 1
+        frame = self.store.frame(self._frame_seq, snapshot)
+        self.bus.publish(frame)
+        return frame
+
+    def node_status(self):
+        """Состояние узлов: [{url, frames, lag}], lag - возраст последнего кадра в секундах."""
+        now = time.time()
+        return [{'url': node.url, 'frames': node.frames,
+                 'lag': None if node.last_frame_time is None else now - node.last_frame_time}
+                for node in self.nodes]
+
@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+
+
+class Frame:
+    """
+    Неизменяемый срез данных за один такт.
+    ids - отсортированные id видимых сетей, history - их последние средние [сеть × history]
+    (слева NaN, если истории меньше), counts - длина истории, adapter_values - замеры
+    адаптеров за такт [адаптер × сеть] или None. Массивы принадлежат кадру и закрыты на запись.
+    stats - RollingSnapshot скользящей статистики видимых сетей или None, если она не ведется.
+    """
+
+    def __init__(self, seq, timestamp, networks, ids, history, counts, adapter_values=None, low_precision=False,
+                 stats=None):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.networks = networks
+        self.ids = ids
+        self.history = history
+        self.counts = counts
+        self.adapter_values = adapter_values
+        self.low_precision = low_precision
+        self.stats = stats
+        for array in (ids, history, counts, adapter_values):
+            if array is not None:
+                array.flags.writeable = False
+
+    @classmethod
+    def empty(cls, seq, networks, history_size=8, low_precision=False):
+        return cls(seq, time.monotonic(), networks, np.zeros(0, dtype=np.intp),
+                   np.zeros((0, history_size), dtype=np.float32), np.zeros(0, dtype=np.int32),
+                   low_precision=low_precision)
+
+    def position(self, bssid):
+        """Номер точки доступа в массивах кадра или None, если ее нет в кадре."""
+        network_id = self.networks.get(bssid)
+        if network_id is None:
+            return None
+        pos = int(np.searchsorted(self.ids, network_id))
+        if pos == len(self.ids) or self.ids[pos] != network_id:
+            return None
+        return pos
+
+    def get(self, bssid):
+        """История средних точки доступа (старые значения первыми) или None."""
+        pos = self.position(bssid)
+        if pos is None:
+            return None
+        return self.history[pos, self.history.shape[1] - self.counts[pos]:]
+
+    def adapters_of(self, bssid):
+        """Замеры всех адаптеров для точки доступа за этот такт или None."""
+        pos = self.position(bssid)
+        if pos is None or self.adapter_values is None:
+            return None
+        return self.adapter_values[:, pos]
+
+    @property
+    def latest(self):
+        """Последние средние всех видимых сетей в порядке ids."""
+        return self.history[:, -1]
+
+    def group_leaders(self):
+        """
+        Сильнейшая точка доступа каждого SSID кадра по индексу SSID из NetworkIndex.
+        :return: (позиции сильнейших точек в массивах кадра, число видимых точек их SSID).
+        """
+        if not len(self.ids):
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        ssid_ids = self.networks.ssid_ids[self.ids]
+        # Сортировка по SSID, внутри SSID - по убыванию RSSI; при равенстве первой идет меньшая позиция
+        order = np.lexsort((-self.latest, ssid_ids))
+        sorted_ids = ssid_ids[order]
+        first = np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1]))
+        starts = np.flatnonzero(first)
+        return order[starts], np.diff(np.append(starts, len(order)))
+
+    def groups(self):
+        """
+        Группы видимых точек доступа по SSID.
+        :return: Словарь {ssid: (bssid сильнейшей точки, ее rssi, количество точек)}.
+        """
+        positions, counts = self.group_leaders()
+        latest = self.latest
+        networks = self.networks
+        return {networks.ssid(network_id): (networks.bssid(network_id), latest[pos], count)
+                for pos, network_id, count in zip(positions, self.ids[positions].tolist(), counts.tolist())}
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class Subscription:
+    """
+    Ограниченная очередь кадров одного подписчика.
+    При переполнении вытесняется самый старый кадр, поэтому медленный подписчик
+    никогда не задерживает сборщик, а только пропускает кадры.
+    """
+
+    def __init__(self, name, maxsize=4):
+        self.name = name
+        self._frames = deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self._closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.last_published_seq = 0
+        self.last_consumed_seq = 0
+        self.last_latency = 0.0
+
+    def push(self, frame):
+        with self._condition:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append((time.monotonic(), frame))
+            self.last_published_seq = frame.seq
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """Следующий кадр или None, если он не пришел за timeout секунд или подписка закрыта."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._frames or self._closed, timeout):
+                return None
+            if not self._frames:
+                return None
+            published_at, frame = self._frames.popleft()
+            self._consume(published_at, frame)
+            return frame
+
+    def get_latest(self):
+        """Самый свежий кадр без ожидания (остальные считаются пропущенными) или None."""
+        with self._condition:
+            if not self._frames:
+                return None
+            self.dropped += len(self._frames) - 1
+            published_at, frame = self._frames.pop()
+            self._frames.clear()
+            self._consume(published_at, frame)
+            return frame
+
+    def _consume(self, published_at, frame):
+        self.delivered += 1
+        self.last_consumed_seq = frame.seq
+        self.last_latency = time.monotonic() - published_at
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def lag(self):
+        """Насколько кадров подписчик отстает от издателя."""
+        return self.last_published_seq - self.last_consumed_seq
+
+    def metrics(self):
+        with self._condition:
+            return {
+                'queued': len(self._frames),
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'lag': self.lag,
+                'last_latency': self.last_latency,
+            }
+
+
+class DataBus:
+    """Рассылает кадры всем подписчикам; публикация не блокируется на подписчиках."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        self.last_frame = None
+        self._metrics_collector = None
+
+    def subscribe(self, name, maxsize=4):
+        subscription = Subscription(name, maxsize)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, frame):
+        self.last_frame = frame
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.push(frame)
+
+    def metrics(self):
+        """Метрики подписчиков {имя: {queued, delivered, dropped, lag, last_latency}}."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return {subscription.name: subscription.metrics() for subscription in subscriptions}
+
+    def export_metrics(self, registry=REGISTRY):
+        """Публикует глубину очередей, доставленные и пропущенные кадры подписчиков в реестре метрик."""
+        if self._metrics_collector is not None:
+            return self._metrics_collector
+        queued = registry.gauge('rssi_subscription_queue_depth', 'Кадров в очереди подписчика', ('subscriber',))
+        # Счетчики подписки живут вместе с ней и исчезают при отписке, поэтому это уровни, а не
+        # счетчики Prometheus: ряд _total не может уменьшаться или пропадать
+        delivered = registry.gauge('rssi_subscription_frames_delivered', 'Кадров, полученных подписчиком',
+                                   ('subscriber',))
+        dropped = registry.gauge('rssi_subscription_frames_dropped', 'Кадров, пропущенных подписчиком',
+                                 ('subscriber',))
+        lag = registry.gauge('rssi_subscription_lag_frames', 'Отставание подписчика от издателя (в кадрах)',
+                             ('subscriber',))
+
+        def collect():
+            metrics = self.metrics()
+            # Закрытые подписки не остаются в выводе
+            for family in (queued, delivered, dropped, lag):
+                family.clear()
+            for name, values in metrics.items():
+                queued.set(values['queued'], subscriber=name)
+                delivered.set(values['delivered'], subscriber=name)
+                dropped.set(values['dropped'], subscriber=name)
+                lag.set(values['lag'], subscriber=name)
+
+        registry.add_collector(collect)
+        self._metrics_collector = collect
+        return collect
@@ -0,0 +1,244 @@
+import warnings
+
+import numpy as np
+
+from utils.config import get_option
+
+
+class SignalFilter:
+    """
+    Фильтр усредненного RSSI, применяемый ко всем сетям сразу перед записью в историю.
+    Состояние хранится массивами с индексом id сети (перечислены в _state_names)
+    и растет вместе с NetworkIndex. Обработка одного замера - O(1) (для оконных - O(k)).
+    Когда сеть пропадает из такта, ее состояние сбрасывается, как и ее история в RssiStore.
+    """
+
+    name = 'none'
+    _state_names = ()
+
+    def __init__(self):
+        self.capacity = 0
+        self._allocate(0)
+
+    def _allocate(self, capacity):
+        pass
+
+    def ensure_capacity(self, size):
+        if size <= self.capacity:
+            return
+        old = {name: getattr(self, name) for name in self._state_names}
+        self.capacity = max(size, 2 * self.capacity, 16)
+        self._allocate(self.capacity)
+        for name, array in old.items():
+            getattr(self, name)[:len(array)] = array
+
+    def update(self, values, present, held=None):
+        """
+        :param values: Средние такта по сетям (NaN - сети нет в такте).
+        :param present: Маска сетей, у которых в такте есть новые замеры.
+        :param held: Маска сетей, удержанных FusionEngine с последним значением: их состояние
+            не обновляется и не сбрасывается, а значение из values (последнее отфильтрованное) передается как есть.
+        :return: Отфильтрованные значения, NaN там, где сети нет.
+        """
+        size = len(values)
+        self.ensure_capacity(size)
+        result = self._update(values.astype(np.float32), present)
+        kept = present if held is None else present | held
+        self.reset(np.flatnonzero(~kept))
+        result[~present] = np.nan
+        if held is not None:
+            result[held] = values[held]
+        return result
+
+    def _update(self, values, present):
+        return values
+
+    def reset(self, ids=None):
+        """Сбрасывает состояние сетей ids (всех, если None)."""
+        pass
+
+
+class EwmaFilter(SignalFilter):
+    """Экспоненциальное скользящее среднее: y = alpha * x + (1 - alpha) * y."""
+
+    name = 'ewma'
+    _state_names = ('value',)
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        super().__init__()
+
+    def _allocate(self, capacity):
+        self.value = np.full(capacity, np.nan, dtype=np.float32)
+
+    def _update(self, values, present):
+        size = len(values)
+        previous = self.value[:size]
+        smoothed = np.where(np.isnan(previous), values, self.alpha * values + (1 - self.alpha) * previous)
+        previous[present] = smoothed[present]
+        return smoothed
+
+    def reset(self, ids=None):
+        self.value[slice(None) if ids is None else ids] = np.nan
+
+
+class KalmanFilter(SignalFilter):
+    """
+    Одномерный фильтр Калмана со случайным блужданием уровня сигнала.
+    :param process_noise: Дисперсия изменения RSSI за такт (дБм²).
+    :param measurement_noise: Дисперсия шума замера (дБм²).
+    """
+
+    name = 'kalman'
+    _state_names = ('estimate', 'variance')
+
+    def __init__(self, process_noise=0.5, measurement_noise=4.0):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        super().__init__()
+
+    def _allocate(self, capacity):
+        self.estimate = np.full(capacity, np.nan, dtype=np.float32)
+        self.variance = np.zeros(capacity, dtype=np.float32)
+
+    def _update(self, values, present):
+        size = len(values)
+        estimate = self.estimate[:size]
+        variance = self.variance[:size]
+        first = np.isnan(estimate)
+        predicted = variance + self.process_noise
+        gain = predicted / (predicted + self.measurement_noise)
+        updated = np.where(first, values, estimate + gain * (values - estimate))
+        updated_variance = np.where(first, self.measurement_noise, (1 - gain) * predicted)
+        estimate[present] = updated[present]
+        variance[present] = updated_variance[present]
+        return updated
+
+    def reset(self, ids=None):
+        ids = slice(None) if ids is None else ids
+        self.estimate[ids] = np.nan
+        self.variance[ids] = 0
+
+
+class WindowFilter(SignalFilter):
+    """Основа оконных фильтров: последние k значений каждой сети в кольце [сеть × k]."""
+
+    _state_names = ('window', 'pos')
+
+    def __init__(self, k=5):
+        self.k = k
+        super().__init__()
+
+    def _allocate(self, capacity):
+        self.window = np.full((capacity, self.k), np.nan, dtype=np.float32)
+        self.pos = np.zeros(capacity, dtype=np.intp)
+
+    def _push(self, values, present):
+        """Дописывает значения в окна; возвращает id сетей такта и их окна."""
+        ids = np.flatnonzero(present)
+        self.window[ids, self.pos[ids]] = values[ids]
+        self.pos[ids] = (self.pos[ids] + 1) % self.k
+        return ids, self.window[ids]
+
+    def reset(self, ids=None):
+        ids = slice(None) if ids is None else ids
+        self.window[ids] = np.nan
+        self.pos[ids] = 0
+
+    @staticmethod
+    def _median(windows):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmedian(windows, axis=1)
+
+
+class MedianFilter(WindowFilter):
+    """Медиана последних k значений."""
+
+    name = 'median'
+
+    def _update(self, values, present):
+        result = values.copy()
+        ids, windows = self._push(values, present)
+        if len(ids):
+            result[ids] = self._median(windows)
+        return result
+
+
+class HampelFilter(WindowFilter):
+    """
+    Отбраковка выбросов: значение, отклоняющееся от медианы окна больше чем на
+    n_sigmas оценок СКО (1.4826 * MAD), заменяется медианой.
+    """
+
+    name = 'hampel'
+
+    def __init__(self, k=7, n_sigmas=3.0):
+        self.n_sigmas = n_sigmas
+        super().__init__(k)
+
+    def _update(self, values, present):
+        result = values.copy()
+        ids, windows = self._push(values, present)
+        if not len(ids):
+            return result
+        median = self._median(windows)
+        mad = self._median(np.abs(windows - median[:, None]))
+        current = values[ids]
+        # Пока в окне меньше трех значений, отбраковывать не по чему
+        enough = np.count_nonzero(~np.isnan(windows), axis=1) >= 3
+        outliers = enough & (np.abs(current - median) > self.n_sigmas * 1.4826 * mad)
+        result[ids] = np.where(outliers, median, current)
+        return result
+
+
+class FilterChain(SignalFilter):
+    """Последовательное применение нескольких фильтров, например hampel и затем kalman."""
+
+    def __init__(self, filters):
+        self.filters = list(filters)
+        self.name = ','.join(signal_filter.name for signal_filter in self.filters)
+        super().__init__()
+
+    def ensure_capacity(self, size):
+        for signal_filter in self.filters:
+            signal_filter.ensure_capacity(size)
+
+    def _update(self, values, present):
+        for signal_filter in self.filters:
+            values = signal_filter._update(values, present)
+        return values
+
+    def reset(self, ids=None):
+        for signal_filter in self.filters:
+            signal_filter.reset(ids)
+
+
+FILTERS = {
+    'ewma': lambda: EwmaFilter(float(get_option('filters', 'ewma_alpha', 0.3))),
+    'kalman': lambda: KalmanFilter(float(get_option('filters', 'kalman_process_noise', 0.5)),
+                                   float(get_option('filters', 'kalman_measurement_noise', 4.0))),
+    'median': lambda: MedianFilter(int(get_option('filters', 'median_k', 5))),
+    'hampel': lambda: HampelFilter(int(get_option('filters', 'hampel_k', 7)),
+                                   float(get_option('filters', 'hampel_sigmas', 3.0))),
+}
+
+
+def create_filter(spec=None):
+    """
+    Создает фильтр по описанию вида 'hampel,kalman'.
+    По умолчанию описание берется из параметра chain секции [filters] config.ini.
+    Параметры фильтров читаются из той же секции (ewma_alpha, kalman_process_noise, ...).
+    :return: SignalFilter или None, если фильтрация отключена ('none' или пустое описание).
+    """
+    if spec is None:
+        spec = get_option('filters', 'chain', 'none')
+    names = [name.strip() for name in spec.split(',') if name.strip() and name.strip() != 'none']
+    unknown = [name for name in names if name not in FILTERS]
+    if unknown:
+        raise ValueError(f'Неизвестные фильтры: {", ".join(unknown)}')
+    if not names:
+        return None
+    if len(names) == 1:
+        return FILTERS[names[0]]()
+    return FilterChain(FILTERS[name]() for name in names)
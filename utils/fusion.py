@@ -0,0 +1,95 @@
+import numpy as np
+
+from utils.config import get_option
+
+UNION = 'union'
+INTERSECT = 'intersect'
+
+
+class FusionEngine:
+    """
+    Объединение замеров адаптеров за такт по всем сетям сразу: в такт попадает каждая сеть,
+    которую видит хотя бы один адаптер (объединение, а не пересечение).
+    Среднее сети взвешивается по адаптерам, которые ее видят: вес адаптера (калибровка, set_weight)
+    умножается на вес свежести замера exp(-age / recency_tau), если возраст замеров известен.
+    Сеть, которую в такте не увидел ни один адаптер, еще grace тактов остается в истории
+    с последним значением, поэтому пропуск одного сканирования не удаляет ее историю и строку списка.
+    Состояние хранится массивами с индексом id сети (как у фильтров) и строки адаптера.
+    """
+
+    def __init__(self, grace=2, recency_tau=None):
+        self.grace = grace
+        self.recency_tau = recency_tau
+        self.weights = np.ones(0)
+        self.missed = np.zeros(0, dtype=np.int32)
+
+    def ensure_capacity(self, adapters, size):
+        if adapters > len(self.weights):
+            self.weights = np.concatenate([self.weights, np.ones(adapters - len(self.weights))])
+        if size > len(self.missed):
+            missed = np.zeros(max(size, 2 * len(self.missed), 16), dtype=np.int32)
+            missed[:len(self.missed)] = self.missed
+            self.missed = missed
+
+    def set_weight(self, row, weight):
+        """Вес адаптера строки row в среднем (например, обратная дисперсия его калибровки)."""
+        self.ensure_capacity(row + 1, 0)
+        self.weights[row] = weight
+
+    def reset_adapter(self, row):
+        if row < len(self.weights):
+            self.weights[row] = 1.0
+
+    def fuse(self, block, rows, ages=None, last=None):
+        """
+        :param block: Замеры такта [строка × сеть], NaN - замера нет.
+        :param rows: Номера строк адаптеров block в хранилище.
+        :param ages: Возраст замеров [строка × сеть] в секундах или None.
+        :param last: Последние значения истории сетей (NaN - истории нет) для удержания в grace-период.
+        :return: (средние, маска сетей с замерами такта, маска сетей, удержанных с последним значением).
+        """
+        size = block.shape[1]
+        self.ensure_capacity(max(rows, default=-1) + 1, size)
+        seen = ~np.isnan(block)
+        weights = np.broadcast_to(self.weights[rows][:, None], block.shape)
+        if ages is not None and self.recency_tau:
+            weights = weights * np.exp(-np.nan_to_num(ages) / self.recency_tau)
+        weights = np.where(seen, weights, 0)
+        total = weights.sum(axis=0)
+        # Адаптер с нулевым весом (например, еще не откалиброванный) сети не подтверждает
+        measured = total > 0
+        means = (np.where(seen, block, 0) * weights).sum(axis=0) / np.where(total > 0, total, 1)
+        means = means.astype(np.float32)
+
+        missed = self.missed[:size]
+        missed[measured] = 0
+        missed[~measured] += 1
+        held = np.zeros(size, dtype=bool)
+        if last is not None and self.grace:
+            held = ~measured & (missed <= self.grace) & ~np.isnan(last[:size])
+            means[held] = last[:size][held]
+        means[~(measured | held)] = np.nan
+        return means, measured, held
+
+    def reset(self, ids=None):
+        self.missed[slice(None) if ids is None else ids] = 0
+
+
+def create_fusion(mode=None, grace=None, recency_tau=None):
+    """
+    Создает объединение замеров по параметрам; недостающие берутся из секции [fusion] config.ini
+    (mode, grace, recency_tau).
+    :return: FusionEngine или None для режима 'intersect' (сеть должна быть видна всем адаптерам).
+        Режим по умолчанию - 'intersect', объединение включается явно: --fusion union или mode = union.
+    """
+    if mode is None:
+        mode = get_option('fusion', 'mode', INTERSECT)
+    if mode not in (UNION, INTERSECT):
+        raise ValueError(f'Неизвестный режим объединения: {mode}')
+    if mode == INTERSECT:
+        return None
+    if grace is None:
+        grace = int(get_option('fusion', 'grace', 2))
+    if recency_tau is None:
+        recency_tau = float(get_option('fusion', 'recency_tau', 3.0))
+    return FusionEngine(grace, recency_tau or None)
@@ -1,16 +1,23 @@
-from pywifi import PyWiFi
-from utils.give_rights import give_rights
+import logging
+import time
+
+from utils.give_rights import PermissionManager
+from utils.scan_backends import PyWiFiBackend
+
+logger = logging.getLogger(__name__)
+
 
 class IfacesProvider:
-    WIFI = PyWiFi()
+    BACKEND = PyWiFiBackend()
 
     @classmethod
     def get_ifaces(cls):
         while True:
-            give_rights()
             try:
-                interfaces = cls.WIFI.interfaces()[1:]
+                interfaces = cls.BACKEND.interfaces()
             except (FileNotFoundError, PermissionError) as err:
-                print('Либа не справилась с отслеживанием файлов для адаптеров', err)
+                logger.warning('Либа не справилась с отслеживанием файлов для адаптеров: %s', err)
+                PermissionManager.invalidate()
+                time.sleep(PermissionManager.retry_delay())
                 continue
             return interfaces
\ No newline at end of file
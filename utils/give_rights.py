@@ -1,13 +1,97 @@
+import os
+import stat
 import subprocess
+import threading
+import time
 
+from utils.config import get_option
 
-def give_rights():
-    sudo_command = "sudo -S -i"
-    password = "nageraper7"
-    chmod_command = "chmod -R 777 /var/run/wpa_supplicant"
-    process = subprocess.Popen(sudo_command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                               text=True, shell=True)
-    process.communicate(input=password + '\n')
+CTRL_IFACE_DIR = '/var/run/wpa_supplicant'
+
+
+def give_rights(path=CTRL_IFACE_DIR):
+    """
+    Открывает доступ к управляющим сокетам wpa_supplicant.
+    Пароль sudo берется из конфигурации ([permissions] sudo_password),
+    без пароля sudo запускается в неинтерактивном режиме.
+    """
+    password = get_option('permissions', 'sudo_password')
+    chmod_command = f"chmod -R 777 {path}"
+    if password is None:
+        subprocess.run(f"sudo -n {chmod_command}", stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
+        return
     process = subprocess.Popen(f"sudo -S {chmod_command}", stdin=subprocess.PIPE, stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE, text=True, shell=True)
-    process.communicate(input=password + '\n')
\ No newline at end of file
+    process.communicate(input=password + '\n')
+
+
+def has_access(path=CTRL_IFACE_DIR):
+    """Проверяет, что каталог и все сокеты в нем доступны текущему пользователю."""
+    if not os.access(path, os.R_OK | os.X_OK):
+        return False
+    for name in os.listdir(path):
+        sock_file = os.path.join(path, name)
+        if stat.S_ISSOCK(os.stat(sock_file).st_mode) and not os.access(sock_file, os.R_OK | os.W_OK):
+            return False
+    return True
+
+
+class PermissionManager:
+    """
+    Кэширует результат проверки прав на сокеты wpa_supplicant.
+    sudo запускается только если прав нет, а после неудачи следующая попытка
+    откладывается с экспоненциально растущей задержкой.
+    """
+
+    MIN_DELAY = 0.5
+    MAX_DELAY = 30.0
+
+    _lock = threading.Lock()
+    _granted = False
+    _delay = MIN_DELAY
+    _next_attempt = 0.0
+
+    @classmethod
+    def ensure(cls, path=CTRL_IFACE_DIR):
+        """Возвращает True, если доступ есть; при необходимости выдает права через sudo."""
+        if cls._granted:
+            return True
+        with cls._lock:
+            if cls._granted:
+                return True
+            if time.monotonic() < cls._next_attempt:
+                return False
+            try:
+                if not has_access(path):
+                    give_rights(path)
+                cls._granted = has_access(path)
+            except FileNotFoundError:
+                cls._granted = False
+            if cls._granted:
+                cls._delay = cls.MIN_DELAY
+            else:
+                cls._schedule_retry()
+            return cls._granted
+
+    @classmethod
+    def _schedule_retry(cls):
+        """Откладывает следующую попытку; каждая следующая задержка вдвое больше, но не больше MAX_DELAY."""
+        cls._next_attempt = time.monotonic() + cls._delay
+        cls._delay = min(cls._delay * 2, cls.MAX_DELAY)
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Сбрасывает кэш после ошибки доступа. Если права считались выданными, следующая попытка
+        откладывается; неудачную попытку ensure() уже отложил сам, второй раз задержка не растет.
+        """
+        with cls._lock:
+            if cls._granted:
+                cls._granted = False
+                cls._schedule_retry()
+
+    @classmethod
+    def retry_delay(cls):
+        """Сколько секунд осталось до следующей попытки выдать права."""
+        with cls._lock:
+            return max(cls._next_attempt - time.monotonic(), 0.0)
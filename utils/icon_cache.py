@@ -0,0 +1,101 @@
+import base64
+import io
+import logging
+import tkinter as tk
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow нужен только для притушенных дуг; без него все уровни показывают исходную иконку
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Пороги RSSI (дБм) для иконок уровня сигнала: индекс порога - число подсвеченных дуг
+SIGNAL_TIERS = (-80, -70, -60)
+# Прозрачность непогашенной части иконки для неподсвеченных дуг
+DIMMED_ALPHA = 0.25
+
+
+class IconCache:
+    """
+    Общий кэш изображений для строк списка.
+    Файл читается и декодируется один раз на процесс, все строки используют
+    один и тот же объект PhotoImage. Для иконки Wi-Fi заранее строятся варианты
+    по уровням сигнала: дуги, не соответствующие уровню, притушены.
+    Изображения Tk можно создавать только после создания корневого окна.
+    """
+
+    _tiers = {}
+
+    @classmethod
+    def preload_tiers(cls, path):
+        """Строит иконки всех уровней сигнала; повторный вызов ничего не делает."""
+        if path in cls._tiers:
+            return cls._tiers[path]
+        if Image is None:
+            cls._tiers[path] = cls._plain(path)
+            return cls._tiers[path]
+        try:
+            rgba = np.array(Image.open(path).convert("RGBA"))
+        except Exception as e:
+            logger.warning("Ошибка загрузки иконки: %s", e)
+            cls._tiers[path] = None
+            return None
+        segments = cls._segments(rgba[..., 3])
+        count = max(segments.max(), 1)
+        icons = []
+        for tier in range(len(SIGNAL_TIERS) + 1):
+            # Число подсвеченных дуг пропорционально уровню
+            lit = round(tier * count / len(SIGNAL_TIERS))
+            alpha = rgba[..., 3].astype(np.float32)
+            alpha[segments > lit] *= DIMMED_ALPHA
+            if lit == 0:
+                alpha *= DIMMED_ALPHA
+            image = rgba.copy()
+            image[..., 3] = alpha.astype(np.uint8)
+            icons.append(cls._to_photo(image))
+        cls._tiers[path] = icons
+        return icons
+
+    @staticmethod
+    def _plain(path):
+        """Одна и та же исходная иконка для всех уровней или None, если ее не удалось загрузить."""
+        try:
+            icon = tk.PhotoImage(file=path)
+        except Exception as e:
+            logger.warning("Ошибка загрузки иконки: %s", e)
+            return None
+        return [icon] * (len(SIGNAL_TIERS) + 1)
+
+    @staticmethod
+    def tier(rssi):
+        """Уровень сигнала от 0 (слабее первого порога) до len(SIGNAL_TIERS)."""
+        return int(np.searchsorted(SIGNAL_TIERS, rssi, side='right'))
+
+    @staticmethod
+    def _segments(alpha):
+        """
+        Номера дуг иконки Wi-Fi для каждого пикселя (0 - прозрачный пиксель).
+        Дуги - кольца вокруг нижней центральной точки, разделенные пустыми радиусами.
+        """
+        ys, xs = np.nonzero(alpha)
+        segments = np.zeros(alpha.shape, dtype=np.int32)
+        if not len(xs):
+            return segments
+        cx = (xs.min() + xs.max()) / 2
+        cy = ys.max()
+        radius = np.hypot(xs - cx, ys - cy).astype(np.int32)
+        filled = np.bincount(radius) > 0
+        # Новая дуга начинается на каждом заполненном радиусе после пустого
+        starts = filled & ~np.concatenate(([False], filled[:-1]))
+        segments[ys, xs] = np.cumsum(starts)[radius]
+        return segments
+
+    @staticmethod
+    def _to_photo(rgba):
+        buffer = io.BytesIO()
+        Image.fromarray(rgba, "RGBA").save(buffer, format="PNG")
+        return tk.PhotoImage(data=base64.b64encode(buffer.getvalue()))
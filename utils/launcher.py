@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import threading
+
+from data_sync import ASYNC_MODE, BARRIER_MODE, DataSync
+from utils.async_engine import AsyncCollectionEngine
+from utils.calibration import create_calibrator
+from utils.config import get_option
+from utils.filters import create_filter
+from utils.fusion import INTERSECT, UNION, create_fusion
+from utils.metrics import MetricsReporter, create_sinks
+from utils.scan_backends import ReplayBackend, SimulatedBackend
+from utils.scan_recorder import RecordedSession, ScanRecorder
+
+
+def add_metrics_arguments(parser):
+    """Параметры журнала и вывода метрик."""
+    parser.add_argument("--log-level", default=get_option("logging", "level", "WARNING"),
+                        choices=("DEBUG", "INFO", "WARNING", "ERROR"), type=str.upper,
+                        help="Уровень журнала (по умолчанию - параметр level секции [logging] config.ini)")
+    parser.add_argument("--metrics", metavar="SINKS",
+                        help="Вывод метрик через запятую: log, snapshot, prometheus или none "
+                             "(по умолчанию - параметр sinks секции [metrics] config.ini)")
+    parser.add_argument("--metrics-file", help="Файл .prom для приемника prometheus (textfile collector)")
+    parser.add_argument("--metrics-interval", type=float,
+                        default=float(get_option("metrics", "interval", 10.0)),
+                        help="Период вывода метрик (в секундах)")
+
+
+def configure_logging(level):
+    # pywifi при импорте сам настраивает корневой журнал, поэтому его обработчики заменяются
+    logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s", force=True)
+
+
+def create_reporter(args, *buses):
+    """
+    MetricsReporter по параметрам командной строки или None, если вывод метрик отключен.
+    Очереди подписчиков шин buses учитываются в метриках.
+    """
+    sinks = create_sinks(args.metrics, args.metrics_file)
+    if not sinks:
+        return None
+    for bus in buses:
+        bus.export_metrics()
+    return MetricsReporter(sinks, args.metrics_interval)
+
+
+def add_collection_arguments(parser):
+    """Параметры сбора, общие для GUI (main.py) и демона (daemon.py)."""
+    parser.add_argument("--simulate", action="store_true",
+                        help="Использовать синтетические адаптеры вместо pywifi")
+    parser.add_argument("--adapters", type=int, default=2, help="Количество синтетических адаптеров")
+    parser.add_argument("--aps", type=int, default=50, help="Количество синтетических точек доступа")
+    parser.add_argument("--scan-time", type=float, default=1.0, help="Длительность синтетического сканирования")
+    parser.add_argument("--scheduler", choices=(BARRIER_MODE, ASYNC_MODE), default=BARRIER_MODE,
+                        help="barrier - адаптеры ждут друг друга, async - каждый сканирует в своем темпе")
+    parser.add_argument("--fusion-window", type=float, default=3.0,
+                        help="Окно усреднения замеров в режиме async (в секундах)")
+    parser.add_argument("--engine", choices=("threads", "asyncio"), default="threads",
+                        help="Движок сбора: потоки на каждый адаптер или asyncio")
+    parser.add_argument("--fusion", choices=(UNION, INTERSECT),
+                        help="union - сеть в такте, если ее видит хоть один адаптер, intersect - если все "
+                             "(по умолчанию - параметр mode секции [fusion] config.ini, иначе intersect)")
+    parser.add_argument("--grace", type=int,
+                        help="Сколько тактов пропавшая сеть остается в истории с последним значением (union)")
+    parser.add_argument("--calibration", choices=("learn", "apply", "off"),
+                        help="Поправки RSSI адаптеров: learn - обучать и применять, apply - только применять "
+                             "(по умолчанию - параметр mode секции [calibration] config.ini)")
+    parser.add_argument("--calibration-file", help="Файл профилей калибровки адаптеров (по MAC-адресу)")
+    parser.add_argument("--filter", metavar="CHAIN",
+                        help="Фильтры средних RSSI через запятую: ewma, kalman, median, hampel или none "
+                             "(по умолчанию - параметр chain секции [filters] config.ini)")
+    parser.add_argument("--stats-window", type=int,
+                        help="Окно скользящей статистики и тренда (в тактах), может быть длиннее истории")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Записывать сырые сканирования всех адаптеров в каталог DIR")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="Воспроизвести сеанс, записанный --record, вместо сканирования")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Ускорение воспроизведения относительно реального времени")
+    add_metrics_arguments(parser)
+
+
+class CollectionRunner:
+    """Создает DataSync по параметрам командной строки и ведет сбор в фоновом потоке."""
+
+    def __init__(self, args):
+        backend = None
+        # При воспроизведении такты и окно усреднения сжимаются вместе со временем сеанса
+        speed = 1.0
+        if args.simulate:
+            backend = SimulatedBackend(adapters=args.adapters, access_points=args.aps, scan_time=args.scan_time)
+        elif args.replay:
+            speed = args.speed
+            backend = ReplayBackend(RecordedSession(args.replay), speed=speed)
+        self.interval = 1 / speed
+        self.data_sync = DataSync(backend=backend, mode=args.scheduler, fusion_window=args.fusion_window / speed,
+                                  signal_filter=create_filter(args.filter), stats_window=args.stats_window,
+                                  fusion=create_fusion(args.fusion, args.grace))
+        store = self.data_sync.avg_rssi_data
+        store.calibration = create_calibrator(self.data_sync.networks, args.calibration, args.calibration_file,
+                                              fusion=store.fusion)
+        if args.record:
+            self.data_sync.recorder = ScanRecorder(args.record, self.data_sync.networks)
+        self.reporter = create_reporter(args, self.data_sync.bus)
+        if self.reporter is not None and self.data_sync.recorder is not None:
+            self.data_sync.recorder.export_metrics()
+        self.engine = None
+        if args.engine == "asyncio":
+            self.engine = AsyncCollectionEngine(self.data_sync, interval=self.interval)
+        self.thread = None
+
+    def start(self):
+        if self.reporter is not None:
+            self.reporter.start()
+        if self.data_sync.recorder is not None:
+            self.data_sync.recorder.start()
+        if self.engine is not None:
+            self.thread = threading.Thread(target=lambda: asyncio.run(self.engine.run()))
+        else:
+            self.thread = threading.Thread(target=self.data_sync.start_collection, args=(self.interval,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        if self.engine is not None:
+            self.engine.stop()
+        else:
+            self.data_sync.stop_collection()
+        if self.data_sync.recorder is not None:
+            self.data_sync.recorder.stop()
+        if self.data_sync.avg_rssi_data.calibration is not None:
+            self.data_sync.avg_rssi_data.calibration.save()
+        if self.reporter is not None:
+            self.reporter.stop()
@@ -0,0 +1,321 @@
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.config import get_option
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм длительностей (в секундах), от 0.1 мс до 10 с
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+
+class Histogram:
+    """Распределение наблюдений по корзинам с верхними границами buckets, их сумма и количество."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Оценка квантиля: верхняя граница корзины, в которую он попадает."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return math.inf
+
+    def snapshot(self):
+        return {'count': self.count, 'sum': self.sum, 'buckets': list(zip(self.buckets, self.counts)),
+                'p50': self.quantile(0.5), 'p99': self.quantile(0.99)}
+
+
+class MetricFamily:
+    """
+    Метрика с именем и набором меток: значение (счетчик, уровень) или гистограмма
+    для каждого сочетания значений меток. Метки передаются именованными аргументами.
+    """
+
+    def __init__(self, name, kind, description, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.kind = kind
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Наблюдает длительность блока with (только для гистограмм)."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        """Список (метки, значение или снимок гистограммы)."""
+        with self._lock:
+            items = [(key, value.snapshot() if isinstance(value, Histogram) else value)
+                     for key, value in self._values.items()]
+        return [(dict(zip(self.label_names, key)), value) for key, value in items]
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса.
+    Горячий путь только обновляет метрики (O(1) под короткой блокировкой), а вывод
+    выполняют приемники (sinks) по запросу или из MetricsReporter.
+    Collectors - функции, вызываемые перед снимком: ими выставляются уровни,
+    которые дешевле прочитать, чем вести (глубины очередей, счетчики подписок).
+    """
+
+    def __init__(self):
+        self._families = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _family(self, name, kind, description, label_names, buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, kind, description, label_names, buckets)
+            elif family.kind != kind:
+                raise ValueError(f'Метрика {name} уже зарегистрирована с типом {family.kind}')
+            return family
+
+    def counter(self, name, description, label_names=()):
+        return self._family(name, COUNTER, description, label_names)
+
+    def gauge(self, name, description, label_names=()):
+        return self._family(name, GAUGE, description, label_names)
+
+    def histogram(self, name, description, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._family(name, HISTOGRAM, description, label_names, buckets)
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def collect(self):
+        """Вызывает collectors и возвращает метрики, отсортированные по имени."""
+        with self._lock:
+            collectors = list(self._collectors)
+            families = sorted(self._families.values(), key=lambda family: family.name)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception('Ошибка сборщика метрик %r', collector)
+        return families
+
+    def snapshot(self):
+        """Снимок {имя: [(метки, значение)]} для использования внутри процесса."""
+        return {family.name: family.samples() for family in self.collect()}
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + '}'
+
+
+def _format_number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def prometheus_text(registry=REGISTRY):
+    """Метрики в текстовом формате Prometheus."""
+    lines = []
+    for family in registry.collect():
+        lines.append(f'# HELP {family.name} {family.description}')
+        lines.append(f'# TYPE {family.name} {family.kind}')
+        for labels, value in family.samples():
+            if family.kind != HISTOGRAM:
+                lines.append(f'{family.name}{_format_labels(labels)} {_format_number(value)}')
+                continue
+            total = 0
+            for bound, count in value['buckets'] + [(math.inf, value['count'] - sum(c for _, c in value['buckets']))]:
+                total += count
+                lines.append(f'{family.name}_bucket{_format_labels(labels, ("le", _format_number(bound)))} {total}')
+            lines.append(f'{family.name}_sum{_format_labels(labels)} {_format_number(value["sum"])}')
+            lines.append(f'{family.name}_count{_format_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+class LogSink:
+    """Пишет сводку метрик в журнал: значения и для гистограмм - количество, среднее, p50, p99."""
+
+    def __init__(self, level=logging.INFO, log=None):
+        self.level = level
+        self.log = log or logger
+
+    def emit(self, registry):
+        if not self.log.isEnabledFor(self.level):
+            return
+        for family in registry.collect():
+            for labels, value in family.samples():
+                label_text = ','.join(f'{name}={label}' for name, label in labels.items())
+                name = f'{family.name}{{{label_text}}}' if label_text else family.name
+                if family.kind == HISTOGRAM:
+                    mean = value['sum'] / value['count'] if value['count'] else math.nan
+                    self.log.log(self.level, '%s: n=%d, среднее %.6f, p50 <= %s, p99 <= %s', name,
+                                 value['count'], mean, value['p50'], value['p99'])
+                else:
+                    self.log.log(self.level, '%s: %s', name, value)
+
+
+class SnapshotSink:
+    """Хранит последний снимок метрик в памяти (last) для чтения из других частей процесса."""
+
+    def __init__(self):
+        self.last = {}
+        self.updated_at = None
+
+    def emit(self, registry):
+        self.last = registry.snapshot()
+        self.updated_at = time.time()
+
+
+class PrometheusTextfileSink:
+    """
+    Записывает метрики в файл .prom для textfile collector node_exporter.
+    Файл заменяется атомарно, чтобы экспортер не прочитал его наполовину записанным.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, registry):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(prometheus_text(registry))
+        os.replace(temp_path, self.path)
+
+
+class MetricsReporter:
+    """Раз в interval секунд передает метрики реестра всем приемникам в фоновом потоке."""
+
+    def __init__(self, sinks, interval=10.0, registry=REGISTRY):
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='metrics-reporter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Последний вывод, чтобы файл метрик отражал состояние на момент остановки
+        self.emit()
+
+    def emit(self):
+        for sink in self.sinks:
+            try:
+                sink.emit(self.registry)
+            except Exception:
+                logger.exception('Не удалось вывести метрики в %s', type(sink).__name__)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.emit()
+
+
+def create_sinks(spec=None, textfile=None):
+    """
+    Создает приемники по описанию вида 'log,prometheus'.
+    По умолчанию описание и путь файла берутся из параметров sinks и textfile секции [metrics] config.ini.
+    :return: Список приемников (пустой, если вывод отключен: 'none' или пустое описание).
+    """
+    if spec is None:
+        spec = get_option('metrics', 'sinks', 'none')
+    if textfile is None:
+        textfile = get_option('metrics', 'textfile', 'rssi_analyzer.prom')
+    factories = {'log': LogSink, 'snapshot': SnapshotSink, 'prometheus': lambda: PrometheusTextfileSink(textfile)}
+    names = [name.strip() for name in spec.split(',') if name.strip() and name.strip() != 'none']
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise ValueError(f'Неизвестные приемники метрик: {", ".join(unknown)}')
+    return [factories[name]() for name in names]
+
+
+@contextmanager
+def timed_lock(lock, wait_metric, hold_metric, **labels):
+    """Захватывает lock, наблюдая время ожидания захвата и время удержания блокировки."""
+    started_at = time.perf_counter()
+    with lock:
+        acquired_at = time.perf_counter()
+        wait_metric.observe(acquired_at - started_at, **labels)
+        try:
+            yield
+        finally:
+            hold_metric.observe(time.perf_counter() - acquired_at, **labels)
@@ -0,0 +1,100 @@
+import threading
+
+import numpy as np
+
+from utils.ssid_update import ssid_update
+
+
+def normalize_bssid(bssid):
+    """
+    BSSID в едином виде: нижний регистр без завершающего ':'.
+    pywifi отдает BSSID с ':' в конце, а в разметке и файлах моделей их пишут как угодно.
+    """
+    return bssid.strip().rstrip(':').lower()
+
+
+def channel_from_freq(freq):
+    """Номер канала Wi-Fi по частоте в МГц (0, если частота неизвестна)."""
+    if freq == 2484:
+        return 14
+    if 2412 <= freq < 2484:
+        return (freq - 2407) // 5
+    if 5000 <= freq < 5925:
+        return (freq - 5000) // 5
+    if 5925 < freq <= 7125:
+        return (freq - 5950) // 5
+    return 0
+
+
+class NetworkIndex:
+    """
+    Таблица интернированных точек доступа: BSSID → целочисленный id и обратно.
+    id выдаются один раз и не переиспользуются, поэтому их можно использовать
+    как индексы строк во всех матрицах конвейера.
+    SSID тоже интернируются: ssid_ids - номер SSID каждой сети, по нему кадр группирует
+    точки доступа одной сети массивами, не сравнивая строки.
+    """
+
+    def __init__(self, capacity=256):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self.bssids = []
+        self.ssids = []
+        self.freqs = np.zeros(capacity, dtype=np.int32)
+        self.channels = np.zeros(capacity, dtype=np.int16)
+        self.ssid_ids = np.zeros(capacity, dtype=np.int32)
+        self._ssid_index = {}
+        self._groups = []
+
+    def intern(self, bssid, ssid, freq=0):
+        """Возвращает id точки доступа, регистрируя ее при первом появлении."""
+        bssid = normalize_bssid(bssid)
+        network_id = self._ids.get(bssid)
+        if network_id is not None:
+            return network_id
+        with self._lock:
+            network_id = self._ids.get(bssid)
+            if network_id is not None:
+                return network_id
+            network_id = len(self.bssids)
+            if network_id == len(self.freqs):
+                self.freqs = np.concatenate([self.freqs, np.zeros_like(self.freqs)])
+                self.channels = np.concatenate([self.channels, np.zeros_like(self.channels)])
+                self.ssid_ids = np.concatenate([self.ssid_ids, np.zeros_like(self.ssid_ids)])
+            ssid = ssid_update(ssid)
+            ssid_id = self._ssid_index.get(ssid)
+            if ssid_id is None:
+                ssid_id = self._ssid_index[ssid] = len(self._groups)
+                self._groups.append([])
+            self._groups[ssid_id].append(network_id)
+            self.ssid_ids[network_id] = ssid_id
+            self.bssids.append(bssid)
+            self.ssids.append(ssid)
+            self.freqs[network_id] = freq or 0
+            self.channels[network_id] = channel_from_freq(freq or 0)
+            # Публикуем id последним: читатели без блокировки видят только заполненные записи
+            self._ids[bssid] = network_id
+            return network_id
+
+    def get(self, bssid):
+        """id точки доступа или None, если она еще не встречалась."""
+        return self._ids.get(normalize_bssid(bssid))
+
+    def ssid(self, network_id):
+        return self.ssids[network_id]
+
+    def bssid(self, network_id):
+        return self.bssids[network_id]
+
+    def group(self, ssid):
+        """id всех точек доступа, вещающих SSID."""
+        ssid_id = self._ssid_index.get(ssid)
+        return [] if ssid_id is None else list(self._groups[ssid_id])
+
+    def groups(self):
+        """Словарь {ssid: [id точек доступа]}."""
+        with self._lock:
+            return {ssid: list(self._groups[ssid_id]) for ssid, ssid_id in self._ssid_index.items()}
+
+    def __len__(self):
+        return len(self.bssids)
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from utils.config import get_option
+from utils.network_index import normalize_bssid
+from utils.options import options, options_dict
+
+logger = logging.getLogger(__name__)
+
+MODELS_PATH = os.path.expanduser('~/.config/rssi_analyzer/path_loss.json')
+DEFAULT_P = -35
+# Диапазон таблиц расстояний (целые дБм); RSSI за его пределами прижимается к краю
+RSSI_MIN = -120
+RSSI_MAX = 0
+
+
+class PathLossModel:
+    """
+    Логарифмическая модель потерь: rssi = P - 10 * N * log10(d).
+    P - RSSI на расстоянии 1 м, N - показатель затухания среды.
+    residual - СКО остатков подбора (дБ), samples - число замеров, по которым модель подобрана.
+    """
+
+    def __init__(self, P=DEFAULT_P, N=3.2, residual=None, samples=0):
+        self.P = P
+        self.N = N
+        self.residual = residual
+        self.samples = samples
+
+    def distance(self, rssi):
+        """Расстояние (м) для RSSI (числа или массива)."""
+        return 10 ** ((self.P - np.asarray(rssi, dtype=np.float64)) / (10 * self.N))
+
+    def table(self, low=RSSI_MIN, high=RSSI_MAX):
+        """Расстояния для всех целых дБм от low до high."""
+        return self.distance(np.arange(low, high + 1)).astype(np.float32)
+
+    def to_dict(self):
+        return {'P': self.P, 'N': self.N, 'residual': self.residual, 'samples': self.samples}
+
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(entry['P'], entry['N'], entry.get('residual'), entry.get('samples', 0))
+
+
+def fit_path_loss(distances, rssi):
+    """
+    Подбирает P и N методом наименьших квадратов по замерам на известных расстояниях.
+    :param distances: Расстояния замеров (м).
+    :param rssi: RSSI замеров (дБм).
+    :return: PathLossModel.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    rssi = np.asarray(rssi, dtype=np.float64)
+    valid = (distances > 0) & ~np.isnan(rssi)
+    distances, rssi = distances[valid], rssi[valid]
+    if len(np.unique(distances)) < 2:
+        raise ValueError('Для подбора нужны замеры хотя бы на двух разных расстояниях')
+    # rssi = P + N * x, где x = -10 * log10(d)
+    x = -10 * np.log10(distances)
+    design = np.column_stack([np.ones_like(x), x])
+    (P, N), *_ = np.linalg.lstsq(design, rssi, rcond=None)
+    if N <= 0:
+        raise ValueError(f'Сигнал не ослабевает с расстоянием (N = {N:.2f})')
+    residual = float(np.sqrt(np.mean((rssi - (P + N * x)) ** 2)))
+    return PathLossModel(float(P), float(N), residual, int(len(rssi)))
+
+
+class DistanceTables:
+    """
+    Оценка расстояний до всех сетей кадра по таблицам над целыми дБм.
+    Строка таблиц - модель: подобранная для точки доступа (по BSSID) или модель по умолчанию
+    с P из config.ini и N из выбранного пресета среды. Расстояние для массива сетей - одна выборка
+    из таблицы по (модель сети, округленный RSSI) без возведения в степень на каждый вызов.
+    Подобранные модели хранятся в JSON (см. fit_path_loss.py).
+    """
+
+    def __init__(self, networks, path=MODELS_PATH, low=RSSI_MIN, high=RSSI_MAX):
+        self.networks = networks
+        self.path = path
+        self.low = low
+        self.high = high
+        self.default_P = float(get_option('path_loss', 'p', DEFAULT_P))
+        self._lock = threading.Lock()
+        self.models = self._load()
+        self._default_tables = {}
+        self._rebuild()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as file:
+                return {normalize_bssid(bssid): PathLossModel.from_dict(entry)
+                        for bssid, entry in json.load(file).items()}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning('Не удалось прочитать модели затухания %s: %s', self.path, e)
+            return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({normalize_bssid(bssid): model.to_dict() for bssid, model in self.models.items()}, file, indent=2)
+        os.replace(temp_path, self.path)
+
+    def set_model(self, bssid, model):
+        with self._lock:
+            self.models[normalize_bssid(bssid)] = model
+            self._rebuild()
+
+    def _rebuild(self):
+        """Пересобирает таблицы подобранных моделей. Вызывается под self._lock или из __init__."""
+        bssids = list(self.models)
+        self._model_index = {bssid: row for row, bssid in enumerate(bssids)}
+        if bssids:
+            self._tables = np.vstack([self.models[bssid].table(self.low, self.high) for bssid in bssids])
+        else:
+            self._tables = np.zeros((0, self.high - self.low + 1), dtype=np.float32)
+        self._rows = np.zeros(0, dtype=np.intp)
+
+    def _network_rows(self, size):
+        """Строка таблиц для каждого id сети (-1 - модель по умолчанию)."""
+        known = len(self._rows)
+        if size > known:
+            rows = [self._model_index.get(self.networks.bssid(network_id), -1) for network_id in range(known, size)]
+            self._rows = np.concatenate([self._rows, np.array(rows, dtype=np.intp)])
+        return self._rows
+
+    def default_table(self, N=None):
+        if not N:
+            N = options_dict[options[1]]
+        table = self._default_tables.get(N)
+        if table is None:
+            table = self._default_tables[N] = PathLossModel(self.default_P, N).table(self.low, self.high)
+        return table
+
+    def distances(self, ids, rssi, N=None):
+        """
+        Расстояния до сетей ids по их RSSI.
+        :param N: Показатель затухания модели по умолчанию (для сетей без подобранной модели).
+        :return: Массив расстояний (м) в порядке ids; NaN, если RSSI нет.
+        """
+        rssi = np.asarray(rssi, dtype=np.float32)
+        # Округление до ближайшего дБм через отсечение дробной части; NaN прижимается к краю и
+        # заменяется ниже
+        with np.errstate(invalid='ignore'):
+            index = (rssi + np.float32(0.5 - self.low)).astype(np.intp)
+        np.clip(index, 0, self.high - self.low, out=index)
+        result = self.default_table(N)[index]
+        with self._lock:
+            rows = self._network_rows(int(ids.max()) + 1 if len(ids) else 0)[ids]
+            fitted = rows >= 0
+            if fitted.any():
+                result[fitted] = self._tables[rows[fitted], index[fitted]]
+        result[np.isnan(rssi)] = np.nan
+        return result
+
+    def distance(self, bssid, rssi, N=None):
+        """Расстояние до одной точки доступа."""
+        network_id = self.networks.get(bssid)
+        if network_id is None:
+            return float(self.default_table(N)[int(np.clip(round(rssi), self.low, self.high)) - self.low])
+        return float(self.distances(np.array([network_id]), np.array([rssi]), N)[0])
@@ -0,0 +1,90 @@
+import json
+import logging
+import threading
+import time
+from urllib.request import urlopen
+
+import numpy as np
+
+from utils.data_bus import DataBus, Frame
+from utils.network_index import NetworkIndex
+from utils.state_server import FRAME_MESSAGE, MESSAGE_HEADER, NETWORKS_MESSAGE, decode_frame
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteDataSync:
+    """
+    Источник кадров для GUI, подключенный к демону (daemon.py) вместо локального сбора.
+    Читает поток /stream, переводит id сетей демона в id локального NetworkIndex
+    и публикует кадры в собственную шину, поэтому страницы работают с ним так же, как с DataSync.
+    При обрыве соединения переподключается раз в retry_delay секунд.
+    """
+
+    def __init__(self, url, retry_delay=2.0, timeout=10.0, networks=None):
+        self.url = url.rstrip('/')
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.networks = networks if networks is not None else NetworkIndex()
+        self.bus = DataBus()
+        self.low_precision = False
+        self.run_adapters = True
+        self._stopping = threading.Event()
+        # id сети в NetworkIndex демона -> id в локальном NetworkIndex
+        self._id_map = np.zeros(0, dtype=np.intp)
+
+    def subscribe(self, name, maxsize=4):
+        return self.bus.subscribe(name, maxsize)
+
+    def unsubscribe(self, subscription):
+        self.bus.unsubscribe(subscription)
+
+    def start_collection(self, interval=None):
+        """Принимает кадры демона до вызова stop_collection()."""
+        while not self._stopping.is_set():
+            try:
+                with urlopen(f'{self.url}/stream', timeout=self.timeout) as response:
+                    logger.info('Подключено к %s', self.url)
+                    self._read_stream(response)
+            except OSError as e:
+                if self._stopping.is_set():
+                    break
+                logger.warning('Нет связи с %s: %s', self.url, e)
+            self._stopping.wait(self.retry_delay)
+
+    def stop_collection(self):
+        """Поток приема завершается после следующего сообщения или по таймауту чтения."""
+        self.run_adapters = False
+        self._stopping.set()
+
+    def _read_stream(self, response):
+        while not self._stopping.is_set():
+            header = response.read(MESSAGE_HEADER.size)
+            if len(header) < MESSAGE_HEADER.size:
+                return
+            kind, size = MESSAGE_HEADER.unpack(header)
+            payload = response.read(size)
+            if len(payload) < size:
+                return
+            if kind == NETWORKS_MESSAGE:
+                self._add_networks(json.loads(payload.decode('utf-8')))
+            elif kind == FRAME_MESSAGE:
+                self._publish(payload)
+
+    def _add_networks(self, table):
+        last_id = max(entry['id'] for entry in table)
+        if last_id >= len(self._id_map):
+            self._id_map = np.concatenate([self._id_map, np.full(last_id + 1 - len(self._id_map), -1)])
+        for entry in table:
+            self._id_map[entry['id']] = self.networks.intern(entry['bssid'], entry['ssid'], entry['freq'])
+
+    def _publish(self, payload):
+        seq, _, ids, history, counts, adapter_values, low_precision = decode_frame(payload)
+        ids = self._id_map[ids]
+        # Frame ищет сети бинарным поиском, id должны быть упорядочены
+        order = np.argsort(ids, kind='stable')
+        if adapter_values is not None:
+            adapter_values = adapter_values[:, order]
+        self.low_precision = low_precision
+        self.bus.publish(Frame(seq, time.monotonic(), self.networks, ids[order], history[order], counts[order],
+                               adapter_values, low_precision))
@@ -0,0 +1,45 @@
+import time
+
+from utils.metrics import REGISTRY
+
+RENDER_SECONDS = REGISTRY.histogram('rssi_render_seconds', 'Перерисовка страницы GUI по кадру', ('page',))
+
+
+class RenderScheduler:
+    """
+    Переносит обновление виджетов в поток Tk.
+    Раз в 1/max_fps секунды (через after()) забирает из подписки самый свежий кадр,
+    а накопившиеся за это время кадры пропускает, и вызывает render(frame) в главном цикле Tk.
+    Если отрисовка дольше периода, следующий кадр берется сразу после нее, без очереди.
+    """
+
+    def __init__(self, widget, subscription, render, max_fps=10):
+        self.widget = widget
+        self.subscription = subscription
+        self.render = render
+        self.period = 1 / max_fps
+        self._job = None
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._job = self.widget.after(0, self._tick)
+
+    def stop(self):
+        self._running = False
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        if not self._running:
+            return
+        started_at = time.monotonic()
+        frame = self.subscription.get_latest()
+        if frame is not None:
+            self.render(frame)
+            RENDER_SECONDS.observe(time.monotonic() - started_at, page=self.subscription.name)
+        if self._running:
+            delay = max(self.period - (time.monotonic() - started_at), 0.001)
+            self._job = self.widget.after(int(delay * 1000), self._tick)
@@ -0,0 +1,141 @@
+import numpy as np
+
+
+class RollingSnapshot:
+    """
+    Скользящая статистика видимых сетей кадра (массивы в порядке ids кадра).
+    mean, std, minimum, maximum - по последним window тактам (или меньшему числу после появления сети),
+    delta - разность средних последнего и предыдущего окон (NaN, пока тактов меньше 2 * window),
+    jump - изменение за последний замер (NaN, пока замер один), counts - замеров с появления сети.
+    """
+
+    def __init__(self, window, mean, std, minimum, maximum, delta, jump, counts):
+        self.window = window
+        self.mean = mean
+        self.std = std
+        self.minimum = minimum
+        self.maximum = maximum
+        self.delta = delta
+        self.jump = jump
+        self.counts = counts
+        for array in (mean, std, minimum, maximum, delta, jump, counts):
+            array.flags.writeable = False
+
+
+class RollingStats:
+    """
+    Скользящие среднее, дисперсия, минимум/максимум и тренд по window тактам за O(1) на сеть.
+    Для каждой сети хранятся кольца накопленных сумм значений и их квадратов длиной 2 * window + 1:
+    сумма любого из двух последних окон - разность двух элементов кольца, пересчет окна не нужен.
+    Минимум и максимум обновляются сравнением с новым значением и пересчитываются по кольцу
+    значений только у сетей, чей экстремум вышел из окна.
+    Кольца сети индексируются ее собственным номером замера (counts), а не общим тактом, поэтому
+    сеть, удержанная FusionEngine без нового замера (held), просто пропускает такт.
+    Сеть, пропавшая из такта, начинает статистику заново (как ее история в RssiStore).
+    """
+
+    def __init__(self, window=8, capacity=256):
+        self.window = window
+        self._span = 2 * window + 1
+        self.capacity = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = None
+        if self.capacity:
+            old = (self._sums, self._squares, self._values, self.counts, self.minimum, self.maximum,
+                   self._min_tick, self._max_tick)
+        self._sums = np.zeros((capacity, self._span))
+        self._squares = np.zeros((capacity, self._span))
+        self._values = np.full((capacity, self.window), np.nan, dtype=np.float32)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.minimum = np.full(capacity, np.inf, dtype=np.float32)
+        self.maximum = np.full(capacity, -np.inf, dtype=np.float32)
+        self._min_tick = np.zeros(capacity, dtype=np.int64)
+        self._max_tick = np.zeros(capacity, dtype=np.int64)
+        if old is not None:
+            for new, array in zip((self._sums, self._squares, self._values, self.counts, self.minimum,
+                                   self.maximum, self._min_tick, self._max_tick), old):
+                new[:len(array)] = array
+        self.capacity = capacity
+
+    def ensure_capacity(self, size):
+        if size > self.capacity:
+            self._allocate(max(size, 2 * self.capacity))
+
+    def update(self, values, present, held=None):
+        """
+        Добавляет значения такта; сети без значения (present=False) сбрасываются.
+        :param held: Маска сетей без нового замера, которые не сбрасываются и не получают замер.
+        """
+        size = len(values)
+        self.ensure_capacity(size)
+        ids = np.flatnonzero(present)
+        new = values[ids].astype(np.float64)
+
+        counts = self.counts[ids]
+        number = counts + 1
+        started = counts > 0
+        cur = number % self._span
+        prev = counts % self._span
+        self._sums[ids, cur] = np.where(started, self._sums[ids, prev], 0) + new
+        self._squares[ids, cur] = np.where(started, self._squares[ids, prev], 0) + new * new
+        self.counts[ids] = number
+        self._values[ids, number % self.window] = new
+
+        # Экстремум заменяется новым значением или пересчитывается, когда вышел из окна
+        lower = new <= self.minimum[ids]
+        self.minimum[ids[lower]] = new[lower]
+        self._min_tick[ids[lower]] = number[lower]
+        higher = new >= self.maximum[ids]
+        self.maximum[ids[higher]] = new[higher]
+        self._max_tick[ids[higher]] = number[higher]
+        expired = number - self._min_tick[ids] >= self.window
+        if expired.any():
+            self._rescan(ids[expired], number[expired], self.minimum, self._min_tick, np.nanargmin)
+        expired = number - self._max_tick[ids] >= self.window
+        if expired.any():
+            self._rescan(ids[expired], number[expired], self.maximum, self._max_tick, np.nanargmax)
+
+        kept = present[:size] if held is None else present[:size] | held[:size]
+        self.reset(np.flatnonzero(~kept))
+
+    def _rescan(self, ids, number, extreme, extreme_tick, argfunc):
+        rows = self._values[ids]
+        slots = argfunc(rows, axis=1)
+        extreme[ids] = rows[np.arange(len(ids)), slots]
+        # Номер замера слота: последний номер, равный слоту по модулю window
+        extreme_tick[ids] = number - (number - slots) % self.window
+
+    def reset(self, ids=None):
+        ids = slice(None) if ids is None else ids
+        self.counts[ids] = 0
+        self._values[ids] = np.nan
+        self.minimum[ids] = np.inf
+        self.maximum[ids] = -np.inf
+
+    def _window_sum(self, array, ids, offset, counts):
+        """Сумма window значений, закончившихся offset замеров назад (0 до появления сети)."""
+        end = array[ids, (counts - offset) % self._span]
+        start = array[ids, (counts - offset - self.window) % self._span]
+        return end - np.where(counts > offset + self.window, start, 0)
+
+    def snapshot(self, ids):
+        """RollingSnapshot сетей ids."""
+        w = self.window
+        counts = self.counts[ids]
+        n = np.maximum(np.minimum(counts, w), 1)
+        sums = self._window_sum(self._sums, ids, 0, counts)
+        squares = self._window_sum(self._squares, ids, 0, counts)
+        mean = sums / n
+        std = np.sqrt(np.maximum(squares / n - mean * mean, 0))
+        previous = self._window_sum(self._sums, ids, w, counts)
+        delta = np.where(counts >= 2 * w, (sums - previous) / w, np.nan)
+        last = self._values[ids, counts % w]
+        before = self._values[ids, (counts - 1) % w]
+        jump = np.where(counts >= 2, last - before, np.nan) if w > 1 else np.full(len(counts), np.nan)
+        empty = counts == 0
+        mean[empty] = np.nan
+        std[empty] = np.nan
+        return RollingSnapshot(w, mean, std, self.minimum[ids].copy(), self.maximum[ids].copy(), delta,
+                               jump, counts.copy())
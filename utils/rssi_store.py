@@ -0,0 +1,317 @@
+import threading
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from utils.data_bus import Frame
+from utils.network_index import NetworkIndex
+from utils.rolling_stats import RollingStats
+
+
+class RawSnapshot:
+    """
+    Значения RSSI каждого адаптера за один такт: матрица [адаптер × сеть] без копирования.
+    Снимок действителен, пока хранилище не опубликовало следующий такт,
+    после чего его буфер переиспользуется для новых замеров.
+    """
+
+    def __init__(self, store, matrix, generation):
+        self.matrix = matrix
+        self.generation = generation
+        self._store = store
+
+    @property
+    def adapters(self):
+        return self.matrix.shape[0]
+
+    @property
+    def is_stale(self):
+        return self._store.generation != self.generation
+
+    def get(self, bssid):
+        """Возвращает значения всех адаптеров для точки доступа или None."""
+        network_id = self._store.networks.get(bssid)
+        if self.is_stale or network_id is None or network_id >= self.matrix.shape[1]:
+            return None
+        return self.matrix[:, network_id]
+
+
+class RssiStore(Mapping):
+    """
+    Кольцевой буфер истории RSSI на NumPy. Строка матриц - id точки доступа из NetworkIndex.
+
+    history - матрица [сеть × 2*history] float32. Каждый такт записывается один столбец
+    для всех сетей сразу, причем дважды (pos и pos + history), поэтому последние history
+    значений любой сети всегда лежат подряд и отдаются читателю без копирования.
+    raw - матрица [адаптер × сеть] с замерами текущего такта. Она двойная: адаптеры пишут
+    в одну, а при публикации такта буферы меняются местами, и заполненный становится снимком.
+    Строки адаптеров выдаются add_adapter() и освобождаются remove_adapter() без сброса истории.
+    sample_time - время последнего замера каждой ячейки raw, по нему fuse() отбирает свежие замеры
+    в асинхронном режиме, где адаптеры не ждут друг друга и буферы не меняются местами.
+    Снаружи хранилище ведет себя как словарь {bssid: np.ndarray последних средних}.
+    intersect=True - сеть попадает в такт, только если ее видят все учтенные строки;
+    intersect=False - усредняются строки, которые ее видят (например, узлы в разных помещениях).
+    fusion - FusionEngine (utils/fusion.py) вместо intersect: объединение с весами адаптеров
+    и свежести замеров и удержанием пропавших сетей в истории grace тактов.
+    calibration - Calibrator (utils/calibration.py), исправляющий замеры адаптеров перед усреднением;
+    профиль адаптера подгружается в add_adapter(name) и сохраняется в remove_adapter().
+    signal_filter - необязательный SignalFilter (utils/filters.py), через который средние такта
+    проходят перед записью в историю.
+    stats_window - если задан, параллельно с историей ведется скользящая статистика RollingStats
+    по stats_window тактам, которая может быть намного длиннее истории; она попадает в кадры.
+    """
+
+    def __init__(self, adapters=0, history=8, capacity=256, networks=None, intersect=True, signal_filter=None,
+                 stats_window=None, fusion=None):
+        self.history_size = history
+        self.intersect = intersect
+        self.fusion = fusion
+        self.calibration = None
+        self.signal_filter = signal_filter
+        self.stats = RollingStats(stats_window, capacity) if stats_window else None
+        self.capacity = capacity
+        self.networks = networks if networks is not None else NetworkIndex(capacity)
+        self._lock = threading.Lock()
+        self._pos = history - 1
+        self.history = np.full((capacity, 2 * history), np.nan, dtype=np.float32)
+        self.counts = np.zeros(capacity, dtype=np.int32)
+        self.raw = np.full((adapters, capacity), np.nan, dtype=np.float32)
+        self._spare_raw = np.full((adapters, capacity), np.nan, dtype=np.float32)
+        self.sample_time = np.full((adapters, capacity), -np.inf)
+        self._active = np.ones(adapters, dtype=bool)
+        self._reported = np.zeros(adapters, dtype=bool)
+        # Строки буфера записи, оставшиеся от позапрошлого такта и еще не очищенные
+        self._dirty = np.zeros(adapters, dtype=bool)
+        self.generation = 0
+
+    @property
+    def adapters(self):
+        return int(np.count_nonzero(self._active))
+
+    def add_adapter(self, name=None):
+        """Выделяет строку замеров под новый адаптер name и возвращает ее номер."""
+        row = self._add_row()
+        if self.calibration is not None and name is not None:
+            self.calibration.attach(row, name)
+        return row
+
+    def _add_row(self):
+        with self._lock:
+            free = np.flatnonzero(~self._active)
+            if len(free):
+                row = int(free[0])
+            else:
+                row = self.raw.shape[0]
+                extra = np.full((1, self.capacity), np.nan, dtype=np.float32)
+                self.raw = np.vstack([self.raw, extra])
+                self._spare_raw = np.vstack([self._spare_raw, extra])
+                self.sample_time = np.vstack([self.sample_time, np.full((1, self.capacity), -np.inf)])
+                self._active = np.append(self._active, False)
+                self._reported = np.append(self._reported, False)
+                self._dirty = np.append(self._dirty, False)
+            self._active[row] = True
+            self._reported[row] = False
+            return row
+
+    def remove_adapter(self, row):
+        """Освобождает строку извлеченного адаптера. История сетей сохраняется."""
+        with self._lock:
+            self._active[row] = False
+            self._reported[row] = False
+            if self.fusion is not None:
+                self.fusion.reset_adapter(row)
+            self.raw[row] = np.nan
+            self._spare_raw[row] = np.nan
+            self.sample_time[row] = -np.inf
+        if self.calibration is not None:
+            self.calibration.detach(row)
+
+    def _ensure_capacity(self, size):
+        """Удваивает емкость, пока в нее не поместится size сетей. Вызывается только под self._lock."""
+        if size <= self.capacity:
+            return
+        old = self.capacity
+        while self.capacity < size:
+            self.capacity *= 2
+        history = np.full((self.capacity, 2 * self.history_size), np.nan, dtype=np.float32)
+        history[:old] = self.history
+        self.history = history
+        counts = np.zeros(self.capacity, dtype=np.int32)
+        counts[:old] = self.counts
+        self.counts = counts
+        rows = self.raw.shape[0]
+        raw = np.full((rows, self.capacity), np.nan, dtype=np.float32)
+        raw[:, :old] = self.raw
+        self.raw = raw
+        # Запасной буфер пуст: его содержимое устареет при следующей публикации
+        self._spare_raw = np.full((rows, self.capacity), np.nan, dtype=np.float32)
+        sample_time = np.full((rows, self.capacity), -np.inf)
+        sample_time[:, :old] = self.sample_time
+        self.sample_time = sample_time
+
+    def put(self, adapter, readings, timestamp=None):
+        """
+        Записывает замеры адаптера {id сети: rssi} в текущий такт.
+        :param timestamp: Время замера по time.monotonic(), по умолчанию - текущее.
+        """
+        ids = np.fromiter(readings.keys(), dtype=np.intp, count=len(readings))
+        values = np.fromiter(readings.values(), dtype=np.float32, count=len(readings))
+        self.put_arrays(adapter, ids, values, timestamp)
+
+    def put_arrays(self, adapter, ids, values, timestamp=None):
+        """То же, что put(), для замеров в виде массивов id сетей и rssi."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            self._ensure_capacity(len(self.networks))
+            if self._dirty[adapter]:
+                self.raw[adapter] = np.nan
+                self._dirty[adapter] = False
+            self.raw[adapter, ids] = values
+            self.sample_time[adapter, ids] = timestamp
+            self._reported[adapter] = True
+
+    def aggregate(self):
+        """
+        Публикует такт: меняет буферы замеров местами, усредняет замеры по адаптерам
+        и дописывает столбец истории. Учитываются адаптеры, приславшие замеры в этом такте,
+        и только сети, которые видны им всем (без fusion); история остальных сетей удаляется.
+        :return: RawSnapshot с замерами опубликованного такта или None, если замеров не было.
+        """
+        with self._lock:
+            rows = self._active & self._reported
+            if not rows.any():
+                return None
+            used = len(self.networks)
+            self._ensure_capacity(used)
+            published = self.raw
+            self.raw, self._spare_raw = self._spare_raw, published
+            self._reported[:] = False
+            self._dirty[:] = True
+            self.generation += 1
+
+            if rows.all():
+                block = published[:, :used]
+            else:
+                block = published[rows, :used]
+            return self._publish(block, np.flatnonzero(rows))
+
+    def fuse(self, window, now=None):
+        """
+        Публикует такт асинхронного режима: берет у каждого адаптера замеры не старше window секунд
+        и усредняет их так же, как aggregate(). Адаптеры без свежих замеров не учитываются.
+        :return: RawSnapshot со свежими замерами или None, если их нет.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            used = len(self.networks)
+            self._ensure_capacity(used)
+            fresh = self.sample_time[:, :used] >= now - window
+            rows = self._active & fresh.any(axis=1)
+            if not rows.any():
+                return None
+            block = np.where(fresh[rows], self.raw[rows, :used], np.float32(np.nan))
+            ages = None
+            if self.fusion is not None:
+                ages = np.where(fresh[rows], now - self.sample_time[rows, :used], np.nan)
+            self.generation += 1
+            return self._publish(block, np.flatnonzero(rows), ages)
+
+    def _publish(self, block, rows, ages=None):
+        """
+        Дописывает средние по строкам block (строки адаптеров rows) в историю.
+        Вызывается только под self._lock.
+        """
+        used = block.shape[1]
+        h = self.history_size
+        if self.calibration is not None:
+            block = self.calibration.process(block, rows)
+        held = None
+        if self.fusion is not None:
+            means, measured, held = self.fusion.fuse(block, rows, ages, self.history[:used, self._pos + h])
+            present = measured | held
+        elif self.intersect:
+            present = measured = ~np.isnan(block).any(axis=0)
+            means = block.mean(axis=0)
+        else:
+            seen = ~np.isnan(block)
+            present = measured = seen.any(axis=0)
+            means = np.where(seen, block, 0).sum(axis=0) / np.maximum(seen.sum(axis=0), 1)
+        means[~present] = np.nan
+        # Удержанное значение - уже отфильтрованное последнее из истории, новым замером оно не считается
+        if self.signal_filter is not None:
+            means = self.signal_filter.update(means, measured, held)
+        if self.stats is not None:
+            self.stats.update(means, measured, held)
+
+        self._pos = (self._pos + 1) % h
+        self.history[:used, self._pos] = means
+        self.history[:used, self._pos + h] = means
+        counts = self.counts[:used]
+        np.minimum(counts + 1, h, out=counts, where=present)
+
+        # История пропавших сетей удаляется целиком
+        absent = ~present & (counts > 0)
+        counts[absent] = 0
+        self.history[:used][absent] = np.nan
+
+        snapshot = block.view()
+        snapshot.flags.writeable = False
+        return RawSnapshot(self, snapshot, self.generation)
+
+    def frame(self, seq, snapshot=None, low_precision=False):
+        """Копирует историю видимых сетей и замеры адаптеров такта в неизменяемый Frame."""
+        with self._lock:
+            used = min(len(self.networks), self.capacity)
+            ids = np.flatnonzero(self.counts[:used])
+            end = self._pos + 1 + self.history_size
+            history = self.history[ids, end - self.history_size:end]
+            counts = self.counts[ids]
+            adapter_values = None
+            if snapshot is not None and not snapshot.is_stale and len(ids) and ids[-1] < snapshot.matrix.shape[1]:
+                adapter_values = snapshot.matrix[:, ids]
+            stats = self.stats.snapshot(ids) if self.stats is not None else None
+        return Frame(seq, time.monotonic(), self.networks, ids, history, counts, adapter_values, low_precision,
+                     stats)
+
+    def clear_raw(self):
+        """
+        Очищает буфер, в который пишут адаптеры. Вызывается после aggregate() вне блокировки читателей.
+        Строки, в которые адаптер уже успел записать новый такт, не трогаются.
+        """
+        with self._lock:
+            self.raw[self._dirty] = np.nan
+            self._dirty[:] = False
+
+    def clear(self):
+        """Удаляет историю всех сетей."""
+        with self._lock:
+            self.counts.fill(0)
+            self.history.fill(np.nan)
+            self.raw.fill(np.nan)
+            self.sample_time.fill(-np.inf)
+            self._reported[:] = False
+            self._dirty[:] = False
+            if self.signal_filter is not None:
+                self.signal_filter.reset()
+            if self.stats is not None:
+                self.stats.reset()
+            if self.fusion is not None:
+                self.fusion.reset()
+
+    def __getitem__(self, bssid):
+        network_id = self.networks.get(bssid)
+        if network_id is None or network_id >= self.capacity or not self.counts[network_id]:
+            raise KeyError(bssid)
+        end = self._pos + 1 + self.history_size
+        return self.history[network_id, end - self.counts[network_id]:end]
+
+    def __iter__(self):
+        # Сети, замеренные в текущем такте, но еще не усредненные, не показываются
+        used = min(len(self.networks), self.capacity)
+        return iter([self.networks.bssid(i) for i in np.flatnonzero(self.counts[:used])])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.counts))
@@ -0,0 +1,266 @@
+import abc
+import os
+import random
+import threading
+import time
+
+from pywifi import const
+
+
+class ScanBackend(abc.ABC):
+    """
+    Источник адаптеров для DataSync.
+    Адаптер, который возвращает interfaces(), должен повторять интерфейс pywifi.Interface:
+    name(), status(), scan(), scan_results().
+    """
+
+    @abc.abstractmethod
+    def interfaces(self):
+        """Список подключенных адаптеров."""
+
+
+class PyWiFiBackend(ScanBackend):
+    """Реальные адаптеры через pywifi. Первый интерфейс (встроенная карта) пропускается."""
+
+    # Каталог управляющих сокетов wpa_supplicant: сокет на каждый адаптер
+    watch_path = '/var/run/wpa_supplicant'
+
+    def __init__(self):
+        self._wifi = None
+
+    def interfaces(self):
+        from utils.give_rights import PermissionManager
+
+        if self._wifi is None:
+            from pywifi import PyWiFi
+            self._wifi = PyWiFi()
+        if not PermissionManager.ensure(self.watch_path):
+            raise PermissionError(f'Нет доступа к {self.watch_path}')
+        return self._wifi.interfaces()[1:]
+
+
+class SimulatedProfile:
+    """Результат сканирования в формате pywifi.Profile."""
+
+    __slots__ = ('ssid', 'bssid', 'freq', 'signal')
+
+    def __init__(self, ssid, bssid, freq, signal):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.freq = freq
+        self.signal = signal
+
+
+class SimulatedInterface:
+    """
+    Синтетический адаптер: сканирование занимает scan_time ± jitter секунд,
+    каждая точка доступа пропадает из результата с вероятностью drop_rate.
+    """
+
+    def __init__(self, backend, index):
+        self.backend = backend
+        self.index = index
+        self._name = f'sim{index}'
+        self._random = random.Random(backend.seed * 1000 + index)
+        self._offset = self._random.uniform(-backend.adapter_spread, backend.adapter_spread)
+        self._scan_done_at = 0.0
+        self.removed = False
+
+    def name(self):
+        return self._name
+
+    def status(self):
+        self._check_removed()
+        if time.monotonic() < self._scan_done_at:
+            return const.IFACE_SCANNING
+        return const.IFACE_INACTIVE
+
+    def scan(self):
+        self._check_removed()
+        duration = self.backend.scan_time + self._random.uniform(-self.backend.jitter, self.backend.jitter)
+        self._scan_done_at = time.monotonic() + max(duration, 0.0)
+
+    def scan_results(self):
+        delay = self._scan_done_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._check_removed()
+        backend = self.backend
+        results = []
+        for ssid, bssid, freq, base in backend.access_points:
+            if self._random.random() < backend.drop_rate:
+                continue
+            signal = base + self._offset + self._random.gauss(0, backend.noise)
+            results.append(SimulatedProfile(ssid, bssid, freq, int(round(min(signal, -1)))))
+        return results
+
+    def _check_removed(self):
+        if self.removed or self.backend.is_removed(self):
+            self.removed = True
+            raise ConnectionRefusedError(f'Адаптер {self._name} извлечен')
+
+    def __repr__(self):
+        return f'<SimulatedInterface {self._name}>'
+
+
+class SimulatedBackend(ScanBackend):
+    """
+    Генерирует adapters адаптеров, каждый видит access_points точек доступа.
+    Точки доступа группируются по ssid_group_size на один SSID, как в корпоративных сетях.
+
+    :param scan_time: Длительность одного сканирования (в секундах).
+    :param jitter: Разброс длительности сканирования (в секундах).
+    :param drop_rate: Вероятность того, что точка доступа не попадет в результат сканирования.
+    :param noise: Стандартное отклонение шума RSSI (в дБм).
+    :param adapter_spread: Максимальное постоянное смещение адаптера (в дБм).
+    :param lifetimes: Время жизни адаптеров {индекс: секунды}, после которого адаптер извлекается.
+    :param control_dir: Каталог, в котором адаптеры представлены файлами, как сокеты wpa_supplicant.
+    """
+
+    def __init__(self, adapters=2, access_points=500, scan_time=1.0, jitter=0.2, drop_rate=0.02,
+                 noise=2.0, adapter_spread=5.0, ssid_group_size=4, lifetimes=None, seed=0, control_dir=None):
+        self.scan_time = scan_time
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.noise = noise
+        self.adapter_spread = adapter_spread
+        self.lifetimes = lifetimes or {}
+        self.seed = seed
+        self.watch_path = control_dir
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+
+        rnd = random.Random(seed)
+        self.access_points = []
+        for i in range(access_points):
+            ssid = f'Network-{i // max(ssid_group_size, 1)}'
+            bssid = ':'.join(f'{b:02x}' for b in (0x02, 0, (i >> 16) & 0xFF, (i >> 8) & 0xFF, i & 0xFF, 0x01)) + ':'
+            freq = rnd.choice((2412, 2437, 2462, 5180, 5240, 5745))
+            self.access_points.append((ssid, bssid, freq, rnd.uniform(-90, -30)))
+        self._interfaces = [SimulatedInterface(self, i) for i in range(adapters)]
+        if control_dir:
+            os.makedirs(control_dir, exist_ok=True)
+            for iface in self._interfaces:
+                self._touch(iface)
+
+    def _touch(self, iface):
+        if self.watch_path:
+            open(os.path.join(self.watch_path, iface.name()), 'w').close()
+
+    def _unlink(self, iface):
+        if self.watch_path:
+            try:
+                os.remove(os.path.join(self.watch_path, iface.name()))
+            except FileNotFoundError:
+                pass
+
+    def is_removed(self, iface):
+        lifetime = self.lifetimes.get(iface.index)
+        return lifetime is not None and time.monotonic() - self._started_at >= lifetime
+
+    def remove_adapter(self, index):
+        """Извлекает адаптер немедленно."""
+        with self._lock:
+            for iface in self._interfaces:
+                if iface.index == index:
+                    iface.removed = True
+                    self._unlink(iface)
+
+    def add_adapter(self):
+        """Подключает новый адаптер и возвращает его."""
+        with self._lock:
+            index = max((iface.index for iface in self._interfaces), default=-1) + 1
+            iface = SimulatedInterface(self, index)
+            self._interfaces.append(iface)
+            self._touch(iface)
+            return iface
+
+    def interfaces(self):
+        with self._lock:
+            self._interfaces = [iface for iface in self._interfaces
+                                if not iface.removed and not self.is_removed(iface)]
+            return list(self._interfaces)
+
+
+class ReplayInterface:
+    """
+    Адаптер записанного сеанса: каждое scan() берет следующее сканирование адаптера,
+    scan_results() возвращает его, когда наступит его время на ускоренных часах сеанса.
+    После последнего сканирования адаптер считается извлеченным.
+    """
+
+    def __init__(self, backend, name, scans):
+        self.backend = backend
+        self._name = name
+        self._scans = scans
+        self._current = None
+        self.removed = False
+
+    def name(self):
+        return self._name
+
+    def status(self):
+        self._check_removed()
+        return const.IFACE_INACTIVE
+
+    def scan(self):
+        self._check_removed()
+        scan = next(self._scans, None)
+        if scan is None:
+            self.removed = True
+            self._check_removed()
+        self._current = scan
+
+    def scan_results(self):
+        self._check_removed()
+        if self._current is None:
+            return []
+        timestamp, _, network_ids, values = self._current
+        delay = self.backend.due_time(timestamp) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        networks = self.backend.session.networks
+        return [SimulatedProfile(networks.ssid(network_id), networks.bssid(network_id),
+                                 int(networks.freqs[network_id]), float(value))
+                for network_id, value in zip(network_ids, values)]
+
+    def _check_removed(self):
+        if self.removed:
+            raise ConnectionRefusedError(f'Запись адаптера {self._name} закончилась')
+
+    def __repr__(self):
+        return f'<ReplayInterface {self._name}>'
+
+
+class ReplayBackend(ScanBackend):
+    """
+    Воспроизводит сеанс, записанный ScanRecorder, через обычный конвейер DataSync.
+    Время сеанса идет в speed раз быстрее реального; интервал такта и окно усреднения
+    DataSync нужно уменьшить в те же speed раз.
+
+    :param session: RecordedSession.
+    :param speed: Ускорение воспроизведения относительно реального времени.
+    """
+
+    watch_path = None
+
+    def __init__(self, session, speed=1.0):
+        self.session = session
+        self.speed = speed
+        self._started_at = None
+        # Сканирования читаются из отображенных сегментов по мере воспроизведения
+        self._interfaces = [ReplayInterface(self, name, session.scans(adapter))
+                            for adapter, name in enumerate(session.adapters)]
+
+    def due_time(self, timestamp):
+        """Момент time.monotonic(), когда наступает время сканирования timestamp."""
+        return self._started_at + (timestamp - self.session.start_time) / self.speed
+
+    @property
+    def finished(self):
+        return all(iface.removed for iface in self._interfaces)
+
+    def interfaces(self):
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        return [iface for iface in self._interfaces if not iface.removed]
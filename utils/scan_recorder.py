@@ -0,0 +1,277 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+from utils.network_index import NetworkIndex
+
+# Формат сегмента записи: заголовок HEADER_SIZE байт, затем записи RECORD_DTYPE подряд.
+# Рядом лежит таблица сегмента <имя>.jsonl с BSSID/SSID/частотой сетей и именами адаптеров,
+# на которые ссылаются записи. Сегмент читается как массив через np.memmap без разбора.
+MAGIC = b'RSSIREC1'
+HEADER_SIZE = 16
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),  # time.time() окончания сканирования
+    ('adapter', '<u2'),  # номер адаптера в таблице сегмента
+    ('network', '<u4'),  # id сети в таблице сегмента
+    ('rssi', '<f4'),
+])
+SEGMENT_SUFFIX = '.rssi'
+TABLE_SUFFIX = '.jsonl'
+
+
+class ScanRecorder:
+    """
+    Запись сырых сканирований всех адаптеров на диск.
+    record() только кладет замеры в очередь и не блокирует поток сбора; если очередь
+    переполнена, сканирование отбрасывается и учитывается в dropped.
+    Отдельный поток копит записи в памяти и дописывает их в конец сегмента крупными
+    блоками раз в flush_interval секунд, поэтому данные никогда не перезаписываются.
+    Когда сегмент превышает segment_size байт, начинается новый.
+    """
+
+    def __init__(self, directory, networks, flush_interval=5.0, segment_size=64 * 1024 * 1024, queue_size=1024):
+        self.directory = directory
+        self.networks = networks
+        self.flush_interval = flush_interval
+        self.segment_size = segment_size
+        self._queue = queue.Queue(queue_size)
+        self._pending = []
+        self._segment = None
+        self._table = None
+        self._segment_index = 0
+        self._session = time.strftime('%Y%m%d-%H%M%S')
+        self._written_networks = set()
+        self._adapters = {}
+        self._stopping = threading.Event()
+        self._thread = None
+        self.records = 0
+        self.dropped = 0
+        self.segment_path = None
+        self._metrics_collector = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='ScanRecorder', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Дописывает все накопленные замеры и закрывает сегмент."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def record(self, adapter, readings, timestamp=None):
+        """
+        Ставит сканирование в очередь на запись.
+        :param adapter: Имя адаптера.
+        :param readings: Словарь {id сети: rssi}.
+        :param timestamp: Время сканирования по time.time(), по умолчанию - текущее.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self._queue.put_nowait((timestamp, adapter, readings))
+        except queue.Full:
+            self.dropped += 1
+
+    def export_metrics(self, registry=REGISTRY):
+        """Публикует глубину очереди записи, записанные и отброшенные сканирования в реестре метрик."""
+        if self._metrics_collector is not None:
+            return self._metrics_collector
+        queued = registry.gauge('rssi_recorder_queue_depth', 'Сканирований в очереди записи')
+        records = registry.counter('rssi_recorder_records_total', 'Замеров, записанных на диск')
+        dropped = registry.counter('rssi_recorder_dropped_total', 'Сканирований, отброшенных при переполнении')
+
+        def collect():
+            queued.set(self._queue.qsize())
+            records.set(self.records)
+            dropped.set(self.dropped)
+
+        registry.add_collector(collect)
+        self._metrics_collector = collect
+        return collect
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                item = self._queue.get(timeout=max(next_flush - time.monotonic(), 0.01))
+            except queue.Empty:
+                item = None
+            if item is not None:
+                self._pending.append(item)
+            if time.monotonic() >= next_flush:
+                self._flush()
+                next_flush = time.monotonic() + self.flush_interval
+        self._flush()
+        self._close_segment()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        size = sum(len(readings) for _, _, readings in pending)
+        block = np.empty(size, dtype=RECORD_DTYPE)
+        table = []
+        pos = 0
+        if self._segment is None or self._segment.tell() + block.nbytes > self.segment_size:
+            self._open_segment()
+        for timestamp, adapter, readings in pending:
+            if adapter not in self._adapters:
+                self._adapters[adapter] = len(self._adapters)
+                table.append({'adapter': self._adapters[adapter], 'name': adapter})
+            end = pos + len(readings)
+            block['timestamp'][pos:end] = timestamp
+            block['adapter'][pos:end] = self._adapters[adapter]
+            block['network'][pos:end] = list(readings)
+            block['rssi'][pos:end] = list(readings.values())
+            for network_id in readings:
+                if network_id not in self._written_networks:
+                    self._written_networks.add(network_id)
+                    table.append({
+                        'network': network_id,
+                        'bssid': self.networks.bssid(network_id),
+                        'ssid': self.networks.ssid(network_id),
+                        'freq': int(self.networks.freqs[network_id]),
+                    })
+            pos = end
+        # Сначала таблица: записи сегмента не должны ссылаться на неизвестные сети
+        if table:
+            self._table.write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in table))
+            self._table.flush()
+        self._segment.write(block.tobytes())
+        self._segment.flush()
+        self.records += size
+
+    def _open_segment(self):
+        self._close_segment()
+        self._segment_index += 1
+        name = f'scans-{self._session}-{self._segment_index:04d}'
+        self.segment_path = os.path.join(self.directory, name + SEGMENT_SUFFIX)
+        self._segment = open(self.segment_path, 'wb')
+        self._segment.write(MAGIC + np.uint64(RECORD_DTYPE.itemsize).tobytes())
+        self._table = open(os.path.join(self.directory, name + TABLE_SUFFIX), 'w', encoding='utf-8')
+        # Каждый сегмент самодостаточен: таблица заполняется заново
+        self._written_networks = set()
+        self._adapters = {}
+
+    def _close_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._table.close()
+            self._segment = None
+            self._table = None
+
+
+class RecordedSession:
+    """
+    Записанный сеанс: все сегменты каталога (или один файл сегмента), открытые через np.memmap.
+    Сети всех сегментов интернируются в общий NetworkIndex, адаптеры различаются по имени.
+    Данные не копируются в память: scans() отдает срезы отображенных файлов.
+    """
+
+    def __init__(self, path, networks=None):
+        self.networks = networks if networks is not None else NetworkIndex()
+        self.adapters = []
+        if os.path.isdir(path):
+            paths = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(SEGMENT_SUFFIX))
+        else:
+            paths = [path]
+        # Сегмент: (записи, id сетей сеанса по id сегмента, номера адаптеров сеанса по номерам сегмента)
+        self.segments = [self._open_segment(segment_path) for segment_path in paths]
+        self.segments = [segment for segment in self.segments if len(segment[0])]
+
+    def _open_segment(self, path):
+        with open(path, 'rb') as file:
+            header = file.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC or \
+                int(np.frombuffer(header[len(MAGIC):], np.uint64)[0]) != RECORD_DTYPE.itemsize:
+            raise ValueError(f'{path} не является сегментом записи сканирований')
+        size = os.path.getsize(path) - HEADER_SIZE
+        # Незавершенная последняя запись (обрыв при записи) отбрасывается
+        count = size // RECORD_DTYPE.itemsize
+        if count:
+            records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            records = np.zeros(0, dtype=RECORD_DTYPE)
+
+        network_map = np.zeros(0, dtype=np.intp)
+        adapter_map = np.zeros(0, dtype=np.intp)
+        table_path = path[:-len(SEGMENT_SUFFIX)] + TABLE_SUFFIX
+        with open(table_path, encoding='utf-8') as table:
+            for line in table:
+                entry = json.loads(line)
+                if 'network' in entry:
+                    local_id = entry['network']
+                    if local_id >= len(network_map):
+                        network_map = np.concatenate([network_map, np.full(local_id + 1 - len(network_map), -1)])
+                    network_map[local_id] = self.networks.intern(entry['bssid'], entry['ssid'], entry['freq'])
+                else:
+                    if entry['name'] not in self.adapters:
+                        self.adapters.append(entry['name'])
+                    local_id = entry['adapter']
+                    if local_id >= len(adapter_map):
+                        adapter_map = np.concatenate([adapter_map, np.full(local_id + 1 - len(adapter_map), -1)])
+                    adapter_map[local_id] = self.adapters.index(entry['name'])
+        return records, network_map, adapter_map
+
+    @property
+    def start_time(self):
+        return float(self.segments[0][0]['timestamp'][0]) if self.segments else None
+
+    @property
+    def end_time(self):
+        return float(self.segments[-1][0]['timestamp'][-1]) if self.segments else None
+
+    def __len__(self):
+        return sum(len(records) for records, _, _ in self.segments)
+
+    def scans(self, adapter=None):
+        """
+        Сканирования в порядке записи.
+        :param adapter: Номер адаптера в self.adapters, чтобы получить только его сканирования.
+        :return: Генератор (timestamp, номер адаптера в self.adapters, id сетей, rssi).
+        """
+        for records, network_map, adapter_map in self.segments:
+            timestamps = records['timestamp']
+            adapters = records['adapter']
+            # Сканирование - непрерывная серия записей с одним временем и адаптером
+            bounds = np.flatnonzero((timestamps[1:] != timestamps[:-1]) | (adapters[1:] != adapters[:-1])) + 1
+            starts = np.concatenate(([0], bounds))
+            ends = np.concatenate((bounds, [len(records)]))
+            scan_adapters = adapter_map[adapters[starts]]
+            if adapter is not None:
+                selected = scan_adapters == adapter
+                starts, ends, scan_adapters = starts[selected], ends[selected], scan_adapters[selected]
+            for start, end, scan_adapter in zip(starts, ends, scan_adapters):
+                yield (float(timestamps[start]), int(scan_adapter),
+                       network_map[records['network'][start:end]], records['rssi'][start:end])
+
+    def readings(self, network_id, start=None, end=None):
+        """
+        Все замеры одной сети за интервал времени записи [start, end] без обхода сканирований.
+        :return: (время замеров, номера адаптеров в self.adapters, rssi).
+        """
+        timestamps, adapters, values = [], [], []
+        for records, network_map, adapter_map in self.segments:
+            local_ids = np.flatnonzero(network_map == network_id)
+            if not len(local_ids):
+                continue
+            selected = np.isin(records['network'], local_ids)
+            if start is not None:
+                selected &= records['timestamp'] >= start
+            if end is not None:
+                selected &= records['timestamp'] <= end
+            chosen = records[selected]
+            timestamps.append(chosen['timestamp'].astype(np.float64))
+            adapters.append(adapter_map[chosen['adapter']])
+            values.append(chosen['rssi'].astype(np.float32))
+        if not timestamps:
+            return np.zeros(0), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        return np.concatenate(timestamps), np.concatenate(adapters), np.concatenate(values)
@@ -0,0 +1,212 @@
+import json
+import math
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from utils.metrics import prometheus_text
+
+# Двоичный кадр: заголовок, затем id сетей (uint32), длины истории (uint8),
+# история [сеть × history] и замеры адаптеров [адаптер × сеть] (float32, NaN - нет значения)
+FRAME_MAGIC = b'RSF1'
+FRAME_HEADER = struct.Struct('<4sIdIHHB')
+# Сообщение потока /stream: тип (1 байт) и длина содержимого, затем содержимое
+MESSAGE_HEADER = struct.Struct('<cI')
+NETWORKS_MESSAGE = b'N'
+FRAME_MESSAGE = b'F'
+
+DEFAULT_PORT = 8765
+
+
+def encode_frame(frame):
+    """
+    Кадр Frame в компактном двоичном виде; id сетей - id NetworkIndex сервера.
+    Время кадра передается по time.time(), чтобы кадры разных машин можно было сопоставить.
+    """
+    adapters = 0 if frame.adapter_values is None else frame.adapter_values.shape[0]
+    wall_time = frame.timestamp + time.time() - time.monotonic()
+    header = FRAME_HEADER.pack(FRAME_MAGIC, frame.seq, wall_time, len(frame), frame.history.shape[1],
+                               adapters, frame.low_precision)
+    parts = [header, frame.ids.astype('<u4').tobytes(), frame.counts.astype(np.uint8).tobytes(),
+             frame.history.astype('<f4').tobytes()]
+    if adapters:
+        parts.append(frame.adapter_values.astype('<f4').tobytes())
+    return b''.join(parts)
+
+
+def decode_frame(data):
+    """
+    Разбирает двоичный кадр.
+    :return: (seq, время кадра по time.time(), ids, history, counts, adapter_values, low_precision).
+    """
+    magic, seq, timestamp, size, history_size, adapters, low_precision = FRAME_HEADER.unpack_from(data)
+    if magic != FRAME_MAGIC:
+        raise ValueError('Неизвестный формат кадра')
+    offset = FRAME_HEADER.size
+    ids = np.frombuffer(data, '<u4', size, offset).astype(np.intp)
+    offset += ids.size * 4
+    counts = np.frombuffer(data, np.uint8, size, offset).astype(np.int32)
+    offset += size
+    history = np.frombuffer(data, '<f4', size * history_size, offset).reshape(size, history_size).copy()
+    offset += history.nbytes
+    adapter_values = None
+    if adapters:
+        adapter_values = np.frombuffer(data, '<f4', adapters * size, offset).reshape(adapters, size).copy()
+    return seq, timestamp, ids, history, counts, adapter_values, bool(low_precision)
+
+
+def network_table(networks, since=0):
+    """Записи NetworkIndex начиная с id since: [{id, bssid, ssid, freq}]."""
+    count = len(networks)
+    return [{'id': network_id, 'bssid': networks.bssid(network_id), 'ssid': networks.ssid(network_id),
+             'freq': int(networks.freqs[network_id])} for network_id in range(since, count)]
+
+
+def _json_value(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def frame_to_json(frame):
+    networks = frame.networks
+    result = {'seq': frame.seq, 'low_precision': frame.low_precision, 'networks': []}
+    for pos, network_id in enumerate(frame.ids):
+        history = frame.history[pos, frame.history.shape[1] - frame.counts[pos]:]
+        entry = {
+            'bssid': networks.bssid(network_id),
+            'ssid': networks.ssid(network_id),
+            'freq': int(networks.freqs[network_id]),
+            'rssi': _json_value(history[-1]),
+            'history': [_json_value(value) for value in history],
+        }
+        if frame.adapter_values is not None:
+            entry['adapters'] = [_json_value(value) for value in frame.adapter_values[:, pos]]
+        result['networks'].append(entry)
+    return result
+
+
+class StateRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /state          - последний кадр в JSON (?format=binary - в двоичном виде)
+    GET /history?bssid= - история средних одной точки доступа в JSON
+    GET /networks       - таблица сетей сервера (?since=N - начиная с id N)
+    GET /stream         - поток сообщений с новыми сетями и кадрами каждого такта
+    GET /metrics        - метрики процесса в текстовом формате Prometheus
+    GET /nodes          - состояние узлов координатора (только для coordinator.py)
+    """
+
+    # Поток /stream не имеет длины, соединение закрывается по его окончании
+    protocol_version = 'HTTP/1.0'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        data_sync = self.server.state_server.data_sync
+        frame = data_sync.bus.last_frame
+        if url.path == '/state':
+            if query.get('format') == ['binary']:
+                if frame is None:
+                    self.send_error(404, explain='Данных еще нет')
+                    return
+                self._send(encode_frame(frame), 'application/octet-stream')
+                return
+            if frame is None:
+                self._send_json({'seq': 0, 'low_precision': data_sync.low_precision, 'networks': []})
+                return
+            self._send_json(frame_to_json(frame))
+        elif url.path == '/history':
+            bssid = query.get('bssid', [None])[0]
+            history = frame.get(bssid) if frame is not None and bssid else None
+            if history is None:
+                self.send_error(404, explain='Точка доступа не видна')
+                return
+            self._send_json({'bssid': bssid, 'ssid': data_sync.networks.ssid(data_sync.networks.get(bssid)),
+                             'history': [_json_value(value) for value in history]})
+        elif url.path == '/networks':
+            since = int(query.get('since', ['0'])[0])
+            self._send_json(network_table(data_sync.networks, since))
+        elif url.path == '/stream':
+            self._stream(data_sync)
+        elif url.path == '/metrics':
+            self._send(prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+        elif url.path == '/nodes' and hasattr(data_sync, 'node_status'):
+            self._send_json(data_sync.node_status())
+        else:
+            self.send_error(404)
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, value):
+        self._send(json.dumps(value, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+    def _stream(self, data_sync):
+        state_server = self.server.state_server
+        subscription = data_sync.subscribe(f'stream {self.client_address[0]}:{self.client_address[1]}')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.end_headers()
+        sent_networks = 0
+        try:
+            if data_sync.bus.last_frame is not None:
+                subscription.push(data_sync.bus.last_frame)
+            while not state_server.stopping.is_set():
+                frame = subscription.get(timeout=1.0)
+                if frame is None:
+                    continue
+                # Сначала новые сети, чтобы клиент мог сопоставить id кадра
+                table = network_table(data_sync.networks, sent_networks)
+                if table:
+                    self._write_message(NETWORKS_MESSAGE, json.dumps(table, ensure_ascii=False).encode('utf-8'))
+                    sent_networks += len(table)
+                self._write_message(FRAME_MESSAGE, encode_frame(frame))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            data_sync.unsubscribe(subscription)
+
+    def _write_message(self, kind, payload):
+        self.wfile.write(MESSAGE_HEADER.pack(kind, len(payload)) + payload)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StateServer:
+    """
+    HTTP-сервер состояния DataSync для демона. По умолчанию слушает только localhost.
+    Каждый клиент /stream получает собственную подписку на шину, медленный клиент
+    пропускает кадры и не задерживает сбор.
+    """
+
+    def __init__(self, data_sync, host='127.0.0.1', port=DEFAULT_PORT):
+        self.data_sync = data_sync
+        self.stopping = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), StateRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state_server = self
+        self.thread = None
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def start(self):
+        # Очереди клиентов /stream видны в /metrics
+        self.data_sync.bus.export_metrics()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='StateServer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
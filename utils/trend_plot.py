@@ -0,0 +1,136 @@
+import numpy as np
+from matplotlib.figure import Figure
+
+# Внешний вид аннотации вердикта для каждого типа тренда
+ANNOTATION_MAP = {
+    "uncertain": {"text": "?", "color": "white", "size": 60},
+    "stationary": {"text": "≈", "color": "white", "size": 60},
+    "down": {"text": "↓", "color": "#FF073A", "size": 60},
+    "up": {"text": "↑", "color": "#39FF14", "size": 60},
+}
+
+
+class TrendPlot:
+    """
+    График истории RSSI для DetailsPage с инкрементальной отрисовкой.
+    Оси, подписи и сетка рисуются один раз и кэшируются как фон (copy_from_bbox).
+    Линия и надписи создаются один раз как animated-артисты; на каждом кадре меняются
+    только их данные, после чего фон восстанавливается и поверх него блитятся артисты.
+    Фон перекэшируется при каждой полной перерисовке (например, при изменении размера окна).
+    """
+
+    def __init__(self, fig=None, history_size=8):
+        self.history_size = history_size
+        self.fig = fig if fig is not None else Figure(figsize=(6, 4))
+        self.ax = self.fig.add_subplot(111)
+        self.canvas = None
+        self._background = None
+        self._style_axes()
+
+        self.line, = self.ax.plot([], [], marker='o', color='white', animated=True)
+        self.threshold_annotation = self.ax.annotate(
+            "Превышение разностного порога адаптеров",
+            xy=(0, -3),
+            color="yellow",
+            fontsize=10,
+            ha="left",
+            va="center",
+            fontfamily="monospace",
+            animated=True,
+            visible=False
+        )
+        self.jump_annotation = self.ax.annotate(
+            "Резкий скачок сигнала",
+            xy=(0, -9),
+            color="red",
+            fontsize=10,
+            ha="left",
+            va="center",
+            fontfamily="monospace",
+            animated=True,
+            visible=False
+        )
+        self.annotation = self.ax.annotate(
+            "",
+            xy=(self.history_size - 0.5, -50),
+            ha="center",
+            va="center",
+            fontfamily="monospace",
+            animated=True,
+            visible=False
+        )
+        self.artists = (self.line, self.threshold_annotation, self.jump_annotation, self.annotation)
+
+    def _style_axes(self):
+        ax = self.ax
+        size = self.history_size
+        x_ticks = np.linspace(0, size, size + 1)
+        ax.set_xticks(x_ticks)
+        ax.set_xticklabels([f'{size} секунд'] + [''] * (size - 2) + ['1', 'Вердикт'])
+        ax.set_xlim(0, size)
+
+        y_ticks = np.arange(-100, 1, 10)
+        ax.set_yticks(y_ticks)
+        ax.set_ylim(-100, 0)
+
+        ax.grid(True, which='major', color='#007FD0', linestyle='--', linewidth=0.5, alpha=0.2)
+
+        self.fig.patch.set_facecolor("#0D0D0D")
+        ax.set_facecolor("#0D0D0D")
+        ax.spines['bottom'].set_color("#007FD0")
+        ax.tick_params(axis='x', colors='#007FD0')
+        ax.spines['left'].set_color("#007FD0")
+        ax.tick_params(axis='y', colors='#007FD0')
+        ax.spines['top'].set_color("none")
+        ax.spines['right'].set_color("none")
+
+    def attach(self, canvas):
+        """Привязывает холст; фон кэшируется после каждой его полной перерисовки."""
+        self.canvas = canvas
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def update(self, last_values, annotation_type="uncertain", threshold_exceeded=False, jump=False):
+        """Обновляет линию и надписи и перерисовывает только их."""
+        if last_values is not None and len(last_values):
+            count = len(last_values)
+            self.line.set_data(np.arange(self.history_size - count, self.history_size), last_values)
+            self.line.set_visible(True)
+        else:
+            self.line.set_visible(False)
+
+        self.threshold_annotation.set_visible(threshold_exceeded)
+        self.jump_annotation.set_visible(jump)
+
+        props = ANNOTATION_MAP.get(annotation_type)
+        if props:
+            self.annotation.set_text(props["text"])
+            self.annotation.set_color(props["color"])
+            self.annotation.set_fontsize(props["size"])
+        self.annotation.set_visible(props is not None)
+
+        self.blit()
+
+    def clear(self):
+        """Скрывает линию и надписи."""
+        for artist in self.artists:
+            artist.set_visible(False)
+        self.blit()
+
+    def blit(self):
+        if self.canvas is None:
+            return
+        if self._background is None:
+            # Первая полная отрисовка: фон кэшируется в _on_draw
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+        self.canvas.blit(self.ax.bbox)
@@ -0,0 +1,101 @@
+import math
+from tkinter import Canvas, Frame, Scrollbar
+
+
+class VirtualList(Frame):
+    """
+    Прокручиваемый список строк фиксированной высоты.
+    Виджеты создаются только для видимых строк и переиспользуются при прокрутке:
+    create_row(parent) создает строку, bind_row(row, key, item) заполняет ее данными.
+    Порядок строк - порядок добавления ключей или, если задан sort_key, сортировка по нему;
+    при сортировке и обновлении данных строки только перепривязываются, а не пересоздаются.
+    """
+
+    def __init__(self, parent, create_row, bind_row, row_height=90, bg="#0D0D0D", sort_key=None):
+        super().__init__(parent, bg=bg)
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.sort_key = sort_key
+        self.keys = []
+        self.items = {}
+        self._pool = []
+
+        self.canvas = Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = Scrollbar(
+            self, orient="vertical", command=self.canvas.yview, background="#007FD0", highlightthickness=0,
+            borderwidth=0
+        )
+        self.canvas.configure(yscrollcommand=self._on_yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", self._on_configure)
+
+    def set_items(self, items):
+        """
+        Заменяет данные списка {ключ: данные строки}.
+        Уже показанные ключи сохраняют позицию, новые добавляются в конец.
+        """
+        known = set(self.items)
+        self.keys = [key for key in self.keys if key in items]
+        self.keys.extend(key for key in items if key not in known)
+        self.items = items
+        if self.sort_key is not None:
+            self.keys.sort(key=lambda key: self.sort_key(items[key]))
+        self._update_scrollregion()
+        self.refresh()
+
+    def set_sort_key(self, sort_key):
+        """Включает (или выключает, если None) сортировку строк."""
+        self.sort_key = sort_key
+        self.set_items(self.items)
+
+    def scroll(self, units):
+        self.canvas.yview_scroll(units, "units")
+
+    def _on_yview(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _on_configure(self, event):
+        for row, window in self._pool:
+            self.canvas.itemconfigure(window, width=event.width)
+        self.refresh()
+
+    def _update_scrollregion(self):
+        width = self.canvas.winfo_width()
+        self.canvas.configure(
+            scrollregion=(0, 0, width, max(len(self.keys) * self.row_height, 1)),
+            yscrollincrement=self.row_height // 3
+        )
+
+    def _ensure_pool(self, size):
+        width = self.canvas.winfo_width()
+        while len(self._pool) < size:
+            row = self.create_row(self.canvas)
+            row.bound = None
+            window = self.canvas.create_window((0, 0), window=row, anchor="nw", width=width,
+                                               height=self.row_height, state="hidden")
+            self._pool.append((row, window))
+
+    def refresh(self):
+        """Привязывает пул виджетов к строкам, попадающим в видимую область."""
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first = max(int(self.canvas.canvasy(0) // self.row_height), 0)
+        visible = math.ceil(height / self.row_height) + 1
+        self._ensure_pool(visible)
+        for offset, (row, window) in enumerate(self._pool):
+            index = first + offset
+            if offset >= visible or index >= len(self.keys):
+                if row.bound is not None:
+                    self.canvas.itemconfigure(window, state="hidden")
+                    row.bound = None
+                continue
+            key = self.keys[index]
+            item = self.items[key]
+            self.canvas.coords(window, 0, index * self.row_height)
+            if row.bound is None:
+                self.canvas.itemconfigure(window, state="normal")
+            if row.bound != (key, item):
+                self.bind_row(row, key, item)
+                row.bound = (key, item)